@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 from pathlib import Path
@@ -32,7 +33,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    "app.tasks.middleware.RequestProfilingMiddleware",
+    "app.tasks.middleware.ServerTimingMiddleware",
+    "app.tasks.middleware.TrafficCaptureMiddleware",
+    "app.tasks.middleware.LoadSheddingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "app.tasks.middleware.ReadYourWritesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -41,6 +47,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_prometheus.middleware.PrometheusAfterMiddleware",
     "app.tasks.middleware.MetricsMiddleware",
+    "app.tasks.middleware.FaultInjectionMiddleware",
 ]
 
 ROOT_URLCONF = "app.urls"
@@ -71,16 +78,63 @@ if TESTING:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": ":memory:",
-        }
+        },
+        # Only used by the sharding tests (TASK_SHARDS is empty by default)
+        "shard1": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ":memory:",
+        },
     }
 else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": os.getenv("SQLITE_PATH", "/data/db.sqlite3"),
+            # Keep one connection per worker, checked before reuse
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "600")),
+            "CONN_HEALTH_CHECKS": True,
         }
     }
 
+# Read-only connection to the same SQLite file; reads are routed here by
+# app.tasks.db_routers. Add replica aliases to DATABASE_READ_ALIASES.
+DATABASE_READ_ALIASES = []
+if not TESTING and os.getenv("DB_READ_ALIAS", "true").lower() == "true":
+    DATABASES["read"] = {
+        **DATABASES["default"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_READ_ALIASES = ["read"]
+
+# Opt-in owner-based sharding: TASK_SHARD_PATHS lists extra SQLite files,
+# each becoming a shard alias next to "default" (see app.tasks.sharding)
+TASK_SHARDS = []
+TASK_SHARD_PATHS = [p for p in os.getenv("TASK_SHARD_PATHS", "").split(",") if p]
+if TASK_SHARD_PATHS and not TESTING:
+    TASK_SHARDS = ["default"]
+    for index, path in enumerate(TASK_SHARD_PATHS, start=1):
+        DATABASES[f"shard{index}"] = {**DATABASES["default"], "NAME": path}
+        TASK_SHARDS.append(f"shard{index}")
+
+DATABASE_ROUTERS = [
+    "app.tasks.db_routers.TaskShardRouter",
+    "app.tasks.db_routers.ReadWriteRouter",
+]
+
+# Applied to every new SQLite connection (app.tasks.sqlite_tuning)
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),  # KiB
+    "temp_store": "MEMORY",
+}
+SQLITE_ALIAS_PRAGMAS = {
+    # The writer owns the journal mode; reject writes at the SQL level
+    "read": {"journal_mode": None, "query_only": "ON"},
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -100,6 +154,30 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Redis (cache, rate limits, write queue); not used by the test suite
+REDIS_URL = None if TESTING else os.getenv("REDIS_URL", "redis://redis:6379/0")
+
+# Per-process Redis connection pool; callers wait up to TIMEOUT seconds
+REDIS_POOL = {
+    "MAX_CONNECTIONS": int(os.getenv("REDIS_POOL_MAX_CONNECTIONS", "50")),
+    "TIMEOUT": float(os.getenv("REDIS_POOL_TIMEOUT", "1")),
+}
+
+# Short Redis timeouts (seconds) so a stalled Redis can't hold requests
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.2"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.3"))
+
+# Skip Redis after this many consecutive errors, probe again after RESET_TIMEOUT
+REDIS_CIRCUIT_BREAKER = {
+    "FAILURE_THRESHOLD": int(os.getenv("REDIS_BREAKER_FAILURE_THRESHOLD", "5")),
+    "RESET_TIMEOUT": float(os.getenv("REDIS_BREAKER_RESET_TIMEOUT", "10")),
+}
+
+# Cache values as msgpack + zstd (pickled keys stay readable); keep
+# CACHE_COMPACT_WRITES=false until no worker runs the pickle-only codec
+CACHE_COMPACT_WRITES = os.getenv("CACHE_COMPACT_WRITES", "false").lower() == "true"
+CACHE_COMPRESS_MIN_LENGTH = int(os.getenv("CACHE_COMPRESS_MIN_LENGTH", "512"))
+
 # Redis Cache - Use fake cache for tests
 if TESTING:
     CACHES = {
@@ -112,9 +190,22 @@ else:
     CACHES = {
         "default": {
             "BACKEND": "django_redis.cache.RedisCache",
-            "LOCATION": os.getenv("REDIS_URL", "redis://redis:6379/0"),
+            "LOCATION": REDIS_URL,
             "OPTIONS": {
                 "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                "CONNECTION_POOL_CLASS": (
+                    "app.tasks.redis_client.InstrumentedConnectionPool"
+                ),
+                "CONNECTION_POOL_KWARGS": {
+                    "max_connections": REDIS_POOL["MAX_CONNECTIONS"],
+                    "timeout": REDIS_POOL["TIMEOUT"],
+                },
+                "SOCKET_CONNECT_TIMEOUT": REDIS_CONNECT_TIMEOUT,
+                "SOCKET_TIMEOUT": REDIS_SOCKET_TIMEOUT,
+                "SERIALIZER": "app.tasks.cache_codec.CompactSerializer",
+                "COMPRESSOR": "app.tasks.cache_codec.ThresholdCompressor",
+                "COMPACT_WRITES": CACHE_COMPACT_WRITES,
+                "COMPRESS_MIN_LENGTH": CACHE_COMPRESS_MIN_LENGTH,
             },
         }
     }
@@ -122,11 +213,22 @@ else:
 # REST Framework
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "app.tasks.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "app.tasks.renderers.MessagePackRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+        "app.tasks.parsers.MessagePackParser",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "app.tasks.pagination.CustomPageNumberPagination",
     "PAGE_SIZE": 20,
@@ -135,6 +237,133 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
+    # Sliding-window budgets per user (or client IP) and scope, shared via Redis
+    "DEFAULT_THROTTLE_CLASSES": [
+        "app.tasks.throttling.SlidingWindowScopedThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "tasks_read": os.getenv("THROTTLE_TASKS_READ", "600/min"),
+        "tasks_write": os.getenv("THROTTLE_TASKS_WRITE", "120/min"),
+        "tasks_stats": os.getenv("THROTTLE_TASKS_STATS", "60/min"),
+        "register": os.getenv("THROTTLE_REGISTER", "10/hour"),
+    },
+}
+
+# Per-user rates by username, e.g. {"loadtest": {"tasks_read": "6000/min"}};
+# a None rate exempts the user from that scope
+THROTTLE_OVERRIDES = json.loads(os.getenv("THROTTLE_OVERRIDES", "{}"))
+
+if TESTING:
+    # Throttling tests enable the scopes they exercise
+    REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {
+        scope: None for scope in REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+    }
+
+# Token -> user cache used by CachedTokenAuthentication (seconds)
+TOKEN_AUTH_CACHE = {
+    "LOCAL_TTL": int(os.getenv("TOKEN_AUTH_LOCAL_TTL", "5")),
+    "LOCAL_MAXSIZE": int(os.getenv("TOKEN_AUTH_LOCAL_MAXSIZE", "10000")),
+    "REDIS_TTL": int(os.getenv("TOKEN_AUTH_REDIS_TTL", "300")),
+}
+
+# Serve task list/retrieve from values_list() rows instead of TaskSerializer
+TASKS_FAST_READ_PATH = os.getenv("TASKS_FAST_READ_PATH", "true").lower() == "true"
+
+# Near cache for task detail reads: process LRU -> Redis -> DB (seconds)
+TASK_DETAIL_CACHE = {
+    "ENABLED": os.getenv("TASK_DETAIL_CACHE_ENABLED", "true").lower() == "true",
+    "LOCAL_TTL": int(os.getenv("TASK_DETAIL_CACHE_LOCAL_TTL", "30")),
+    "LOCAL_MAXSIZE": int(os.getenv("TASK_DETAIL_CACHE_LOCAL_MAXSIZE", "10000")),
+    "REDIS_TTL": int(os.getenv("TASK_DETAIL_CACHE_REDIS_TTL", "300")),
+}
+
+# Funnel task writes through a group-commit writer: "", "inline", "local", "redis"
+TASK_WRITE_QUEUE = {
+    "MODE": os.getenv("TASK_WRITE_QUEUE", ""),
+    "MAX_BATCH": int(os.getenv("TASK_WRITE_QUEUE_MAX_BATCH", "100")),
+    "MAX_WAIT_MS": float(os.getenv("TASK_WRITE_QUEUE_MAX_WAIT_MS", "2")),
+    "TIMEOUT": int(os.getenv("TASK_WRITE_QUEUE_TIMEOUT", "5")),
+}
+
+# Shed low-priority requests (list/search first) while a worker is overloaded
+LOAD_SHEDDING = {
+    "ENABLED": not TESTING
+    and os.getenv("LOAD_SHEDDING_ENABLED", "true").lower() == "true",
+    # Off unless set: sync gunicorn workers never have more than one in flight
+    "MAX_IN_FLIGHT": int(os.getenv("LOAD_SHEDDING_MAX_IN_FLIGHT", "0")) or None,
+    # Needs a proxy setting X-Request-Start in front of gunicorn
+    "MAX_QUEUE_MS": float(os.getenv("LOAD_SHEDDING_MAX_QUEUE_MS", "100")),
+    "RETRY_AFTER": int(os.getenv("LOAD_SHEDDING_RETRY_AFTER", "1")),
+}
+
+# Coalesce concurrent metrics summary, task stats and /status computations
+RESPONSE_COALESCING = {
+    "ENABLED": not TESTING
+    and os.getenv("RESPONSE_COALESCING_ENABLED", "true").lower() == "true",
+    "TTL": float(os.getenv("RESPONSE_COALESCING_TTL", "2")),
+    "STALE_TTL": float(os.getenv("RESPONSE_COALESCING_STALE_TTL", "30")),
+}
+
+# Sampled request capture for scripts/traffic_replay.py (off by default)
+TRAFFIC_CAPTURE = {
+    "ENABLED": not TESTING
+    and os.getenv("TRAFFIC_CAPTURE_ENABLED", "false").lower() == "true",
+    "SAMPLE_RATE": float(os.getenv("TRAFFIC_CAPTURE_SAMPLE_RATE", "0.01")),
+    "PATH": os.getenv(
+        "TRAFFIC_CAPTURE_PATH", os.path.join(BASE_DIR, "captures", "traffic.capture")
+    ),
+    "BODY_MODE": os.getenv("TRAFFIC_CAPTURE_BODY_MODE", "redact"),
+    "PSEUDONYM_KEY": os.getenv("TRAFFIC_CAPTURE_PSEUDONYM_KEY", ""),
+}
+
+# Server-Timing header with db/cache/auth/serialize/render times per request;
+# it exposes backend timings to every client, so keep it off in production
+SERVER_TIMING = {
+    "ENABLED": not TESTING
+    and os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true",
+    # Also aggregate phases per minute for /api/v1/metrics/summary/
+    "RECORD_METRICS": os.getenv("SERVER_TIMING_RECORD_METRICS", "false").lower()
+    == "true",
+}
+
+# Per-request profiles for staff (X-Profile header) or 1 in SAMPLE_EVERY requests
+REQUEST_PROFILING = {
+    "ENABLED": not TESTING
+    and os.getenv("REQUEST_PROFILING_ENABLED", "false").lower() == "true",
+    "SAMPLE_EVERY": int(os.getenv("REQUEST_PROFILING_SAMPLE_EVERY", "0")),
+    # "sampling" (collapsed stacks) or "cprofile" (pstats)
+    "MODE": os.getenv("REQUEST_PROFILING_MODE", "sampling"),
+    "SAMPLE_INTERVAL": float(os.getenv("REQUEST_PROFILING_SAMPLE_INTERVAL", "0.005")),
+    "DIRECTORY": os.getenv(
+        "REQUEST_PROFILING_DIRECTORY", os.path.join(BASE_DIR, "profiles")
+    ),
+    "MAX_FILES": int(os.getenv("REQUEST_PROFILING_MAX_FILES", "200")),
+    "MAX_BYTES": int(os.getenv("REQUEST_PROFILING_MAX_BYTES", str(50 * 1024 * 1024))),
+}
+
+# Server-side fault injection for load tests; rules via manage.py faults
+FAULT_INJECTION = {
+    "ENABLED": not TESTING
+    and os.getenv("FAULT_INJECTION_ENABLED", "false").lower() == "true",
+    "REFRESH_INTERVAL": float(os.getenv("FAULT_INJECTION_REFRESH_INTERVAL", "1")),
+}
+
+# Background Redis/DB probe that /status is served from (seconds)
+HEALTH_PROBE = {
+    "INTERVAL": float(os.getenv("HEALTH_PROBE_INTERVAL", "5")),
+    "STALE_AFTER": float(os.getenv("HEALTH_PROBE_STALE_AFTER", "30")),
+}
+
+# Hot/cold tiering: DONE tasks unchanged for this many days move to ArchivedTask
+TASK_ARCHIVE_AFTER_DAYS = int(os.getenv("TASK_ARCHIVE_AFTER_DAYS", "30"))
+TASK_ARCHIVE_BATCH_SIZE = int(os.getenv("TASK_ARCHIVE_BATCH_SIZE", "1000"))
+
+# Benchmark harness: flag a regression when the change exceeds the threshold
+# and is significant at ALPHA (manage.py benchmark)
+BENCHMARKS = {
+    "ALPHA": float(os.getenv("BENCHMARK_ALPHA", "0.05")),
+    "THROUGHPUT_DROP": float(os.getenv("BENCHMARK_THROUGHPUT_DROP", "0.10")),
+    "LATENCY_INCREASE": float(os.getenv("BENCHMARK_LATENCY_INCREASE", "0.10")),
 }
 
 # Swagger UI settings
@@ -2,10 +2,52 @@
 Django admin configuration for Task model
 """
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.utils import timezone
 
+from . import sharding
 from .models import Task
 
 
+class ShardListFilter(admin.SimpleListFilter):
+    """Pick which shard the changelist reads (only shown when sharded)"""
+
+    title = "shard"
+    parameter_name = "shard"
+
+    def lookups(self, request, model_admin):
+        return [(alias, alias) for alias in sharding.get_shards()]
+
+    def queryset(self, request, queryset):
+        if self.value() in sharding.get_shards():
+            return queryset.using(self.value())
+        return queryset
+
+
+class ShardedChangeList(ChangeList):
+    """Changelist over every shard unless ``ShardListFilter`` picks one"""
+
+    def apply_select_related(self, qs):
+        # No joins to auth_user, which only exists on default
+        if sharding.is_enabled():
+            return qs
+        return super().apply_select_related(qs)
+
+    def get_results(self, request):
+        super().get_results(request)
+        if not self.model_admin.fans_out(request):
+            return
+        if not isinstance(self.result_list, list):
+            # Single page or "show all": the parent kept the default-only queryset
+            self.result_list = self.paginator.object_list[: self.result_count]
+        if self.full_result_count is not None:
+            self.full_result_count = sharding.count_all(
+                lambda base: self.root_queryset.using(base.db)
+            )
+            self.show_admin_actions = bool(self.full_result_count)
+
+
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     """
@@ -21,7 +63,7 @@ class TaskAdmin(admin.ModelAdmin):
         "created_at",
         "is_overdue",
     ]
-    list_filter = ["status", "priority", "created_at", "owner"]
+    list_filter = [ShardListFilter, "status", "priority", "created_at", "owner"]
     search_fields = ["title", "description", "owner__username"]
     readonly_fields = ["id", "created_at", "updated_at", "is_overdue"]
     fieldsets = (
@@ -33,9 +75,48 @@ class TaskAdmin(admin.ModelAdmin):
     date_hierarchy = "created_at"
     ordering = ["-created_at"]
 
+    def fans_out(self, request):
+        """Whether the changelist merges all shards (sharded, no shard picked)"""
+        return (
+            sharding.is_enabled()
+            and request.GET.get(ShardListFilter.parameter_name)
+            not in sharding.get_shards()
+        )
+
+    def get_changelist(self, request, **kwargs):
+        return ShardedChangeList
+
+    def get_paginator(self, request, queryset, per_page, **kwargs):
+        if self.fans_out(request):
+            queryset = sharding.ShardedResults(queryset)
+        return super().get_paginator(request, queryset, per_page, **kwargs)
+
+    def get_search_fields(self, request):
+        # Shards don't hold auth_user, so owner__username can't be joined
+        if sharding.is_enabled():
+            return [f for f in self.search_fields if not f.startswith("owner__")]
+        return super().get_search_fields(request)
+
+    def get_object(self, request, object_id, from_field=None):
+        obj = super().get_object(request, object_id, from_field)
+        if obj is not None or not sharding.is_enabled():
+            return obj
+
+        for alias in sharding.get_shards():
+            try:
+                return self.get_queryset(request).using(alias).get(pk=object_id)
+            except (Task.DoesNotExist, ValidationError, ValueError):
+                continue
+        return None
+
     def is_overdue(self, obj):
         """Display overdue status"""
-        return obj.is_overdue
+        # Task has no is_overdue of its own
+        return (
+            obj.due_date is not None
+            and obj.status != "DONE"
+            and obj.due_date < timezone.now()
+        )
 
     is_overdue.boolean = True
     is_overdue.short_description = "Overdue"
@@ -8,3 +8,6 @@ class TasksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app.tasks"
     verbose_name = "Task Manager"
+
+    def ready(self):
+        from . import signals  # noqa: F401
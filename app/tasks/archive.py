@@ -0,0 +1,72 @@
+"""
+Hot/cold tiering for tasks
+
+DONE tasks that haven't changed for ``TASK_ARCHIVE_AFTER_DAYS`` are moved
+from Task to ArchivedTask in batched transactions, so the hot table and
+its owner indexes only hold live work.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from . import sharding
+from .models import ArchivedTask, Task
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = [f.attname for f in Task._meta.concrete_fields]
+
+
+def get_cutoff(days=None):
+    if days is None:
+        days = getattr(settings, "TASK_ARCHIVE_AFTER_DAYS", 30)
+    return timezone.now() - timedelta(days=days)
+
+
+def _archivable(using, cutoff):
+    return Task.objects.using(using).filter(status="DONE", updated_at__lt=cutoff)
+
+
+def archive_batch(using, cutoff, batch_size):
+    """Move one batch on one database; returns the number of tasks moved"""
+    pks = list(
+        _archivable(using, cutoff)
+        .order_by("updated_at")
+        .values_list("pk", flat=True)[:batch_size]
+    )
+    if not pks:
+        return 0
+
+    with transaction.atomic(using=using):
+        # Re-check inside the transaction, a task may have been reopened
+        tasks = list(_archivable(using, cutoff).filter(pk__in=pks))
+        ArchivedTask.objects.using(using).bulk_create(
+            [
+                ArchivedTask(**{name: getattr(task, name) for name in ARCHIVED_FIELDS})
+                for task in tasks
+            ],
+            ignore_conflicts=True,
+        )
+        Task.objects.using(using).filter(pk__in=[task.pk for task in tasks]).delete()
+    return len(tasks)
+
+
+def archive_done_tasks(days=None, batch_size=1000, max_batches=None):
+    """Archive old DONE tasks on every shard; returns moved count per alias"""
+    cutoff = get_cutoff(days)
+    moved = {}
+    for alias in sharding.get_shards() or [DEFAULT_DB_ALIAS]:
+        moved[alias] = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            count = archive_batch(alias, cutoff, batch_size)
+            if not count:
+                break
+            moved[alias] += count
+            batches += 1
+        if moved[alias]:
+            logger.info(f"Archived {moved[alias]} tasks on {alias}")
+    return moved
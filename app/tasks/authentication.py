@@ -0,0 +1,151 @@
+"""
+Cached token authentication for Task Manager API
+
+Resolves token -> user from an in-process LRU, then Redis, then the
+database, so authenticated requests normally cost no queries.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from .local_cache import LocalLRUCache
+from .circuit_breaker import guarded_cache as cache
+from .redis_client import InvalidationChannel
+from .server_timing import timed_phase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_AUTH_CACHE = {
+    "LOCAL_TTL": 5,
+    "LOCAL_MAXSIZE": 10000,
+    "REDIS_TTL": 300,
+}
+
+INVALIDATION_CHANNEL = "auth:invalidate"
+
+# All that is cached per token; never the password hash or other user data
+CACHED_USER_FIELDS = ("id", "username", "is_active", "is_staff")
+
+
+def _get_config():
+    return {**DEFAULT_TOKEN_AUTH_CACHE, **getattr(settings, "TOKEN_AUTH_CACHE", {})}
+
+
+def user_entry(user):
+    return {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+
+
+def build_user(entry):
+    """
+    User instance from a cache entry; other fields are deferred, so reading
+    one costs a query and ``save()`` only writes the cached fields
+    """
+    model = get_user_model()
+    names = [f.attname for f in model._meta.concrete_fields if f.attname in entry]
+    return model.from_db(DEFAULT_DB_ALIAS, names, [entry[name] for name in names])
+
+
+class TokenCache:
+    """
+    Two-tier token cache (process LRU in front of the Django cache)
+
+    Entries are ``CACHED_USER_FIELDS`` of the token's user, keyed by a hash
+    of the token. Invalidation deletes the Redis entry and this process's
+    LRU entry, and is broadcast so the other workers drop theirs at once.
+    """
+
+    KEY_PREFIX = "auth:token:"
+
+    def __init__(self):
+        config = _get_config()
+        self.redis_ttl = config["REDIS_TTL"]
+        self.local = LocalLRUCache(
+            maxsize=config["LOCAL_MAXSIZE"], ttl=config["LOCAL_TTL"]
+        )
+        self.channel = InvalidationChannel(
+            INVALIDATION_CHANNEL,
+            on_message=self.local.delete,
+            # Invalidations may have been missed while disconnected
+            on_connect=lambda: self.local.clear(reset_stats=False),
+            name="auth-cache",
+        )
+
+    @classmethod
+    def cache_key(cls, key):
+        """Never store raw token keys as Redis key names"""
+        return cls.KEY_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        """The cached user entry for a token key, or None"""
+        self.channel.ensure_listening()
+        cache_key = self.cache_key(key)
+        entry = self.local.get(cache_key)
+        if entry is not None:
+            return entry
+
+        try:
+            entry = cache.get(cache_key)
+        except Exception as e:
+            logger.error(f"Token cache read error: {e}")
+            return None
+
+        if entry is not None:
+            self.local.set(cache_key, entry)
+        return entry
+
+    def set(self, key, user):
+        cache_key = self.cache_key(key)
+        entry = user_entry(user)
+        self.local.set(cache_key, entry)
+        try:
+            cache.set(cache_key, entry, self.redis_ttl)
+        except Exception as e:
+            logger.error(f"Token cache write error: {e}")
+
+    def invalidate(self, key):
+        cache_key = self.cache_key(key)
+        self.local.delete(cache_key)
+        try:
+            cache.delete(cache_key)
+        except Exception as e:
+            logger.error(f"Token cache invalidation error: {e}")
+        # Hashed like the Redis key, the raw token never leaves the process
+        self.channel.publish(cache_key)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for DRF TokenAuthentication backed by ``token_cache``
+    """
+
+    @timed_phase("auth")
+    def authenticate(self, request):
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        entry = token_cache.get(key)
+        if entry is None:
+            try:
+                token = model.objects.select_related("user").get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            token_cache.set(key, token.user)
+            user = token.user
+        else:
+            user = build_user(entry)
+            token = model.from_db(DEFAULT_DB_ALIAS, ["key", "user_id"], [key, user.pk])
+            token.user = user
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return (user, token)
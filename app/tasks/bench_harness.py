@@ -0,0 +1,426 @@
+"""
+Benchmark harness with run history and regression detection
+
+A run sends ``requests`` requests of one named scenario (the load
+generator's list / filter / search / create / mark_done / stats) either
+in-process through the Django test client or over HTTP, and is stored as a
+``BenchmarkRun`` together with environment metadata.
+
+Each run is compared with its baseline: the latest run of the same scenario
+and mode marked ``is_baseline``, or else the previous run. Throughput is
+compared with a one-sided Mann-Whitney U test over per-batch throughputs.
+p95/p99 use a bootstrap confidence interval of the difference. A metric is
+flagged as a regression only when the change is larger than the
+configured threshold *and* statistically significant, so run-to-run noise
+doesn't raise alarms.
+"""
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import time
+
+import django
+import httpx
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import loadgen, seeding
+from .models import BenchmarkRun, Task
+
+DEFAULT_BENCHMARKS = {
+    # Significance level for the regression tests
+    "ALPHA": 0.05,
+    # Relative changes below these are never flagged
+    "THROUGHPUT_DROP": 0.10,
+    "LATENCY_INCREASE": 0.10,
+    # Latency samples stored per run
+    "MAX_SAMPLES": 5000,
+    # Batches the run is split into for throughput samples
+    "BATCHES": 10,
+    "BOOTSTRAP_RESAMPLES": 200,
+}
+
+SCENARIOS = loadgen.SCENARIOS
+
+
+def get_config():
+    return {**DEFAULT_BENCHMARKS, **getattr(settings, "BENCHMARKS", {})}
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(len(sorted_values) * percent / 100))
+    return sorted_values[rank - 1]
+
+
+def batch_throughputs(finish_times, batches):
+    """
+    Requests per second in consecutive batches of completions
+
+    ``finish_times`` are seconds from the start of the run.
+    """
+    finish_times = sorted(finish_times)
+    size = max(1, len(finish_times) // batches)
+    throughputs = []
+    previous = 0.0
+    for end in range(size, len(finish_times) + 1, size):
+        elapsed = finish_times[end - 1] - previous
+        if elapsed > 0:
+            throughputs.append(round(size / elapsed, 3))
+        previous = finish_times[end - 1]
+    return throughputs
+
+
+class RunResult:
+    """Raw measurements of one run, before it is stored"""
+
+    def __init__(self, scenario, mode):
+        self.scenario = scenario
+        self.mode = mode
+        self.latencies_ms = []
+        self.finish_times = []
+        self.errors = 0
+        self.duration_s = 0.0
+
+    def record(self, started, sent, finished, failed):
+        self.latencies_ms.append((finished - sent) * 1000)
+        self.finish_times.append(finished - started)
+        if failed:
+            self.errors += 1
+
+    def summary(self):
+        latencies = sorted(self.latencies_ms)
+        count = len(latencies)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "duration_s": round(self.duration_s, 3),
+            "throughput_rps": (
+                round(count / self.duration_s, 2) if self.duration_s else 0
+            ),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+        }
+
+
+def run_inprocess(scenario, requests=500, tasks=200, warmup=20, seed=0):
+    """
+    Run a scenario through the Django test client
+
+    Needs a database it can write to; the ``benchmark`` command runs this
+    inside a throwaway test database.
+    """
+    rng = random.Random(seed)
+    owner = User.objects.create_user(
+        username=f"bench-{scenario}-{rng.getrandbits(32):08x}",
+        password="benchpass123",
+    )
+    created = Task.objects.bulk_create(
+        Task(
+            title=f"Bench {rng.choice(loadgen.SEARCH_TERMS)} {i}",
+            description="Benchmark task",
+            status=("TODO", "IN_PROGRESS", "DONE")[i % 3],
+            priority=("LOW", "MEDIUM", "HIGH")[i % 3],
+            owner=owner,
+        )
+        for i in range(tasks)
+    )
+    token = Token.objects.create(user=owner)
+    user = loadgen.VirtualUser(owner.username, token.key, [t.pk for t in created])
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def send():
+        kind, method, path, body = loadgen.build_request(scenario, user, rng)
+        response = client.generic(
+            method,
+            path,
+            json.dumps(body) if body is not None else "",
+            content_type="application/json",
+        )
+        if kind == "create" and response.status_code == 201:
+            user.task_ids.append(json.loads(response.content)["id"])
+        return loadgen.is_error(response.status_code)
+
+    for _ in range(warmup):
+        send()
+
+    result = RunResult(scenario, "inprocess")
+    started = time.perf_counter()
+    for _ in range(requests):
+        sent = time.perf_counter()
+        failed = send()
+        result.record(started, sent, time.perf_counter(), failed)
+    result.duration_s = time.perf_counter() - started
+    return result
+
+
+def run_http(scenario, base_url, tokens, requests=500, concurrency=10, seed=0):
+    """
+    Run a scenario against a live server with ``concurrency`` closed-loop
+    clients, each its own user from ``tokens``
+
+    Registering the users through the API would run into its register
+    throttle, so the tokens are created out of band (see
+    ``provision_tokens``).
+    """
+    if len(tokens) < concurrency:
+        raise ValueError(f"Need {concurrency} tokens, got {len(tokens)}")
+
+    async def run():
+        rng = random.Random(seed)
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(
+            base_url=base_url, timeout=30, limits=limits
+        ) as client:
+            users = await loadgen.load_users(client, tokens[:concurrency])
+
+            result = RunResult(scenario, "http")
+            remaining = [requests]
+            started = time.perf_counter()
+
+            async def worker(user):
+                while remaining[0] > 0:
+                    remaining[0] -= 1
+                    kind, method, path, body = loadgen.build_request(
+                        scenario, user, rng
+                    )
+                    sent = time.perf_counter()
+                    try:
+                        response = await client.request(
+                            method, path, json=body, headers=user.headers
+                        )
+                        failed = loadgen.is_error(response.status_code)
+                    except httpx.HTTPError:
+                        response, failed = None, True
+                    result.record(started, sent, time.perf_counter(), failed)
+                    if kind == "create" and response is not None:
+                        if response.status_code == 201:
+                            user.task_ids.append(response.json()["id"])
+
+            await asyncio.gather(*(worker(user) for user in users))
+            result.duration_s = time.perf_counter() - started
+            return result
+
+    return asyncio.run(run())
+
+
+def provision_tokens(count):
+    """
+    API tokens for ``count`` new users, created through the ORM
+
+    Only useful when this process shares the server's database, as the
+    ``benchmark`` command does when run inside the api container.
+    """
+    return seeding.create_tokens(seeding.create_owners(count, prefix="bench"))
+
+
+def git_commit():
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def collect_environment(**extra):
+    """Where and on what a run happened"""
+    return {
+        "git_commit": git_commit(),
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "cpu_count": os.cpu_count(),
+        "database": connection.vendor,
+        "cache": settings.CACHES["default"]["BACKEND"],
+        **extra,
+    }
+
+
+def mann_whitney_greater(x, y):
+    """
+    One-sided p-value that values in ``x`` tend to be larger than in ``y``
+
+    Normal approximation with tie and continuity correction.
+    """
+    n1, n2 = len(x), len(y)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(value, 0) for value in x] + [(value, 1) for value in y])
+    n = n1 + n2
+    rank_sum = 0.0
+    tie_term = 0
+    i = 0
+    while i < n:
+        j = i
+        while j < n and combined[j][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j + 1) / 2
+        rank_sum += average_rank * sum(1 for k in range(i, j) if combined[k][1] == 0)
+        tie_term += (j - i) ** 3 - (j - i)
+        i = j
+
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 1 - statistics.NormalDist().cdf(z)
+
+
+def bootstrap_difference(current, baseline, percent, resamples, rng):
+    """95% confidence interval for percentile(current) - percentile(baseline)"""
+    differences = []
+    for _ in range(resamples):
+        a = sorted(rng.choices(current, k=len(current)))
+        b = sorted(rng.choices(baseline, k=len(baseline)))
+        differences.append(percentile(a, percent) - percentile(b, percent))
+    differences.sort()
+    low = differences[int(resamples * 0.025)]
+    high = differences[min(resamples - 1, int(resamples * 0.975))]
+    return low, high
+
+
+def _change(current, baseline):
+    if not baseline:
+        return None
+    return round((current - baseline) / baseline * 100, 2)
+
+
+def compare(run, baseline, config=None):
+    """Compare a run with its baseline; returns the comparison dict"""
+    config = config or get_config()
+    rng = random.Random(0)
+
+    throughput_p = mann_whitney_greater(
+        baseline.throughput_samples, run.throughput_samples
+    )
+    throughput_change = _change(run.throughput_rps, baseline.throughput_rps)
+    comparison = {
+        "baseline_id": str(baseline.pk),
+        "throughput_rps": {
+            "baseline": baseline.throughput_rps,
+            "current": run.throughput_rps,
+            "change_pct": throughput_change,
+            "p_value": round(throughput_p, 6),
+            "regression": (
+                throughput_change is not None
+                and throughput_change < -config["THROUGHPUT_DROP"] * 100
+                and throughput_p < config["ALPHA"]
+            ),
+        },
+    }
+
+    for percent in (95, 99):
+        field = f"p{percent}_ms"
+        current, previous = getattr(run, field), getattr(baseline, field)
+        change = _change(current, previous)
+        regression = False
+        interval = None
+        if run.latency_samples and baseline.latency_samples:
+            interval = bootstrap_difference(
+                run.latency_samples,
+                baseline.latency_samples,
+                percent,
+                config["BOOTSTRAP_RESAMPLES"],
+                rng,
+            )
+            regression = (
+                change is not None
+                and change > config["LATENCY_INCREASE"] * 100
+                and interval[0] > 0
+            )
+        comparison[field] = {
+            "baseline": previous,
+            "current": current,
+            "change_pct": change,
+            "ci_ms": [round(v, 3) for v in interval] if interval else None,
+            "regression": regression,
+        }
+    return comparison
+
+
+def find_baseline(scenario, mode, exclude=None):
+    runs = BenchmarkRun.objects.filter(scenario=scenario, mode=mode)
+    if exclude is not None:
+        runs = runs.exclude(pk=exclude)
+    return runs.filter(is_baseline=True).first() or runs.first()
+
+
+def save_run(result, environment=None, baseline=None, set_baseline=False):
+    """Store a run, compare it with its baseline and return the BenchmarkRun"""
+    config = get_config()
+    samples = [round(v, 3) for v in result.latencies_ms]
+    if len(samples) > config["MAX_SAMPLES"]:
+        samples = random.Random(0).sample(samples, config["MAX_SAMPLES"])
+
+    run = BenchmarkRun(
+        scenario=result.scenario,
+        mode=result.mode,
+        latency_samples=samples,
+        throughput_samples=batch_throughputs(result.finish_times, config["BATCHES"]),
+        environment=environment or collect_environment(),
+        is_baseline=set_baseline,
+        **result.summary(),
+    )
+    if baseline is None:
+        baseline = find_baseline(result.scenario, result.mode)
+    if baseline is not None:
+        run.baseline = baseline
+        run.comparison = compare(run, baseline, config)
+        run.regression = any(
+            value["regression"]
+            for value in run.comparison.values()
+            if isinstance(value, dict)
+        )
+    if set_baseline:
+        BenchmarkRun.objects.filter(
+            scenario=run.scenario, mode=run.mode, is_baseline=True
+        ).update(is_baseline=False)
+    run.save()
+    return run
+
+
+def latest_run_summary():
+    """Latest run with its deltas against its baseline, or None"""
+    run = BenchmarkRun.objects.defer("latency_samples").first()
+    if run is None:
+        return None
+    return {
+        "id": str(run.pk),
+        "scenario": run.scenario,
+        "mode": run.mode,
+        "created_at": run.created_at.isoformat(),
+        "requests": run.requests,
+        "errors": run.errors,
+        "throughput_rps": run.throughput_rps,
+        "p50_ms": run.p50_ms,
+        "p95_ms": run.p95_ms,
+        "p99_ms": run.p99_ms,
+        "git_commit": run.environment.get("git_commit"),
+        "regression": run.regression,
+        "delta": {
+            key: value["change_pct"]
+            for key, value in run.comparison.items()
+            if isinstance(value, dict)
+        },
+    }
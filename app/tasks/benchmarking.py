@@ -0,0 +1,53 @@
+"""
+Helpers shared by the benchmark management commands
+"""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test import override_settings
+
+
+@contextmanager
+def temporary_test_database():
+    """
+    Run the block against a throwaway test database (in-memory for SQLite),
+    the same way the Django test runner does
+
+    Reads go to the primary too, since read aliases still point at the
+    real database.
+    """
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(DATABASE_READ_ALIASES=[]):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        # SQLite ignores close() on in-memory databases, so the connection
+        # still points at the test database until it's closed by name
+        connection.close()
+
+
+def time_call(func, repeat=20, warmup=2):
+    """
+    Call ``func`` ``repeat`` times and return timing stats in milliseconds
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    samples.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.mean(samples), 3),
+        "max_ms": round(samples[-1], 3),
+    }
@@ -0,0 +1,136 @@
+"""
+Compact value encoding for the django-redis cache
+
+``CompactSerializer`` stores values as MessagePack (marked with a leading
+``0xc1`` byte, which starts neither a msgpack nor a pickle payload) and
+falls back to pickle for anything msgpack can't round-trip exactly, such
+as model instances. ``ThresholdCompressor`` compresses payloads above
+``COMPRESS_MIN_LENGTH`` bytes with zstd (zlib if zstandard isn't
+installed).
+
+Both read values written by the stock pickle serializer, so existing keys
+stay readable after switching. Workers on the stock serializer can't read
+compact values, so the ``COMPACT_WRITES`` option is off by default (read
+both, write plain pickle); turn it on once every worker has this codec.
+"""
+import datetime
+import uuid
+import zlib
+
+import msgpack
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.pickle import PickleSerializer
+
+from .msgpack_codec import UUID_EXT_TYPE
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+MSGPACK_MARKER = b"\xc1"
+
+# Ext types for containers msgpack would otherwise turn into lists
+SET_EXT_TYPE = 2
+FROZENSET_EXT_TYPE = 3
+TUPLE_EXT_TYPE = 4
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _default(obj):
+    """Encode only what decodes back to an equal object of the same type"""
+    kind = type(obj)
+    if kind is uuid.UUID:
+        return msgpack.ExtType(UUID_EXT_TYPE, obj.bytes)
+    if kind is set:
+        return msgpack.ExtType(SET_EXT_TYPE, _pack(list(obj)))
+    if kind is frozenset:
+        return msgpack.ExtType(FROZENSET_EXT_TYPE, _pack(list(obj)))
+    if kind is tuple:
+        return msgpack.ExtType(TUPLE_EXT_TYPE, _pack(list(obj)))
+    if kind is datetime.datetime and obj.tzinfo is datetime.timezone.utc:
+        return msgpack.Timestamp.from_datetime(obj)
+    if isinstance(obj, dict):
+        # OrderedDict / DRF ReturnDict: keep the items, not the subclass
+        return dict(obj)
+    raise TypeError(f"{kind.__name__} needs pickle")
+
+
+def _ext_hook(code, data):
+    if code == UUID_EXT_TYPE:
+        return uuid.UUID(bytes=data)
+    if code == SET_EXT_TYPE:
+        return set(_unpack(data))
+    if code == FROZENSET_EXT_TYPE:
+        return frozenset(_unpack(data))
+    if code == TUPLE_EXT_TYPE:
+        return tuple(_unpack(data))
+    return msgpack.ExtType(code, data)
+
+
+def _pack(value):
+    return msgpack.packb(value, default=_default, use_bin_type=True, strict_types=True)
+
+
+def _unpack(payload):
+    return msgpack.unpackb(
+        payload, ext_hook=_ext_hook, timestamp=3, raw=False, strict_map_key=False
+    )
+
+
+class CompactSerializer(PickleSerializer):
+    """MessagePack serializer with a pickle fallback"""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.compact_writes = options.get("COMPACT_WRITES", False)
+
+    def dumps(self, value):
+        if not self.compact_writes:
+            return super().dumps(value)
+        try:
+            return MSGPACK_MARKER + _pack(value)
+        except (TypeError, ValueError, OverflowError):
+            return super().dumps(value)
+
+    def loads(self, value):
+        if value[:1] == MSGPACK_MARKER:
+            return _unpack(value[1:])
+        return super().loads(value)
+
+
+def _is_zlib(value):
+    return len(value) > 2 and value[0] == 0x78 and (value[0] * 256 + value[1]) % 31 == 0
+
+
+class ThresholdCompressor(BaseCompressor):
+    """zstd (or zlib) for payloads longer than ``COMPRESS_MIN_LENGTH``"""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.min_length = int(options.get("COMPRESS_MIN_LENGTH", 512))
+        self.level = int(options.get("COMPRESS_LEVEL", 3))
+        self.compact_writes = options.get("COMPACT_WRITES", False)
+
+    def compress(self, value):
+        if not self.compact_writes or len(value) <= self.min_length:
+            return value
+        if zstandard is not None:
+            return zstandard.compress(value, self.level)
+        return zlib.compress(value, self.level)
+
+    def decompress(self, value):
+        if value[:4] == ZSTD_MAGIC and zstandard is not None:
+            try:
+                return zstandard.decompress(value)
+            except zstandard.ZstdError as e:
+                raise CompressorError(e)
+        if _is_zlib(value):
+            try:
+                return zlib.decompress(value)
+            except zlib.error as e:
+                raise CompressorError(e)
+        # Not compressed (short value, or a pickle written before the switch)
+        raise CompressorError("value is not compressed")
@@ -0,0 +1,237 @@
+"""
+Circuit breaker around Redis
+
+After ``FAILURE_THRESHOLD`` consecutive Redis errors the breaker opens and
+callers skip Redis for ``RESET_TIMEOUT`` seconds. Then one call is let
+through as a half-open probe: success closes the breaker, failure opens it
+again. Together with the short socket timeouts in ``CACHES`` a Redis
+brownout costs requests at most a few hundred milliseconds each, then
+nothing.
+
+``guarded_cache`` is the Django cache behind the breaker, falling back to
+an in-process cache while it is open. The metrics middleware, the
+aggregator and the cache helpers use it instead of ``django.core.cache``.
+Invalidations (``delete``, ``set_tombstone``) that can't reach Redis are
+queued and replayed before the next call once it is reachable again, so
+revoked tokens or changed tasks aren't served from Redis after an outage.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+from .server_timing import timed_phase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REDIS_CIRCUIT_BREAKER = {
+    "FAILURE_THRESHOLD": 5,
+    "RESET_TIMEOUT": 10,
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def get_config():
+    return {
+        **DEFAULT_REDIS_CIRCUIT_BREAKER,
+        **getattr(settings, "REDIS_CIRCUIT_BREAKER", {}),
+    }
+
+
+class CircuitOpen(Exception):
+    """Raised by ``CircuitBreaker.call`` when the call is not allowed"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    def __init__(self, name):
+        self.name = name
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go ahead (claims the probe when half-open)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < get_config()["RESET_TIMEOUT"]:
+                    return False
+                self.state = HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Circuit breaker {self.name} closed")
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error) if error is not None else None
+            self._probing = False
+            if (
+                self.state == HALF_OPEN
+                or self.failures >= get_config()["FAILURE_THRESHOLD"]
+            ):
+                if self.state != OPEN:
+                    logger.warning(
+                        f"Circuit breaker {self.name} opened: {self.last_error}"
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def call(self, func, *args, **kwargs):
+        """Run ``func`` through the breaker; raises CircuitOpen if skipped"""
+        if not self.allow():
+            raise CircuitOpen(self.name)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def status(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.last_error = None
+            self._probing = False
+
+
+redis_breaker = CircuitBreaker("redis")
+
+
+class GuardedCache:
+    """
+    Django cache calls through a circuit breaker
+
+    While the breaker is open, or a call fails, the same call goes to an
+    in-process cache so callers keep working per worker. Invalidations are
+    also applied to that cache, and the ones Redis missed are kept (the
+    latest per key, at most ``max_pending``) for replay.
+    """
+
+    def __init__(self, cache, breaker, fallback=None, max_pending=10000):
+        self.cache = cache
+        self.breaker = breaker
+        self.fallback = fallback or LocMemCache(
+            "redis-fallback", {"OPTIONS": {"MAX_ENTRIES": 10000}}
+        )
+        self.max_pending = max_pending
+        self._pending = OrderedDict()
+        self._pending_lock = threading.Lock()
+
+    def _queue(self, method, key, args):
+        with self._pending_lock:
+            self._pending.pop(key, None)
+            self._pending[key] = (method, args)
+            if len(self._pending) > self.max_pending:
+                dropped, _ = self._pending.popitem(last=False)
+                logger.error(f"Too many pending cache invalidations, dropped {dropped}")
+
+    def _replay_pending(self):
+        """Apply queued invalidations to Redis, oldest first, until one fails"""
+        while True:
+            with self._pending_lock:
+                if not self._pending:
+                    return
+                key, (method, args) = next(iter(self._pending.items()))
+            try:
+                self.breaker.call(getattr(self.cache, method), key, *args)
+            except CircuitOpen:
+                return
+            except Exception as e:
+                logger.error(f"Cache invalidation replay failed: {e}")
+                return
+            with self._pending_lock:
+                # Unless a newer invalidation of the key was queued meanwhile
+                if self._pending.get(key) == (method, args):
+                    del self._pending[key]
+
+    def pending_invalidations(self):
+        return len(self._pending)
+
+    @timed_phase("cache")
+    def _invalidate(self, method, key, *args):
+        if self._pending:
+            self._replay_pending()
+        # Entries cached locally during an earlier outage must go too
+        getattr(self.fallback, method)(key, *args)
+        try:
+            return self.breaker.call(getattr(self.cache, method), key, *args)
+        except CircuitOpen:
+            pass
+        except Exception as e:
+            logger.error(f"Cache {method} failed, queued for replay: {e}")
+        self._queue(method, key, args)
+
+    @timed_phase("cache")
+    def _call(self, method, *args, **kwargs):
+        if self._pending:
+            self._replay_pending()
+        try:
+            return self.breaker.call(getattr(self.cache, method), *args, **kwargs)
+        except CircuitOpen:
+            pass
+        except Exception as e:
+            logger.error(f"Cache {method} failed, using local fallback: {e}")
+        return getattr(self.fallback, method)(*args, **kwargs)
+
+    def get(self, key, default=None):
+        return self._call("get", key, default)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        return self._call("set", key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT):
+        return self._call("add", key, value, timeout)
+
+    def delete(self, key):
+        return self._invalidate("delete", key)
+
+    def set_tombstone(self, key, value, timeout=DEFAULT_TIMEOUT):
+        """``set`` of an invalidation marker, queued for replay like ``delete``"""
+        return self._invalidate("set", key, value, timeout)
+
+    def get_many(self, keys):
+        return self._call("get_many", keys)
+
+    def clear(self):
+        self.fallback.clear()
+        with self._pending_lock:
+            self._pending.clear()
+        return self._call("clear")
+
+
+guarded_cache = GuardedCache(cache, redis_breaker)
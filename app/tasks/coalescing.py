@@ -0,0 +1,218 @@
+"""
+Request coalescing (singleflight) with stale-while-revalidate
+
+``@coalesced(name)`` wraps a DRF view returning a ``Response``. Results are
+kept in the default cache for ``TTL`` seconds and may be served stale for
+another ``STALE_TTL`` seconds while one caller recomputes them.
+
+Only one computation runs per key at a time: threads of the same worker
+wait for the one in flight (per-process lock), and workers coordinate with
+a lock key in the cache (``cache.add``, i.e. ``SET NX`` on Redis) so the
+others wait for the leader's result instead of recomputing it.
+
+Keys include a generation per view name and user that ``invalidate`` moves
+on, so it drops the results for every query string at once. Only 2xx
+responses are stored.
+"""
+import functools
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.http import HttpRequest
+from rest_framework.request import Request
+from rest_framework.response import Response
+from .circuit_breaker import guarded_cache as cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSE_COALESCING = {
+    "ENABLED": True,
+    # Seconds a result is fresh, then may be served stale while refreshing
+    "TTL": 2,
+    "STALE_TTL": 30,
+    # Seconds the cross-worker lock is held at most / followers wait for it
+    "LOCK_TIMEOUT": 10,
+    "WAIT_TIMEOUT": 5,
+}
+
+KEY_PREFIX = "coalesce:"
+
+# Seconds between cache polls while another worker computes
+POLL_INTERVAL = 0.02
+
+# Generations outlive any entry (TTL + STALE_TTL) stored under them
+GENERATION_TTL = 86400
+
+
+def get_config(**overrides):
+    return {
+        **DEFAULT_RESPONSE_COALESCING,
+        **getattr(settings, "RESPONSE_COALESCING", {}),
+        **overrides,
+    }
+
+
+def _generation_key(name, user_id=None):
+    return f"{KEY_PREFIX}gen:{name}:{user_id or ''}"
+
+
+def get_generation(name, user_id=None):
+    try:
+        return cache.get(_generation_key(name, user_id)) or ""
+    except Exception as e:
+        logger.error(f"Coalescing generation read failed: {e}")
+        return ""
+
+
+def make_key(name, user_id=None, query="", generation=""):
+    return f"{KEY_PREFIX}{name}:{user_id or ''}:{generation}:{query}"
+
+
+def invalidate(name, user_id=None):
+    """Drop the cached results (all query strings) so the next calls recompute"""
+    try:
+        cache.set_tombstone(
+            _generation_key(name, user_id), uuid.uuid4().hex[:12], GENERATION_TTL
+        )
+    except Exception as e:
+        logger.error(f"Coalescing invalidate failed: {e}")
+
+
+class _Flight:
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _cache_get(key):
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.error(f"Coalescing cache read failed: {e}")
+        return None
+
+
+def _acquire_lock(key, config):
+    try:
+        return cache.add(key + ":lock", 1, config["LOCK_TIMEOUT"])
+    except Exception as e:
+        # No shared lock without the cache; compute locally
+        logger.error(f"Coalescing lock failed: {e}")
+        return True
+
+
+def _release_lock(key):
+    try:
+        cache.delete(key + ":lock")
+    except Exception as e:
+        logger.error(f"Coalescing unlock failed: {e}")
+
+
+def _wait_for_entry(key, config):
+    """Poll for the result another worker is computing"""
+    deadline = time.monotonic() + config["WAIT_TIMEOUT"]
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = _cache_get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def _compute(view, args, kwargs, key, config):
+    """Run the view and store its result if successful; returns the cache entry"""
+    response = view(*args, **kwargs)
+    entry = {
+        "data": response.data,
+        "status": response.status_code,
+        "stored_at": time.time(),
+    }
+    if not 200 <= response.status_code < 300:
+        return entry
+    try:
+        cache.set(key, entry, config["TTL"] + config["STALE_TTL"])
+    except Exception as e:
+        logger.error(f"Coalescing cache write failed: {e}")
+    return entry
+
+
+def _load(view, args, kwargs, key, config):
+    """Return a fresh or stale entry, computing at most once per key"""
+    entry = _cache_get(key)
+    now = time.time()
+    if entry is not None and now - entry["stored_at"] < config["TTL"]:
+        return entry
+
+    locked = _acquire_lock(key, config)
+    if not locked:
+        if entry is not None:
+            # Someone else is revalidating; serve the stale result
+            return entry
+        entry = _wait_for_entry(key, config)
+        if entry is not None:
+            return entry
+
+    try:
+        return _compute(view, args, kwargs, key, config)
+    finally:
+        if locked:
+            _release_lock(key)
+
+
+def coalesced(name, vary_on_user=False, **options):
+    """
+    Coalesce concurrent calls of a DRF view into one computation
+
+    ``vary_on_user`` keys results per authenticated user; the query string
+    is always part of the key. ``options`` override ``RESPONSE_COALESCING``
+    (``TTL``, ``STALE_TTL``, ...) for this view.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            config = get_config(**options)
+            if not config["ENABLED"]:
+                return view(*args, **kwargs)
+
+            request = next(a for a in args if isinstance(a, (HttpRequest, Request)))
+            user_id = request.user.pk if vary_on_user else None
+            key = make_key(
+                name,
+                user_id,
+                request.META.get("QUERY_STRING", ""),
+                get_generation(name, user_id),
+            )
+
+            with _flights_lock:
+                flight = _flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _flights[key] = _Flight()
+
+            if leader:
+                try:
+                    flight.result = _load(view, args, kwargs, key, config)
+                finally:
+                    with _flights_lock:
+                        _flights.pop(key, None)
+                    flight.done.set()
+            elif not flight.done.wait(config["WAIT_TIMEOUT"]) or not flight.result:
+                # The leader failed or is too slow; compute independently
+                return view(*args, **kwargs)
+
+            entry = flight.result
+            return Response(entry["data"], status=entry["status"])
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,125 @@
+"""
+Database routers for Task Manager
+
+TaskShardRouter places Task rows on the owner's shard (see sharding.py)
+when TASK_SHARDS is set. ReadWriteRouter handles everything else: reads
+go to the aliases in ``settings.DATABASE_READ_ALIASES`` (a read-only
+SQLite connection or replicas), writes go to ``default``. Once a request
+has written, or for unsafe HTTP methods, its reads stick to ``default`` so
+clients always read their own writes.
+"""
+import contextvars
+import itertools
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from . import sharding
+from .models import ArchivedTask, Task
+
+# Models stored on the owner's shard
+SHARDED_MODELS = (Task, ArchivedTask)
+
+# Per-request routing state, set by ReadYourWritesMiddleware
+_request_state = contextvars.ContextVar("db_route_state", default=None)
+
+_round_robin = itertools.count()
+
+
+def pin_to_primary():
+    """Send the rest of the current request's reads to the primary"""
+    state = _request_state.get()
+    if state is not None:
+        state["pinned"] = True
+
+
+def start_request(pinned=False):
+    return _request_state.set({"pinned": pinned})
+
+
+def end_request(token):
+    _request_state.reset(token)
+
+
+def is_pinned():
+    state = _request_state.get()
+    return bool(state and state["pinned"])
+
+
+class ReadWriteRouter:
+    """Route reads to read aliases and writes to the primary"""
+
+    def _read_aliases(self):
+        return getattr(settings, "DATABASE_READ_ALIASES", [])
+
+    def db_for_read(self, model, **hints):
+        aliases = self._read_aliases()
+        if not aliases or is_pinned():
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction must see its uncommitted writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return aliases[next(_round_robin) % len(aliases)]
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *self._read_aliases()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in self._read_aliases():
+            return False
+        return None
+
+
+class TaskShardRouter:
+    """
+    Route Task rows to their owner's shard
+
+    Only decides when the owner is known from the hints (a Task instance,
+    or the User of a ``user.tasks`` relation). Owner-scoped queries in
+    views use ``sharding.task_queryset``; cross-owner jobs (archiving,
+    resharding) loop over ``sharding.get_shards()`` themselves.
+    """
+
+    def _shard_from_hints(self, model, hints):
+        if model not in SHARDED_MODELS or not sharding.is_enabled():
+            return None
+
+        instance = hints.get("instance")
+        if isinstance(instance, SHARDED_MODELS) and instance.owner_id is not None:
+            return sharding.shard_for_owner(instance.owner_id)
+        if isinstance(instance, get_user_model()) and instance.pk is not None:
+            return sharding.shard_for_owner(instance.pk)
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._shard_from_hints(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._shard_from_hints(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        shards = sharding.get_shards()
+        if not shards:
+            return None
+        pool = {
+            DEFAULT_DB_ALIAS,
+            *shards,
+            *getattr(settings, "DATABASE_READ_ALIASES", []),
+        }
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == DEFAULT_DB_ALIAS or db not in sharding.get_shards():
+            return None
+        # Extra shards only hold the task tables
+        return app_label == "tasks" and model_name in ("task", "archivedtask")
@@ -0,0 +1,112 @@
+"""
+Read-only fast path for Task representations.
+
+Builds the same output as ``TaskSerializer`` from ``values_list()`` rows
+instead of model instances, skipping DRF's field-by-field
+``to_representation``. The owner username is joined in SQL.
+"""
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.settings import ISO_8601, api_settings
+
+from .serializers import TaskSerializer
+from .server_timing import timed_phase
+
+# (output field, values_list lookup, kind) in TaskSerializer field order
+TASK_FIELDS = (
+    ("id", "id", "uuid"),
+    ("title", "title", None),
+    ("description", "description", None),
+    ("status", "status", None),
+    ("priority", "priority", None),
+    ("due_date", "due_date", "datetime"),
+    ("owner", "owner__username", None),
+    ("created_at", "created_at", "datetime"),
+    ("updated_at", "updated_at", "datetime"),
+)
+
+TASK_FIELD_NAMES = tuple(name for name, _, _ in TASK_FIELDS)
+TASK_VALUES_LOOKUPS = tuple(lookup for _, lookup, _ in TASK_FIELDS)
+OWNER_INDEX = TASK_FIELD_NAMES.index("owner")
+
+
+def is_fast_path_compatible():
+    """
+    True if the fast path output matches TaskSerializer for current settings
+    """
+    return (
+        api_settings.DATETIME_FORMAT == ISO_8601
+        and tuple(TaskSerializer.Meta.fields) == TASK_FIELD_NAMES
+    )
+
+
+def _uuid_converter(value):
+    return None if value is None else str(value)
+
+
+def _make_datetime_converter():
+    """Mirror DRF DateTimeField.to_representation for ISO 8601 output"""
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def convert(value):
+        if value is None:
+            return None
+        if tz is not None:
+            value = value.astimezone(tz)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+class TaskRowSerializer:
+    """
+    Convert Task ``values_list()`` rows into TaskSerializer-shaped dicts
+
+    Converters are compiled once per instance (the datetime converter
+    captures the active timezone), so create one per request. With
+    ``native=True`` UUIDs and datetimes are left as objects for renderers
+    that encode them natively (MessagePack). Passing ``owner_username``
+    skips the owner join (all rows belong to that owner).
+    """
+
+    def __init__(self, native=False, owner_username=None):
+        self.owner_username = owner_username
+        self._converted = ()
+        if native:
+            return
+
+        datetime_converter = _make_datetime_converter()
+        kinds = {"uuid": _uuid_converter, "datetime": datetime_converter}
+        converters = tuple(kinds.get(kind) for _, _, kind in TASK_FIELDS)
+
+        # Only convert the columns that need it; plain values pass through
+        self._converted = tuple(
+            (index, converter)
+            for index, converter in enumerate(converters)
+            if converter is not None
+        )
+
+    def get_rows(self, queryset):
+        """Return a values_list queryset with the owner username joined"""
+        if self.owner_username is None:
+            return queryset.values_list(*TASK_VALUES_LOOKUPS)
+        return queryset.values_list(
+            *(lookup for lookup in TASK_VALUES_LOOKUPS if lookup != "owner__username")
+        )
+
+    @timed_phase("serialize")
+    def to_representation(self, row):
+        values = list(row)
+        if self.owner_username is not None:
+            values.insert(OWNER_INDEX, self.owner_username)
+        for index, converter in self._converted:
+            values[index] = converter(values[index])
+        return dict(zip(TASK_FIELD_NAMES, values))
+
+    @timed_phase("serialize")
+    def many(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
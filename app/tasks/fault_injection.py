@@ -0,0 +1,283 @@
+"""
+Server-side fault injection for load tests
+
+Off unless ``FAULT_INJECTION["ENABLED"]`` is set in settings: with it off
+the middleware does nothing and rules are ignored, wherever they come
+from. When enabled, ``FaultInjectionMiddleware`` applies every rule that
+matches the request path (and method) to that rule's ``fraction`` of
+requests:
+
+- ``latency_ms`` (+ up to ``latency_jitter_ms``): sleep before the view
+- ``error_status``: answer with that status instead of calling the view
+- ``db_delay_ms``: sleep before every database query of the request
+- ``redis_failure``: every Redis connection checkout of the request
+  raises ``ConnectionError`` (see ``InstrumentedConnectionPool``), so the
+  circuit breaker and fallbacks get exercised
+
+Rules come from ``FAULT_INJECTION["RULES"]`` and, at runtime, from the
+Redis hash ``REDIS_KEY`` (rule name -> JSON), which every worker rereads
+at most every ``REFRESH_INTERVAL`` seconds. Load tests script scenarios
+with ``manage.py faults`` or by writing the hash directly, e.g.::
+
+    HSET faults:rules slow-list '{"routes": ["^/api/v1/tasks/$"],
+        "fraction": 0.2, "latency_ms": 300, "expires_at": 1760000000}'
+
+Rules past their ``expires_at`` (epoch seconds) are ignored.
+"""
+import contextvars
+import json
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAULT_INJECTION = {
+    "ENABLED": False,
+    "RULES": [],
+    "REDIS_KEY": "faults:rules",
+    "REFRESH_INTERVAL": 1.0,
+    # Upper bound for latency_ms + latency_jitter_ms and db_delay_ms
+    "MAX_DELAY_MS": 30000,
+    "EXCLUDE_PATHS": ("/health", "/status", "/metrics"),
+}
+
+RULE_DEFAULTS = {
+    "routes": [],
+    "methods": [],
+    "fraction": 1.0,
+    "latency_ms": 0,
+    "latency_jitter_ms": 0,
+    "error_status": None,
+    "db_delay_ms": 0,
+    "redis_failure": False,
+    "expires_at": None,
+}
+
+faults_injected = Counter(
+    "taskmgr_faults_injected_total",
+    "Requests given an injected fault",
+    ["fault"],
+)
+
+# Set while a request with a Redis failure fault is being handled
+_redis_failure = contextvars.ContextVar("fault_injection_redis_failure", default=None)
+
+
+def get_config():
+    return {**DEFAULT_FAULT_INJECTION, **getattr(settings, "FAULT_INJECTION", {})}
+
+
+def redis_failure_active():
+    """Name of the rule failing Redis for the current request, if any"""
+    return _redis_failure.get()
+
+
+def normalize_rule(name, rule, config=None):
+    """Validated rule with defaults filled in; raises ValueError"""
+    config = config or get_config()
+    unknown = set(rule) - set(RULE_DEFAULTS) - {"name"}
+    if unknown:
+        raise ValueError(f"Unknown fault rule fields: {', '.join(sorted(unknown))}")
+    rule = {**RULE_DEFAULTS, **rule, "name": name}
+    if not 0 <= rule["fraction"] <= 1:
+        raise ValueError("fraction must be between 0 and 1")
+    for field in ("latency_ms", "latency_jitter_ms", "db_delay_ms"):
+        if rule[field] < 0:
+            raise ValueError(f"{field} can't be negative")
+    if (
+        rule["latency_ms"] + rule["latency_jitter_ms"] > config["MAX_DELAY_MS"]
+        or rule["db_delay_ms"] > config["MAX_DELAY_MS"]
+    ):
+        raise ValueError(f"Delays are capped at {config['MAX_DELAY_MS']}ms")
+    if rule["error_status"] is not None and not 400 <= rule["error_status"] <= 599:
+        raise ValueError("error_status must be a 4xx or 5xx code")
+    for pattern in rule["routes"]:
+        re.compile(pattern)
+    rule["methods"] = [method.upper() for method in rule["methods"]]
+    return rule
+
+
+class FaultPlan:
+    """Faults chosen for one request"""
+
+    def __init__(self, rules, rng):
+        self.names = [rule["name"] for rule in rules]
+        self.latency = sum(
+            rule["latency_ms"] + rng.uniform(0, rule["latency_jitter_ms"])
+            for rule in rules
+        )
+        self.error_status = next(
+            (rule["error_status"] for rule in rules if rule["error_status"]), None
+        )
+        self.db_delay = max(rule["db_delay_ms"] for rule in rules)
+        self.redis_failure = next(
+            (rule["name"] for rule in rules if rule["redis_failure"]), None
+        )
+
+    def faults(self):
+        kinds = []
+        if self.latency:
+            kinds.append("latency")
+        if self.error_status:
+            kinds.append("error")
+        if self.db_delay:
+            kinds.append("db_delay")
+        if self.redis_failure:
+            kinds.append("redis")
+        return kinds
+
+    def _delay_query(self, execute, sql, params, many, context):
+        time.sleep(self.db_delay / 1000)
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def activate(self):
+        """DB delays and Redis failures for the code run inside"""
+        with ExitStack() as stack:
+            if self.db_delay:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self._delay_query))
+            token = _redis_failure.set(self.redis_failure)
+            try:
+                yield
+            finally:
+                _redis_failure.reset(token)
+
+
+class FaultInjector:
+    """Rules from settings and Redis, and the per-request draw"""
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self._runtime_rules = []
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _load_runtime_rules(self, config):
+        # Imported here: redis_client checks redis_failure_active()
+        from .redis_client import get_redis
+
+        client = get_redis()
+        if client is None:
+            return []
+        rules = []
+        for name, raw in client.hgetall(config["REDIS_KEY"]).items():
+            name = name.decode() if isinstance(name, bytes) else name
+            try:
+                rules.append(normalize_rule(name, json.loads(raw), config))
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Ignoring invalid fault rule {name}: {e}")
+        return rules
+
+    def runtime_rules(self, config):
+        now = time.monotonic()
+        with self._lock:
+            fresh = (
+                self._loaded_at is not None
+                and now - self._loaded_at < config["REFRESH_INTERVAL"]
+            )
+            if fresh:
+                return self._runtime_rules
+            self._loaded_at = now
+        try:
+            rules = self._load_runtime_rules(config)
+        except Exception as e:
+            # Fail safe: no runtime faults while the control plane is unreachable
+            logger.error(f"Could not load fault rules: {e}")
+            rules = []
+        with self._lock:
+            self._runtime_rules = rules
+        return rules
+
+    def rules(self, config):
+        static = [
+            normalize_rule(rule.get("name", f"settings-{index}"), rule, config)
+            for index, rule in enumerate(config["RULES"])
+        ]
+        now = time.time()
+        return [
+            rule
+            for rule in static + self.runtime_rules(config)
+            if rule["expires_at"] is None or rule["expires_at"] > now
+        ]
+
+    @staticmethod
+    def matches(rule, request):
+        if rule["methods"] and request.method not in rule["methods"]:
+            return False
+        path = request.path_info
+        return not rule["routes"] or any(
+            re.search(pattern, path) for pattern in rule["routes"]
+        )
+
+    def plan(self, request, config):
+        """FaultPlan for this request, or None to leave it alone"""
+        if request.path_info.rstrip("/") in config["EXCLUDE_PATHS"]:
+            return None
+        firing = [
+            rule
+            for rule in self.rules(config)
+            if self.matches(rule, request) and self.rng.random() < rule["fraction"]
+        ]
+        if not firing:
+            return None
+        plan = FaultPlan(firing, self.rng)
+        for fault in plan.faults():
+            faults_injected.labels(fault=fault).inc()
+        return plan
+
+    def reset(self):
+        with self._lock:
+            self._runtime_rules = []
+            self._loaded_at = None
+
+
+fault_injector = FaultInjector()
+
+
+def _control_client():
+    from .redis_client import get_redis
+
+    client = get_redis()
+    if client is None:
+        raise RuntimeError("Redis is not configured (REDIS_URL)")
+    return client
+
+
+def set_rule(name, rule, ttl=None):
+    """Store a runtime rule; with ``ttl`` it expires after that many seconds"""
+    config = get_config()
+    rule = dict(rule)
+    if ttl:
+        rule["expires_at"] = time.time() + ttl
+    normalize_rule(name, rule, config)
+    _control_client().hset(config["REDIS_KEY"], name, json.dumps(rule))
+    return rule
+
+
+def delete_rules(*names):
+    """Remove the named runtime rules, or all of them"""
+    config = get_config()
+    client = _control_client()
+    if names:
+        return client.hdel(config["REDIS_KEY"], *names)
+    count = client.hlen(config["REDIS_KEY"])
+    client.delete(config["REDIS_KEY"])
+    return count
+
+
+def list_rules():
+    """Runtime rules as stored, by name"""
+    config = get_config()
+    return {
+        (name.decode() if isinstance(name, bytes) else name): json.loads(raw)
+        for name, raw in _control_client().hgetall(config["REDIS_KEY"]).items()
+    }
@@ -0,0 +1,137 @@
+"""
+Background dependency prober for ``/status``
+
+A daemon thread per worker process checks Redis and the database every
+``HEALTH_PROBE["INTERVAL"]`` seconds and keeps a snapshot with each
+dependency's status, probe latency and last success time. ``/status``
+serves that snapshot instead of touching the dependencies per request.
+The thread starts on first use, so it runs in each forked worker.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEALTH_PROBE = {
+    "INTERVAL": 5,
+    # A snapshot older than this means the prober stopped; report unhealthy
+    "STALE_AFTER": 30,
+}
+
+probe_latency = Gauge(
+    "taskmgr_dependency_probe_latency_seconds",
+    "Latency of the last dependency probe",
+    ["dependency"],
+)
+probe_up = Gauge(
+    "taskmgr_dependency_up",
+    "1 if the last dependency probe succeeded",
+    ["dependency"],
+)
+probe_last_success = Gauge(
+    "taskmgr_dependency_last_success_timestamp_seconds",
+    "Unix time of the last successful dependency probe",
+    ["dependency"],
+)
+
+
+def get_config():
+    return {**DEFAULT_HEALTH_PROBE, **getattr(settings, "HEALTH_PROBE", {})}
+
+
+def check_redis():
+    cache.set("health_check", "ok", 10)
+    if cache.get("health_check") != "ok":
+        raise RuntimeError("read back a different value")
+
+
+def check_database():
+    connection = connections["default"]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    finally:
+        # Honour CONN_MAX_AGE like request_finished does for requests
+        connection.close_if_unusable_or_obsolete()
+
+
+class DependencyProber:
+    """Periodically probe dependencies and keep the latest results"""
+
+    def __init__(self, checks=None):
+        self.checks = checks or {"redis": check_redis, "database": check_database}
+        self._results = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def probe(self, name):
+        """Run one check and record its result"""
+        start = time.perf_counter()
+        try:
+            self.checks[name]()
+            error = None
+        except Exception as e:
+            error = str(e)
+        latency = time.perf_counter() - start
+        now = time.time()
+
+        previous = self._results.get(name, {})
+        result = {
+            "status": "ok" if error is None else f"error: {error}",
+            "latency_ms": round(latency * 1000, 2),
+            "checked_at": now,
+            "last_success": now if error is None else previous.get("last_success"),
+        }
+        self._results[name] = result
+
+        probe_latency.labels(dependency=name).set(latency)
+        probe_up.labels(dependency=name).set(1 if error is None else 0)
+        if error is None:
+            probe_last_success.labels(dependency=name).set(now)
+        else:
+            logger.warning(f"Dependency probe failed: {name} - {error}")
+        return result
+
+    def probe_all(self):
+        for name in self.checks:
+            self.probe(name)
+
+    def _run(self):
+        while True:
+            time.sleep(get_config()["INTERVAL"])
+            try:
+                self.probe_all()
+            except Exception as e:
+                logger.error(f"Dependency prober error: {e}")
+
+    def ensure_started(self):
+        """Probe once synchronously, then keep probing in the background"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not self._results:
+                self.probe_all()
+            self._thread = threading.Thread(
+                target=self._run, name="dependency-prober", daemon=True
+            )
+            self._thread.start()
+
+    def snapshot(self):
+        """Latest result per dependency, marking stale ones as errors"""
+        self.ensure_started()
+        stale_before = time.time() - get_config()["STALE_AFTER"]
+        snapshot = {}
+        for name, result in self._results.items():
+            if result["checked_at"] < stale_before:
+                result = {**result, "status": "error: probe result is stale"}
+            snapshot[name] = result
+        return snapshot
+
+
+dependency_prober = DependencyProber()
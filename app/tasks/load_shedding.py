@@ -0,0 +1,187 @@
+"""
+Adaptive load shedding
+
+Each worker process tracks the p95 latency of requests completed in the
+last few seconds, how long the current request waited in front of the
+worker, and its in-flight requests. When one of them passes its limit
+(``LATENCY_THRESHOLD_MS``, ``MAX_QUEUE_MS``, ``MAX_IN_FLIGHT``) the worker is
+under pressure and ``LoadSheddingMiddleware`` turns away requests by
+priority: task list/search first, then other reads, then writes as the
+pressure grows. Health, status and metrics endpoints are never shed.
+
+Queue time comes from the ``X-Request-Start`` header a proxy in front of
+gunicorn can set (nginx: ``proxy_set_header X-Request-Start "t=${msec}";``);
+without one that signal is off. The in-flight limit is off by default:
+gunicorn's sync workers handle one request at a time and threaded workers
+at most one per thread, so requests queue in front of the worker rather
+than inside it. Set it only for workers that take on more concurrent
+requests than they can serve (gevent, ASGI).
+"""
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from prometheus_client import Counter, Gauge
+
+from .metrics_aggregator import MetricsAggregator
+
+DEFAULT_LOAD_SHEDDING = {
+    "ENABLED": False,
+    # None: no in-flight limit (see above)
+    "MAX_IN_FLIGHT": None,
+    "LATENCY_THRESHOLD_MS": MetricsAggregator.P95_LATENCY_THRESHOLD,
+    "MAX_QUEUE_MS": 100,
+    "QUEUE_START_HEADER": "HTTP_X_REQUEST_START",
+    # Completed requests older than this stop counting towards the estimate
+    "LATENCY_WINDOW": 10,
+    "RETRY_AFTER": 1,
+    "CRITICAL_PATHS": ("/health", "/status", "/metrics"),
+    "LOW_PRIORITY_PATHS": (r"^/api/v1/tasks/$",),
+}
+
+# Priorities, lowest first
+LOW = "low"
+NORMAL = "normal"
+HIGH = "high"
+CRITICAL = "critical"
+
+# Pressure (load / limit) at which each priority starts being shed
+SHED_AT = {LOW: 1.0, NORMAL: 1.5, HIGH: 2.0}
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Minimum completed requests before the latency estimate is trusted
+MIN_SAMPLES = 10
+
+shed_requests = Counter(
+    "taskmgr_load_shed_requests_total",
+    "Requests rejected by load shedding",
+    ["priority"],
+)
+in_flight_requests = Gauge(
+    "taskmgr_in_flight_requests",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+
+
+def get_config():
+    return {**DEFAULT_LOAD_SHEDDING, **getattr(settings, "LOAD_SHEDDING", {})}
+
+
+def request_priority(request, config):
+    """Classify a request: health checks, writes, reads, list/search"""
+    path = request.path_info
+    if path.rstrip("/") in config["CRITICAL_PATHS"]:
+        return CRITICAL
+    if request.method not in SAFE_METHODS:
+        return HIGH
+    if any(re.match(pattern, path) for pattern in config["LOW_PRIORITY_PATHS"]):
+        return LOW
+    return NORMAL
+
+
+def queue_time_ms(request, config, now=None):
+    """
+    Milliseconds between the proxy receiving the request and now, or None
+
+    Accepts ``t=<epoch>`` or a bare epoch in seconds, milliseconds or
+    microseconds, as set by nginx, HAProxy or Heroku's router.
+    """
+    value = request.META.get(config["QUEUE_START_HEADER"], "").strip()
+    if value.startswith("t="):
+        value = value[2:]
+    try:
+        started = float(value)
+    except ValueError:
+        return None
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    now = time.time() if now is None else now
+    return max(0.0, (now - started) * 1000)
+
+
+class LoadShedder:
+    """In-flight count and recent latency estimate for one worker process"""
+
+    # Seconds between p95 recalculations
+    ESTIMATE_INTERVAL = 0.5
+
+    def __init__(self, max_samples=500):
+        self.in_flight = 0
+        self.shed = {LOW: 0, NORMAL: 0, HIGH: 0}
+        self._samples = deque(maxlen=max_samples)
+        self._p95 = 0.0
+        self._estimated_at = 0.0
+        self._lock = threading.Lock()
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, latency_ms):
+        with self._lock:
+            self.in_flight -= 1
+            self._samples.append((time.monotonic(), latency_ms))
+
+    def latency_estimate(self, window):
+        """p95 of requests completed in the last ``window`` seconds"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._estimated_at < self.ESTIMATE_INTERVAL:
+                return self._p95
+            while self._samples and self._samples[0][0] < now - window:
+                self._samples.popleft()
+            latencies = sorted(latency for _, latency in self._samples)
+            self._estimated_at = now
+
+        if len(latencies) < MIN_SAMPLES:
+            self._p95 = 0.0
+        else:
+            self._p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        return self._p95
+
+    def pressure(self, config, queue_ms=None):
+        """Load relative to the limits; 1.0 means at the limit"""
+        pressure = (
+            self.latency_estimate(config["LATENCY_WINDOW"])
+            / config["LATENCY_THRESHOLD_MS"]
+        )
+        if config["MAX_IN_FLIGHT"]:
+            pressure = max(pressure, self.in_flight / config["MAX_IN_FLIGHT"])
+        if queue_ms is not None and config["MAX_QUEUE_MS"]:
+            pressure = max(pressure, queue_ms / config["MAX_QUEUE_MS"])
+        return pressure
+
+    def should_shed(self, priority, config, queue_ms=None):
+        if priority == CRITICAL:
+            return False
+        if self.pressure(config, queue_ms) < SHED_AT[priority]:
+            return False
+        with self._lock:
+            self.shed[priority] += 1
+        shed_requests.labels(priority=priority).inc()
+        return True
+
+    def stats(self, config=None):
+        config = config or get_config()
+        return {
+            "in_flight": self.in_flight,
+            "p95_latency_ms": round(self.latency_estimate(config["LATENCY_WINDOW"]), 2),
+            "shed": dict(self.shed),
+        }
+
+    def reset(self):
+        with self._lock:
+            self.in_flight = 0
+            self.shed = {LOW: 0, NORMAL: 0, HIGH: 0}
+            self._samples.clear()
+            self._p95 = 0.0
+            self._estimated_at = 0.0
+
+
+load_shedder = LoadShedder()
@@ -0,0 +1,359 @@
+"""
+Open-loop load generation against the HTTP API
+
+Requests are sent on a fixed schedule (constant or Poisson arrivals at the
+target rate) whether or not earlier ones have completed, so a slow server
+can't throttle the load it is measured under. Latency is recorded from
+each request's *intended* send time rather than when it actually went out,
+which corrects for coordinated omission: if the generator falls behind or
+``max_in_flight`` is reached, the queueing delay shows up in the
+percentiles instead of silently disappearing. The time from send to
+response is reported separately as service time.
+
+Virtual users come from existing API tokens (``seed_data --tokens-file``)
+rather than being registered through the API, whose register endpoint is
+throttled to a handful of calls per hour. Rate-limited responses (429)
+count as errors and are also reported as ``rejected``.
+
+Used by ``scripts/traffic_sim.py``.
+"""
+import asyncio
+import math
+import random
+import time
+from collections import Counter, deque
+
+import httpx
+
+SCENARIOS = ("list", "filter", "search", "create", "mark_done", "stats")
+
+DEFAULT_MIX = {
+    "list": 40,
+    "filter": 20,
+    "search": 10,
+    "create": 15,
+    "mark_done": 10,
+    "stats": 5,
+}
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+SEARCH_TERMS = ("release", "review", "deploy", "report", "meeting", "invoice")
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of latencies in microseconds
+
+    Values below ``2 ** sub_bits`` us are counted exactly; above that each
+    power of two is split into ``2 ** (sub_bits - 1)`` buckets, so reported
+    percentiles are within about 1.6% of the true value with the default
+    ``sub_bits=7``. Memory stays bounded however many samples are recorded.
+    """
+
+    def __init__(self, sub_bits=7):
+        self.sub_bits = sub_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, value):
+        shift = value.bit_length() - self.sub_bits
+        if shift <= 0:
+            return value
+        return (value >> shift) << shift
+
+    def _bucket_width(self, low):
+        return 1 << max(0, low.bit_length() - self.sub_bits)
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1_000_000))
+        low = self._bucket(value)
+        self.counts[low] = self.counts.get(low, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        for low, count in other.counts.items():
+            self.counts[low] = self.counts.get(low, 0) + count
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, percent):
+        """Highest value in the bucket holding ``percent``% of samples, in us"""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for low in sorted(self.counts):
+            seen += self.counts[low]
+            if seen >= rank:
+                return min(low + self._bucket_width(low) - 1, self.max)
+        return self.max
+
+    def summary(self):
+        """Count, mean, min/max and percentiles in milliseconds"""
+        if not self.count:
+            return {"count": 0}
+        summary = {
+            "count": self.count,
+            "min": round(self.min / 1000, 3),
+            "mean": round(self.total / self.count / 1000, 3),
+            "max": round(self.max / 1000, 3),
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent:g}"] = round(self.percentile(percent) / 1000, 3)
+        return summary
+
+
+def arrival_offsets(rate, duration, process="constant", rng=None):
+    """
+    Yield send times in seconds from the start of the run
+
+    ``constant`` spaces requests exactly ``1 / rate`` apart; ``poisson``
+    draws exponential gaps with the same mean, which is closer to many
+    independent clients.
+    """
+    if rate <= 0:
+        raise ValueError("rate must be positive")
+    if process not in ("constant", "poisson"):
+        raise ValueError(f"Unknown arrival process: {process}")
+    rng = rng or random.Random()
+    if process == "constant":
+        for i in range(int(rate * duration)):
+            yield i / rate
+        return
+    offset = rng.expovariate(rate)
+    while offset < duration:
+        yield offset
+        offset += rng.expovariate(rate)
+
+
+def parse_mix(spec):
+    """``"list=50,create=10"`` -> ``{"list": 50.0, "create": 10.0}``"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight for {name}: {weight!r}")
+        if mix[name] < 0:
+            raise ValueError(f"Negative weight for {name}")
+    if not any(mix.values()):
+        raise ValueError("Scenario mix has no positive weights")
+    return mix
+
+
+def is_error(status):
+    """True for transport failures (``status`` is the exception name), 429 and 5xx"""
+    return not isinstance(status, int) or status == 429 or status >= 500
+
+
+class VirtualUser:
+    """An API user with a token and the ids of tasks it can mark done"""
+
+    def __init__(self, username, token, task_ids=()):
+        self.username = username
+        self.token = token
+        self.task_ids = deque(task_ids, maxlen=1000)
+
+    @property
+    def headers(self):
+        return {"Authorization": f"Token {self.token}"}
+
+
+def build_request(scenario, user, rng):
+    """Return ``(scenario, method, path, json body)`` for one request"""
+    if scenario == "mark_done":
+        if user.task_ids:
+            task_id = user.task_ids.popleft()
+            return scenario, "POST", f"/api/v1/tasks/{task_id}/mark_done/", None
+        # Nothing left to complete yet; create something instead
+        scenario = "create"
+    if scenario == "list":
+        return scenario, "GET", f"/api/v1/tasks/?page={rng.randint(1, 3)}", None
+    if scenario == "filter":
+        status = rng.choice(("TODO", "IN_PROGRESS", "DONE"))
+        priority = rng.choice(("LOW", "MEDIUM", "HIGH"))
+        ordering = rng.choice(("-created_at", "due_date", "-priority"))
+        return (
+            scenario,
+            "GET",
+            f"/api/v1/tasks/?status={status}&priority={priority}&ordering={ordering}",
+            None,
+        )
+    if scenario == "search":
+        return (
+            scenario,
+            "GET",
+            f"/api/v1/tasks/?search={rng.choice(SEARCH_TERMS)}",
+            None,
+        )
+    if scenario == "stats":
+        return scenario, "GET", "/api/v1/tasks/stats/", None
+    if scenario == "create":
+        body = {
+            "title": f"Load test {rng.choice(SEARCH_TERMS)} {rng.randint(1, 10**6)}",
+            "description": "Created by the load generator",
+            "priority": rng.choice(("LOW", "MEDIUM", "HIGH")),
+        }
+        return scenario, "POST", "/api/v1/tasks/", body
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def load_users(client, tokens, tasks_per_user=5):
+    """Virtual users for existing tokens, seeded with tasks to mark done"""
+    users = []
+    for i, token in enumerate(tokens):
+        user = VirtualUser(f"token{i}", token)
+        await seed_tasks(client, user, tasks_per_user)
+        users.append(user)
+    return users
+
+
+async def seed_tasks(client, user, count):
+    rng = random.Random(user.token)
+    for _ in range(count):
+        _, _, path, body = build_request("create", user, rng)
+        response = await client.post(path, json=body, headers=user.headers)
+        response.raise_for_status()
+        user.task_ids.append(response.json()["id"])
+
+
+class LoadGenerator:
+    """Fire a weighted scenario mix at a fixed rate and collect latencies"""
+
+    def __init__(
+        self,
+        client,
+        users,
+        mix=None,
+        rate=10,
+        duration=60,
+        arrival="constant",
+        max_in_flight=1000,
+        seed=None,
+    ):
+        if not users:
+            raise ValueError("LoadGenerator needs at least one user")
+        self.client = client
+        self.users = users
+        self.mix = mix or DEFAULT_MIX
+        self.rate = rate
+        self.duration = duration
+        self.arrival = arrival
+        self.max_in_flight = max_in_flight
+        self.rng = random.Random(seed)
+
+        self.response_time = LatencyHistogram()
+        self.service_time = LatencyHistogram()
+        self.send_lag = LatencyHistogram()
+        self.scenarios = {}
+        self.status_codes = Counter()
+        self.errors = 0
+        self.rejected = 0
+
+    def _scenario_stats(self, name):
+        if name not in self.scenarios:
+            self.scenarios[name] = {
+                "requests": 0,
+                "errors": 0,
+                "latency": LatencyHistogram(),
+            }
+        return self.scenarios[name]
+
+    async def run(self):
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        pending = set()
+
+        started = time.perf_counter()
+        for offset in arrival_offsets(self.rate, self.duration, self.arrival, self.rng):
+            intended = started + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            user = self.rng.choice(self.users)
+            request = build_request(self.rng.choices(names, weights)[0], user, self.rng)
+            task = asyncio.create_task(self._send(request, user, intended, semaphore))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.gather(*pending)
+        return self.report(time.perf_counter() - started)
+
+    async def _send(self, request, user, intended, semaphore):
+        scenario, method, path, body = request
+        stats = self._scenario_stats(scenario)
+        async with semaphore:
+            sent = time.perf_counter()
+            try:
+                response = await self.client.request(
+                    method, path, json=body, headers=user.headers
+                )
+                status = response.status_code
+            except httpx.HTTPError as e:
+                response = None
+                status = type(e).__name__
+            finished = time.perf_counter()
+
+        if scenario == "create" and status == 201:
+            user.task_ids.append(response.json()["id"])
+
+        self.send_lag.record(sent - intended)
+        self.service_time.record(finished - sent)
+        self.response_time.record(finished - intended)
+        stats["latency"].record(finished - intended)
+        stats["requests"] += 1
+        self.status_codes[str(status)] += 1
+        if is_error(status):
+            stats["errors"] += 1
+            self.errors += 1
+        if status == 429:
+            self.rejected += 1
+
+    def report(self, elapsed):
+        total = self.response_time.count
+        return {
+            "config": {
+                "rate": self.rate,
+                "duration": self.duration,
+                "arrival": self.arrival,
+                "max_in_flight": self.max_in_flight,
+                "users": len(self.users),
+                "mix": self.mix,
+            },
+            "elapsed_s": round(elapsed, 3),
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0,
+            "errors": self.errors,
+            "error_rate": round(self.errors / total, 4) if total else 0,
+            # Throttled requests, also counted in errors
+            "rejected": self.rejected,
+            "status_codes": dict(self.status_codes),
+            # Measured from the intended send time (coordinated omission
+            # corrected); service_time_ms excludes time spent waiting to send
+            "latency_ms": self.response_time.summary(),
+            "service_time_ms": self.service_time.summary(),
+            "send_lag_ms": self.send_lag.summary(),
+            "scenarios": {
+                name: {
+                    "requests": stats["requests"],
+                    "errors": stats["errors"],
+                    "latency_ms": stats["latency"].summary(),
+                }
+                for name, stats in sorted(self.scenarios.items())
+            },
+        }
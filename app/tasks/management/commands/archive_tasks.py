@@ -0,0 +1,35 @@
+"""
+Move old DONE tasks to the archive table
+
+Usage: python app/manage.py archive_tasks --days 30 --batch-size 1000
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.tasks.archive import archive_done_tasks
+
+
+class Command(BaseCommand):
+    help = "Archive DONE tasks older than --days in batched transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "TASK_ARCHIVE_AFTER_DAYS", 30),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "TASK_ARCHIVE_BATCH_SIZE", 1000),
+        )
+        parser.add_argument("--max-batches", type=int, default=None)
+
+    def handle(self, *args, **options):
+        moved = archive_done_tasks(
+            days=options["days"],
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        )
+        for alias, count in moved.items():
+            self.stdout.write(self.style.SUCCESS(f"{alias}: archived {count} tasks"))
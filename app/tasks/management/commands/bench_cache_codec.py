@@ -0,0 +1,153 @@
+"""
+Benchmark cache value codecs on payloads the app stores in Redis
+
+Usage: python app/manage.py bench_cache_codec --repeat 200 --json
+"""
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django_redis.compressors.identity import IdentityCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.pickle import PickleSerializer
+
+from app.tasks.authentication import user_entry
+from app.tasks.benchmarking import time_call
+from app.tasks.cache_codec import CompactSerializer, ThresholdCompressor
+
+
+def build_payloads(latencies, users, page_size):
+    """Values shaped like the metrics, token and coalescing cache entries"""
+    rng = random.Random(42)
+    now = datetime(2025, 10, 7, 12, 0, tzinfo=timezone.utc)
+    summary = {
+        "total_requests": 48211,
+        "total_errors": 312,
+        "error_rate_percent": 0.65,
+        "active_users": users,
+        "latency": {"min": 1.2, "max": 812.4, "avg": 23.9, "p50": 14.1, "p95": 88.0},
+        "time_window": "5 minutes",
+    }
+    page = {
+        "count": 5000,
+        "next": "http://api/api/v1/tasks/?page=2",
+        "previous": None,
+        "results": [
+            {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "title": f"Task {i}",
+                "description": "Follow up with the team about the release",
+                "status": ("TODO", "IN_PROGRESS", "DONE")[i % 3],
+                "priority": ("LOW", "MEDIUM", "HIGH")[i % 3],
+                "due_date": None,
+                "owner": "alice",
+                "created_at": (now - timedelta(hours=i)).isoformat(),
+                "updated_at": now.isoformat(),
+            }
+            for i in range(page_size)
+        ],
+    }
+    user = User(pk=1, username="alice", email="alice@example.com", is_active=True)
+    return {
+        "latencies": [rng.uniform(1, 250) for _ in range(latencies)],
+        "user_set": set(rng.sample(range(1, users * 10), users)),
+        "request_count": 48211,
+        "metrics_summary": {"data": summary, "status": 200, "stored_at": time.time()},
+        "task_page": {"data": page, "status": 200, "stored_at": time.time()},
+        "token": user_entry(user),
+    }
+
+
+def make_codecs(min_length):
+    options = {"COMPACT_WRITES": True, "COMPRESS_MIN_LENGTH": min_length}
+    return {
+        "pickle": (PickleSerializer({}), IdentityCompressor({})),
+        "compact": (
+            CompactSerializer({"COMPACT_WRITES": True}),
+            IdentityCompressor({}),
+        ),
+        "compact_zstd": (CompactSerializer(options), ThresholdCompressor(options)),
+    }
+
+
+def encode(serializer, compressor, value):
+    # Same steps as django_redis.client.DefaultClient.encode/decode
+    if isinstance(value, bool) or not isinstance(value, int):
+        return compressor.compress(serializer.dumps(value))
+    return value
+
+
+def decode(serializer, compressor, value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        try:
+            value = compressor.decompress(value)
+        except CompressorError:
+            pass
+        return serializer.loads(value)
+
+
+class Command(BaseCommand):
+    help = "Compare bytes and CPU per cache operation for pickle vs msgpack+zstd"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--latencies", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--min-length", type=int, default=512)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--json", action="store_true", help="JSON output")
+
+    def handle(self, *args, **options):
+        results = self.run_benchmarks(options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for payload, codecs in results["payloads"].items():
+            self.stdout.write(self.style.MIGRATE_HEADING(payload))
+            for name, stats in codecs.items():
+                self.stdout.write(
+                    f"  {name:<14} {stats['bytes']:>9} B "
+                    f"encode {stats['encode_us']:>9.1f}us "
+                    f"decode {stats['decode_us']:>9.1f}us"
+                )
+
+    def run_benchmarks(self, options):
+        payloads = build_payloads(
+            options["latencies"], options["users"], options["page_size"]
+        )
+        codecs = make_codecs(options["min_length"])
+        repeat = options["repeat"]
+
+        results = {}
+        for payload_name, value in payloads.items():
+            results[payload_name] = {}
+            for codec_name, (serializer, compressor) in codecs.items():
+                encoded = encode(serializer, compressor, value)
+                if decode(serializer, compressor, encoded) != value:
+                    raise CommandError(
+                        f"{codec_name} doesn't round-trip {payload_name}"
+                    )
+                encode_stats = time_call(
+                    lambda: encode(serializer, compressor, value), repeat
+                )
+                decode_stats = time_call(
+                    lambda: decode(serializer, compressor, encoded), repeat
+                )
+                results[payload_name][codec_name] = {
+                    # django-redis stores ints as their decimal string
+                    "bytes": len(
+                        encoded if isinstance(encoded, bytes) else str(encoded)
+                    ),
+                    "encode_us": round(encode_stats["median_ms"] * 1000, 1),
+                    "decode_us": round(decode_stats["median_ms"] * 1000, 1),
+                }
+
+        return {"repeat": repeat, "payloads": results}
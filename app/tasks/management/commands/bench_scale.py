@@ -0,0 +1,215 @@
+"""
+Measure how the task endpoints scale with the number of tasks
+
+Seeds a throwaway database up to each size in turn (10k, 100k and 1M tasks
+by default, Zipf-distributed over --owners users) and times the views as
+the largest owner: list with every filter and ordering combination,
+search, stats, deep pagination and mark_done. Each endpoint gets a growth
+exponent (log-log slope of latency against size): about 0 means flat,
+about 1 means the endpoint is O(n).
+
+Usage: python app/manage.py bench_scale --sizes 10000 100000 --json
+"""
+import json
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from app.tasks import seeding
+from app.tasks.benchmarking import temporary_test_database, time_call
+from app.tasks.models import Task
+from app.tasks.views import TaskViewSet
+
+FILTERS = {
+    "none": {},
+    "status": {"status": "TODO"},
+    "status_done": {"status": "DONE"},
+    "priority": {"priority": "HIGH"},
+    "status_priority": {"status": "TODO", "priority": "HIGH"},
+    "created_range": "created",
+    "due_range": "due",
+}
+ORDERINGS = [
+    f"{sign}{field}" for field in TaskViewSet.ordering_fields for sign in ("", "-")
+]
+
+
+def classify(exponent):
+    if exponent is None:
+        return None
+    if exponent < 0.25:
+        return "flat"
+    if exponent < 0.75:
+        return "sublinear"
+    return "linear"
+
+
+class Command(BaseCommand):
+    help = "Benchmark list/filter/search/stats/pagination/mark_done at several sizes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+        )
+        parser.add_argument("--owners", type=int, default=1000)
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--json", action="store_true", help="JSON output")
+
+    def handle(self, *args, **options):
+        # Measure the queries: no Redis, no cached stats, no rate limits
+        rest_framework = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {
+                scope: None
+                for scope in settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+            },
+        }
+        with override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+            },
+            RESPONSE_COALESCING={"ENABLED": False},
+            REST_FRAMEWORK=rest_framework,
+            # Only the default database is swapped for a test one
+            TASK_SHARDS=[],
+        ), temporary_test_database():
+            results = self.run_matrix(options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        sizes = results["sizes"]
+        header = "".join(f"{size:>12,}" for size in sizes)
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(f"{'endpoint':<44}{header}  growth")
+        )
+        cases = sorted(
+            results["cases"].items(),
+            key=lambda item: -(item[1]["growth_exponent"] or 0),
+        )
+        for name, case in cases:
+            timings = "".join(
+                f"{case['median_ms'][str(size)]:>10.2f}ms" for size in sizes
+            )
+            line = f"{name:<44}{timings}  {case['growth_exponent']} {case['scaling']}"
+            if case["scaling"] == "linear":
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+    def run_matrix(self, options):
+        owner_ids = seeding.create_owners(options["owners"], prefix="scale")
+        weights = seeding.owner_weights(len(owner_ids))
+        # The first owner has the largest share: the biggest customer
+        user = User.objects.get(pk=owner_ids[0])
+
+        cases = {}
+        owner_tasks = {}
+        seeded = 0
+        for size in sorted(options["sizes"]):
+            seeded += seeding.seed_tasks(
+                size - seeded, owner_ids, weights, seed=options["seed"] + size
+            )
+            owner_tasks[size] = Task.objects.filter(owner=user).count()
+            self.stderr.write(
+                f"{size:,} tasks ({owner_tasks[size]:,} for the measured owner)"
+            )
+            for name, stats in self.measure(user, owner_tasks[size], options).items():
+                cases.setdefault(name, {})[size] = stats["median_ms"]
+
+        sizes = sorted(options["sizes"])
+        report = {}
+        for name, medians in cases.items():
+            exponent = None
+            first, last = medians[sizes[0]], medians[sizes[-1]]
+            if len(sizes) > 1 and first > 0 and last > 0:
+                exponent = round(
+                    math.log(last / first) / math.log(sizes[-1] / sizes[0]), 2
+                )
+            report[name] = {
+                "median_ms": {str(size): ms for size, ms in medians.items()},
+                "growth_exponent": exponent,
+                "scaling": classify(exponent),
+            }
+
+        return {
+            "sizes": sizes,
+            "owners": len(owner_ids),
+            "owner_tasks": {str(size): count for size, count in owner_tasks.items()},
+            "page_size": options["page_size"],
+            "repeat": options["repeat"],
+            "cases": report,
+        }
+
+    def measure(self, user, owner_tasks, options):
+        factory = APIRequestFactory()
+        list_view = TaskViewSet.as_view({"get": "list"})
+        stats_view = TaskViewSet.as_view({"get": "stats"})
+        mark_done_view = TaskViewSet.as_view({"post": "mark_done"})
+        page_size = options["page_size"]
+        repeat = options["repeat"]
+        now = timezone.now()
+
+        def get(view, params):
+            def call():
+                request = factory.get("/api/v1/tasks/", params)
+                force_authenticate(request, user=user)
+                view(request).render()
+
+            return time_call(call, repeat=repeat, warmup=1)
+
+        results = {}
+        for filter_name, params in FILTERS.items():
+            if params == "created":
+                params = {"created_after": (now - timedelta(days=30)).isoformat()}
+            elif params == "due":
+                params = {
+                    "due_after": now.isoformat(),
+                    "due_before": (now + timedelta(days=14)).isoformat(),
+                }
+            for ordering in ORDERINGS:
+                results[f"list {filter_name} ordering={ordering}"] = get(
+                    list_view, {**params, "ordering": ordering, "page_size": page_size}
+                )
+
+        results["search"] = get(
+            list_view, {"search": "release", "page_size": page_size}
+        )
+        results["stats"] = get(stats_view, {})
+
+        last_page = max(1, math.ceil(owner_tasks / page_size))
+        for label, page in (("middle", max(1, last_page // 2)), ("last", last_page)):
+            results[f"page {label}"] = get(
+                list_view, {"page": page, "page_size": page_size}
+            )
+
+        # One task per call plus the warmup; marked tasks stay DONE
+        todo = list(
+            Task.objects.filter(owner=user, status="TODO").values_list("pk", flat=True)[
+                : repeat + 1
+            ]
+        )
+        if len(todo) < repeat + 1:
+            raise CommandError(
+                f"mark_done needs {repeat + 1} TODO tasks, the measured owner has "
+                f"{len(todo)}; seed more tasks or lower --repeat"
+            )
+        todo = iter(todo)
+
+        def mark_done():
+            task_id = str(next(todo))
+            request = factory.post(f"/api/v1/tasks/{task_id}/mark_done/")
+            force_authenticate(request, user=user)
+            mark_done_view(request, pk=task_id).render()
+
+        results["mark_done"] = time_call(mark_done, repeat=repeat, warmup=1)
+        return results
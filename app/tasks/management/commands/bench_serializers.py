@@ -0,0 +1,103 @@
+"""
+Benchmark TaskSerializer against the values_list fast read path
+
+Usage: python app/manage.py bench_serializers --tasks 1000 --page-size 100
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from app.tasks.benchmarking import temporary_test_database, time_call
+from app.tasks.fast_serializers import TaskRowSerializer
+from app.tasks.models import Task
+from app.tasks.renderers import FastJSONRenderer
+from app.tasks.serializers import TaskSerializer
+from app.tasks.views import TaskViewSet
+
+
+class Command(BaseCommand):
+    help = "Benchmark TaskSerializer vs the fast read path on a test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=1000)
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--json", action="store_true", help="JSON output")
+
+    def handle(self, *args, **options):
+        with temporary_test_database():
+            results = self.run_benchmarks(options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for name, stats in results["benchmarks"].items():
+            self.stdout.write(
+                f"{name:<28} median {stats['median_ms']:>9.3f}ms "
+                f"min {stats['min_ms']:>9.3f}ms"
+            )
+        for name, value in results["speedup"].items():
+            self.stdout.write(self.style.SUCCESS(f"{name} speedup: {value}x"))
+
+    def run_benchmarks(self, options):
+        user = User.objects.create_user(username="bench", password="benchpass123")
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {i}",
+                description="Benchmark task " * 5,
+                status=("TODO", "IN_PROGRESS", "DONE")[i % 3],
+                priority=("LOW", "MEDIUM", "HIGH")[i % 3],
+                owner=user,
+            )
+            for i in range(options["tasks"])
+        )
+
+        page_size = options["page_size"]
+        repeat = options["repeat"]
+        queryset = Task.objects.filter(owner=user)
+
+        def serializer_render():
+            page = list(queryset[:page_size])
+            JSONRenderer().render(TaskSerializer(page, many=True).data)
+
+        def fast_render():
+            rows = TaskRowSerializer()
+            page = list(rows.get_rows(queryset)[:page_size])
+            FastJSONRenderer().render(rows.many(page))
+
+        factory = APIRequestFactory()
+        view = TaskViewSet.as_view({"get": "list"})
+
+        def list_view():
+            request = factory.get("/api/v1/tasks/", {"page_size": page_size})
+            force_authenticate(request, user=user)
+            view(request).render()
+
+        benchmarks = {
+            "serializer_render": time_call(serializer_render, repeat),
+            "fast_path_render": time_call(fast_render, repeat),
+        }
+        with override_settings(TASKS_FAST_READ_PATH=False):
+            benchmarks["list_view_serializer"] = time_call(list_view, repeat)
+        with override_settings(TASKS_FAST_READ_PATH=True):
+            benchmarks["list_view_fast_path"] = time_call(list_view, repeat)
+
+        def speedup(slow, fast):
+            return round(
+                benchmarks[slow]["median_ms"] / benchmarks[fast]["median_ms"], 2
+            )
+
+        return {
+            "tasks": options["tasks"],
+            "page_size": page_size,
+            "benchmarks": benchmarks,
+            "speedup": {
+                "render": speedup("serializer_render", "fast_path_render"),
+                "list_view": speedup("list_view_serializer", "list_view_fast_path"),
+            },
+        }
@@ -0,0 +1,143 @@
+"""
+Benchmark SQLite read/write throughput with default vs tuned settings
+
+Runs concurrent reader and writer processes (like gunicorn workers) against
+a scratch database file, first with Django's defaults (rollback journal,
+new connection per request) and then with SQLITE_PRAGMAS and persistent
+connections.
+
+Usage: python app/manage.py bench_sqlite --readers 4 --writers 2 --duration 5
+"""
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.tasks.sqlite_tuning import apply_pragmas
+
+SCHEMA = """
+CREATE TABLE tasks_task (
+    id char(32) PRIMARY KEY,
+    title varchar(255) NOT NULL,
+    description text NOT NULL,
+    status varchar(20) NOT NULL,
+    priority varchar(20) NOT NULL,
+    owner_id integer NOT NULL,
+    created_at datetime NOT NULL
+);
+CREATE INDEX tasks_owner_status ON tasks_task (owner_id, status);
+CREATE INDEX tasks_created ON tasks_task (created_at);
+"""
+
+INSERT = (
+    "INSERT INTO tasks_task (id, title, description, status, priority, owner_id, "
+    "created_at) VALUES (?, ?, ?, 'TODO', 'MEDIUM', ?, datetime('now'))"
+)
+SELECT = (
+    "SELECT * FROM tasks_task WHERE owner_id = ? AND status = 'TODO' "
+    "ORDER BY created_at DESC LIMIT 20"
+)
+OWNERS = 100
+
+
+def _run_worker(job):
+    path, role, duration, pragmas, persistent, worker_id = job
+    ops = errors = 0
+    conn = None
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        if conn is None:
+            conn = sqlite3.connect(path)
+            if pragmas:
+                apply_pragmas(conn.cursor(), pragmas)
+        owner = (ops + worker_id) % OWNERS
+        try:
+            if role == "write":
+                conn.execute(INSERT, (uuid.uuid4().hex, "bench", "x" * 200, owner))
+                conn.commit()
+            else:
+                conn.execute(SELECT, (owner,)).fetchall()
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+        if not persistent:
+            conn.close()
+            conn = None
+
+    if conn is not None:
+        conn.close()
+    return role, ops, errors
+
+
+class Command(BaseCommand):
+    help = "Compare SQLite throughput with default vs tuned connection settings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--duration", type=float, default=5.0)
+        parser.add_argument("--rows", type=int, default=20000)
+        parser.add_argument("--json", action="store_true", help="JSON output")
+
+    def handle(self, *args, **options):
+        scenarios = {
+            "default": ({}, False),
+            "tuned": (getattr(settings, "SQLITE_PRAGMAS", {}), True),
+        }
+        results = {}
+        for name, (pragmas, persistent) in scenarios.items():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = os.path.join(tmpdir, "bench.sqlite3")
+                self.create_database(path, options["rows"])
+                results[name] = self.run_scenario(path, pragmas, persistent, options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<8} reads/s {result['reads_per_sec']:>10.1f}  "
+                f"writes/s {result['writes_per_sec']:>9.1f}  "
+                f"lock errors {result['errors']}"
+            )
+
+    def create_database(self, path, rows):
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            INSERT,
+            ((uuid.uuid4().hex, "seed", "x" * 200, i % OWNERS) for i in range(rows)),
+        )
+        conn.commit()
+        conn.close()
+
+    def run_scenario(self, path, pragmas, persistent, options):
+        duration = options["duration"]
+        jobs = [
+            (path, "read", duration, pragmas, persistent, i)
+            for i in range(options["readers"])
+        ] + [
+            (path, "write", duration, pragmas, persistent, i)
+            for i in range(options["writers"])
+        ]
+
+        with multiprocessing.Pool(len(jobs)) as pool:
+            outcomes = pool.map(_run_worker, jobs)
+
+        reads = sum(ops for role, ops, _ in outcomes if role == "read")
+        writes = sum(ops for role, ops, _ in outcomes if role == "write")
+        return {
+            "pragmas": pragmas,
+            "persistent_connections": persistent,
+            "reads_per_sec": round(reads / duration, 1),
+            "writes_per_sec": round(writes / duration, 1),
+            "errors": sum(errors for _, _, errors in outcomes),
+        }
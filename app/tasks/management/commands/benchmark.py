@@ -0,0 +1,190 @@
+"""
+Run named benchmark scenarios and compare them with their baselines
+
+Usage:
+    python app/manage.py benchmark list search --requests 500
+    python app/manage.py benchmark list --mode http --base-url http://localhost:8000
+    python app/manage.py benchmark list --set-baseline
+    python app/manage.py benchmark --history list
+"""
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from app.tasks import bench_harness
+from app.tasks.benchmarking import temporary_test_database
+from app.tasks.models import BenchmarkRun
+
+
+class Command(BaseCommand):
+    help = "Run benchmark scenarios, store them and flag regressions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenarios", nargs="*", help=f"One or more of {bench_harness.SCENARIOS}"
+        )
+        parser.add_argument(
+            "--mode", choices=["inprocess", "http"], default="inprocess"
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=10, help="HTTP only")
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument(
+            "--tokens-file",
+            help="HTTP only: existing tokens, one per line (default: create users "
+            "in this database)",
+        )
+        parser.add_argument("--tasks", type=int, default=200, help="In-process only")
+        parser.add_argument("--baseline", help="Compare with this run id")
+        parser.add_argument(
+            "--set-baseline", action="store_true", help="Make these runs the baseline"
+        )
+        parser.add_argument(
+            "--history", action="store_true", help="List stored runs instead"
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error if any run regressed",
+        )
+        parser.add_argument("--json", action="store_true", help="JSON output")
+
+    def handle(self, *args, **options):
+        unknown = set(options["scenarios"]) - set(bench_harness.SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        if options["history"]:
+            return self.show_history(options)
+        if not options["scenarios"]:
+            raise CommandError("Name at least one scenario")
+
+        baseline = None
+        if options["baseline"]:
+            baseline = BenchmarkRun.objects.filter(pk=options["baseline"]).first()
+            if baseline is None:
+                raise CommandError(f"No benchmark run {options['baseline']}")
+
+        results = self.run_scenarios(options)
+        environment = bench_harness.collect_environment(
+            mode=options["mode"],
+            base_url=options["base_url"] if options["mode"] == "http" else None,
+        )
+        runs = [
+            bench_harness.save_run(
+                result, environment, baseline, options["set_baseline"]
+            )
+            for result in results
+        ]
+
+        if options["json"]:
+            self.stdout.write(
+                json.dumps([self.describe(run) for run in runs], indent=2)
+            )
+        else:
+            for run in runs:
+                self.write_run(run)
+
+        if options["fail_on_regression"] and any(run.regression for run in runs):
+            raise CommandError("Benchmark regression detected")
+
+    def run_scenarios(self, options):
+        if options["mode"] == "http":
+            if options["tokens_file"]:
+                with open(options["tokens_file"]) as f:
+                    tokens = [line.strip() for line in f if line.strip()]
+            else:
+                tokens = bench_harness.provision_tokens(options["concurrency"])
+            if len(tokens) < options["concurrency"]:
+                raise CommandError(
+                    f"--concurrency {options['concurrency']} needs as many tokens, "
+                    f"got {len(tokens)}"
+                )
+            return [
+                bench_harness.run_http(
+                    scenario,
+                    options["base_url"],
+                    tokens,
+                    options["requests"],
+                    options["concurrency"],
+                )
+                for scenario in options["scenarios"]
+            ]
+
+        # Measure the code: no Redis, no cached responses, no rate limits
+        rest_framework = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {
+                scope: None
+                for scope in settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+            },
+        }
+        with temporary_test_database(), override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+            },
+            RESPONSE_COALESCING={"ENABLED": False},
+            TASK_DETAIL_CACHE={"ENABLED": False},
+            REST_FRAMEWORK=rest_framework,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        ):
+            return [
+                bench_harness.run_inprocess(
+                    scenario, options["requests"], options["tasks"]
+                )
+                for scenario in options["scenarios"]
+            ]
+
+    def show_history(self, options):
+        runs = BenchmarkRun.objects.defer("latency_samples")
+        if options["scenarios"]:
+            runs = runs.filter(scenario__in=options["scenarios"])
+        runs = runs.filter(mode=options["mode"])[:20]
+
+        if options["json"]:
+            self.stdout.write(
+                json.dumps([self.describe(run) for run in runs], indent=2)
+            )
+            return
+        for run in runs:
+            self.write_run(run)
+
+    def describe(self, run):
+        return {
+            "id": str(run.pk),
+            "scenario": run.scenario,
+            "mode": run.mode,
+            "created_at": run.created_at.isoformat(),
+            "requests": run.requests,
+            "errors": run.errors,
+            "throughput_rps": run.throughput_rps,
+            "p50_ms": run.p50_ms,
+            "p95_ms": run.p95_ms,
+            "p99_ms": run.p99_ms,
+            "is_baseline": run.is_baseline,
+            "regression": run.regression,
+            "comparison": run.comparison,
+            "environment": run.environment,
+        }
+
+    def write_run(self, run):
+        marker = " [baseline]" if run.is_baseline else ""
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(f"{run.scenario} ({run.mode}) {run.pk}{marker}")
+        )
+        self.stdout.write(
+            f"  {run.throughput_rps:>9.1f} rps  p50 {run.p50_ms:.2f}ms  "
+            f"p95 {run.p95_ms:.2f}ms  p99 {run.p99_ms:.2f}ms  errors {run.errors}"
+        )
+        for metric, values in run.comparison.items():
+            if not isinstance(values, dict):
+                continue
+            change = values["change_pct"]
+            change = "n/a" if change is None else f"{change:+.1f}%"
+            line = f"  {metric:<15} {change} vs baseline"
+            if values["regression"]:
+                self.stdout.write(self.style.ERROR(f"{line}  REGRESSION"))
+            else:
+                self.stdout.write(line)
@@ -0,0 +1,76 @@
+"""
+Manage runtime fault injection rules (see app/tasks/fault_injection.py)
+
+Rules only take effect on servers started with FAULT_INJECTION_ENABLED=true.
+
+Usage:
+    python app/manage.py faults set slow-list --route '^/api/v1/tasks/$' \\
+        --fraction 0.2 --latency-ms 300 --ttl 120
+    python app/manage.py faults set redis-down --redis-failure --fraction 0.5
+    python app/manage.py faults list
+    python app/manage.py faults clear [NAME ...]
+"""
+import json
+
+import redis
+from django.core.management.base import BaseCommand, CommandError
+
+from app.tasks import fault_injection
+
+
+class Command(BaseCommand):
+    help = "Set, list or clear runtime fault injection rules"
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="action", required=True)
+
+        set_parser = subparsers.add_parser("set", help="Add or replace a rule")
+        set_parser.add_argument("name")
+        set_parser.add_argument(
+            "--route",
+            action="append",
+            dest="routes",
+            default=[],
+            help="Path regex (repeatable; default: every path)",
+        )
+        set_parser.add_argument("--method", action="append", dest="methods", default=[])
+        set_parser.add_argument("--fraction", type=float, default=1.0)
+        set_parser.add_argument("--latency-ms", type=float, default=0)
+        set_parser.add_argument("--latency-jitter-ms", type=float, default=0)
+        set_parser.add_argument("--error-status", type=int)
+        set_parser.add_argument("--db-delay-ms", type=float, default=0)
+        set_parser.add_argument("--redis-failure", action="store_true")
+        set_parser.add_argument(
+            "--ttl", type=float, help="Seconds until the rule expires"
+        )
+
+        subparsers.add_parser("list", help="Show the runtime rules")
+
+        clear_parser = subparsers.add_parser("clear", help="Remove rules")
+        clear_parser.add_argument("names", nargs="*", help="Default: all rules")
+
+    def handle(self, *args, **options):
+        try:
+            if options["action"] == "set":
+                rule = {
+                    field: options[field]
+                    for field in fault_injection.RULE_DEFAULTS
+                    if field in options and field != "expires_at"
+                }
+                stored = fault_injection.set_rule(
+                    options["name"], rule, ttl=options["ttl"]
+                )
+                self.stdout.write(
+                    self.style.SUCCESS(f"Rule {options['name']}: {json.dumps(stored)}")
+                )
+            elif options["action"] == "list":
+                rules = fault_injection.list_rules()
+                for name, rule in sorted(rules.items()):
+                    self.stdout.write(f"{name}: {json.dumps(rule)}")
+                if not rules:
+                    self.stdout.write("No runtime fault rules")
+            else:
+                removed = fault_injection.delete_rules(*options["names"])
+                self.stdout.write(f"Removed {removed} rule(s)")
+        except (ValueError, RuntimeError, redis.RedisError) as exc:
+            raise CommandError(str(exc))
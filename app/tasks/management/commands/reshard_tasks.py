@@ -0,0 +1,227 @@
+"""
+Move an owner's tasks between shards while the API keeps serving them
+
+Usage:
+    python app/manage.py reshard_tasks <username> --to shard2
+    python app/manage.py reshard_tasks --rebalance
+    python app/manage.py reshard_tasks --pin-existing default
+
+Steps for one owner: copy rows (tasks and archived tasks) to the target
+in batches, flip the assignment, wait for workers to drop cached
+placements, copy rows changed during the move (never over newer target
+writes), drop copied rows deleted during the move, then delete the source
+rows in batches.
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from app.tasks import sharding
+from app.tasks.db_routers import SHARDED_MODELS
+from app.tasks.models import ArchivedTask, Task, TaskShardAssignment
+
+COPY_FIELDS = {
+    model: [f.attname for f in model._meta.concrete_fields if not f.primary_key]
+    for model in SHARDED_MODELS
+}
+
+# Field bumped when a row is written; archived rows are only ever inserted
+CHANGED_FIELDS = {Task: "updated_at", ArchivedTask: "archived_at"}
+
+
+def _batches(queryset, batch_size):
+    """``queryset`` rows in pk order, ``batch_size`` at a time"""
+    last_pk = None
+    while True:
+        batch_qs = queryset.order_by("pk")
+        if last_pk is not None:
+            batch_qs = batch_qs.filter(pk__gt=last_pk)
+        batch = list(batch_qs[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
+
+
+def _upsert(model, rows, target):
+    for row in rows:
+        row._state.db = None
+    model.objects.using(target).bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=COPY_FIELDS[model],
+    )
+
+
+def _copy_rows(queryset, target, batch_size, copied_ids):
+    """Upsert ``queryset`` rows into ``target``, noting their pks in ``copied_ids``"""
+    copied = 0
+    for batch in _batches(queryset, batch_size):
+        with transaction.atomic(using=target):
+            _upsert(queryset.model, batch, target)
+        copied_ids.update(row.pk for row in batch)
+        copied += len(batch)
+    return copied
+
+
+def _sync_changed(queryset, target, batch_size, copied_ids):
+    """
+    Copy rows written on the source during the move, without undoing
+    writes made on the target after the flip: existing target rows are
+    only overwritten by a newer source version, and rows missing from the
+    target are only inserted if they were never copied (a copied row that
+    is gone was deleted on the target)
+    """
+    model = queryset.model
+    version = CHANGED_FIELDS[model]
+    copied = 0
+    for batch in _batches(queryset, batch_size):
+        with transaction.atomic(using=target):
+            current = dict(
+                model.objects.using(target)
+                .select_for_update()
+                .filter(pk__in=[row.pk for row in batch])
+                .values_list("pk", version)
+            )
+            newer = [
+                row
+                for row in batch
+                if (
+                    current[row.pk] < getattr(row, version)
+                    if row.pk in current
+                    else row.pk not in copied_ids
+                )
+            ]
+            if newer:
+                _upsert(model, newer, target)
+        copied_ids.update(row.pk for row in newer)
+        copied += len(newer)
+    return copied
+
+
+def _delete_in_batches(queryset, batch_size):
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        deleted += queryset.filter(pk__in=pks).delete()[0]
+
+
+def move_owner(owner_id, target, batch_size=1000, settle_seconds=None, log=None):
+    """Move ``owner_id``'s rows to ``target``; returns row counts"""
+    log = log or (lambda message: None)
+    source = sharding.shard_for_owner(owner_id)
+    if source == target:
+        sharding.assign_owner(owner_id, target)
+        return {"copied": 0, "deleted": 0}
+
+    def querysets(model):
+        return (
+            model.objects.using(source).filter(owner_id=owner_id),
+            model.objects.using(target).filter(owner_id=owner_id),
+        )
+
+    started = timezone.now()
+    copied = 0
+    copied_ids = {model: set() for model in SHARDED_MODELS}
+    for model in SHARDED_MODELS:
+        count = _copy_rows(querysets(model)[0], target, batch_size, copied_ids[model])
+        log(f"Copied {count} {model.__name__} rows {source} -> {target}")
+        copied += count
+
+    sharding.assign_owner(owner_id, target)
+    if settle_seconds is None:
+        settle_seconds = sharding.ASSIGNMENT_LOCAL_TTL + 1
+    time.sleep(settle_seconds)
+
+    deleted = 0
+    for model in SHARDED_MODELS:
+        source_qs, target_qs = querysets(model)
+        # Writes that reached the source while the copy ran or before every
+        # worker saw the new assignment (including tasks archived meanwhile)
+        changed = source_qs.filter(**{f"{CHANGED_FIELDS[model]}__gte": started})
+        copied += _sync_changed(changed, target, batch_size, copied_ids[model])
+
+        # Copied rows since deleted (or archived) on the source
+        source_ids = set(source_qs.values_list("pk", flat=True))
+        stale = sorted(copied_ids[model] - source_ids)
+        for index in range(0, len(stale), batch_size):
+            target_qs.filter(pk__in=stale[index : index + batch_size]).delete()
+
+        count = _delete_in_batches(source_qs, batch_size)
+        log(f"Deleted {count} {model.__name__} rows from {source}")
+        deleted += count
+    return {"copied": copied, "deleted": deleted}
+
+
+class Command(BaseCommand):
+    help = "Move owners' tasks and archived tasks between shards in batches, online"
+
+    def add_arguments(self, parser):
+        parser.add_argument("usernames", nargs="*")
+        parser.add_argument("--to", dest="target", help="Target shard alias")
+        parser.add_argument(
+            "--rebalance",
+            action="store_true",
+            help="Move every owner whose tasks sit off their hash shard",
+        )
+        parser.add_argument(
+            "--pin-existing",
+            metavar="ALIAS",
+            help="Pin every user without an assignment to ALIAS "
+            "(run before enabling sharding on existing data)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--settle-seconds", type=float, default=None)
+
+    def handle(self, *args, **options):
+        shards = sharding.get_shards()
+
+        if options["pin_existing"]:
+            return self.pin_existing(options["pin_existing"])
+
+        if not shards:
+            raise CommandError("Sharding is disabled (TASK_SHARDS is empty)")
+
+        if options["rebalance"]:
+            moves = self.rebalance_moves(shards)
+        else:
+            if not options["usernames"] or options["target"] not in shards:
+                raise CommandError(f"Give usernames and --to one of {shards}")
+            users = User.objects.filter(username__in=options["usernames"])
+            moves = [(user.pk, options["target"]) for user in users]
+
+        for owner_id, target in moves:
+            result = move_owner(
+                owner_id,
+                target,
+                batch_size=options["batch_size"],
+                settle_seconds=options["settle_seconds"],
+                log=self.stdout.write,
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"Owner {owner_id} -> {target}: {result}")
+            )
+
+    def pin_existing(self, alias):
+        pinned = set(TaskShardAssignment.objects.values_list("owner_id", flat=True))
+        new = [
+            TaskShardAssignment(owner_id=pk, alias=alias)
+            for pk in User.objects.using(DEFAULT_DB_ALIAS).values_list("pk", flat=True)
+            if pk not in pinned
+        ]
+        TaskShardAssignment.objects.bulk_create(new, batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f"Pinned {len(new)} users to {alias}"))
+
+    def rebalance_moves(self, shards):
+        moves = []
+        for assignment in TaskShardAssignment.objects.all():
+            home = sharding.hash_shard(assignment.owner_id, shards)
+            if assignment.alias != home:
+                moves.append((assignment.owner_id, home))
+        return moves
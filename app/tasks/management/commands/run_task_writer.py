@@ -0,0 +1,28 @@
+"""
+Run the shared Task writer (TASK_WRITE_QUEUE["MODE"] = "redis")
+
+Usage: python app/manage.py run_task_writer
+"""
+from django.core.management.base import BaseCommand
+
+from app.tasks.write_queue import get_config, run_redis_writer
+
+
+class Command(BaseCommand):
+    help = "Apply queued task writes from all workers in group commits"
+
+    def add_arguments(self, parser):
+        config = get_config()
+        parser.add_argument("--max-batch", type=int, default=config["MAX_BATCH"])
+        parser.add_argument("--max-wait-ms", type=float, default=config["MAX_WAIT_MS"])
+
+    def handle(self, *args, **options):
+        self.stdout.write("Task writer started")
+        try:
+            run_redis_writer(
+                max_batch=options["max_batch"],
+                max_wait=options["max_wait_ms"] / 1000,
+                idempotency_ttl=get_config()["IDEMPOTENCY_TTL"],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("Task writer stopped")
@@ -0,0 +1,135 @@
+"""
+Seed the database with users, API tokens and tasks
+
+Tasks are Zipf-distributed over the users, with configurable status,
+priority, due date and description distributions (see seeding.py). On
+SQLite the load runs with relaxed pragmas (restored afterwards) and large
+batched inserts, about 1M tasks per minute; --workers generates batches in
+parallel processes.
+
+Usage:
+    python app/manage.py seed_data --users 1000 --tasks 1000000
+    python app/manage.py seed_data --tasks 200000 --status TODO=60,DONE=40 \\
+        --tokens-file tokens.txt
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.tasks import seeding
+from app.tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = "Create users, tokens and tasks with realistic distributions"
+
+    def add_arguments(self, parser):
+        defaults = seeding.DEFAULT_DISTRIBUTION
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=100_000)
+        parser.add_argument("--prefix", default="seed", help="Username prefix")
+        parser.add_argument(
+            "--password", help="Password for every user (default: tokens only)"
+        )
+        parser.add_argument(
+            "--tokens-file", help="Write the users' API tokens here, one per line"
+        )
+        parser.add_argument(
+            "--status",
+            help="Weights, e.g. TODO=40,IN_PROGRESS=20,DONE=40",
+        )
+        parser.add_argument("--priority", help="Weights, e.g. LOW=30,MEDIUM=50,HIGH=20")
+        parser.add_argument(
+            "--due-date-null",
+            type=float,
+            default=defaults["due_date_null"],
+            help="Share of tasks without a due date",
+        )
+        parser.add_argument(
+            "--due-date-days",
+            default="%d:%d" % defaults["due_date_days"],
+            help="MIN:MAX days between creation and due date",
+        )
+        parser.add_argument(
+            "--description-words",
+            default="%d:%d" % defaults["description_words"],
+            help="MIN:MAX words per description",
+        )
+        parser.add_argument(
+            "--created-days",
+            type=int,
+            default=defaults["created_days"],
+            help="Spread creation times over this many past days",
+        )
+        parser.add_argument("--zipf-exponent", type=float, default=1.1)
+        parser.add_argument("--batch-size", type=int, default=50_000)
+        parser.add_argument(
+            "--workers", type=int, default=0, help="Generator processes (0: inline)"
+        )
+        parser.add_argument("--seed", type=int)
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1")
+        distribution = self.distribution(options)
+
+        started = time.perf_counter()
+        owner_ids = seeding.create_owners(
+            options["users"], prefix=options["prefix"], password=options["password"]
+        )
+        keys = seeding.create_tokens(owner_ids)
+        if options["tokens_file"]:
+            with open(options["tokens_file"], "w") as f:
+                f.write("\n".join(keys) + "\n")
+        self.stderr.write(
+            f"{len(owner_ids):,} users and tokens in {time.perf_counter() - started:.1f}s"
+        )
+
+        started = time.perf_counter()
+
+        def progress(done):
+            elapsed = time.perf_counter() - started
+            self.stderr.write(f"{done:,} tasks ({done / elapsed:,.0f} rows/s)")
+
+        created = seeding.seed_tasks(
+            options["tasks"],
+            owner_ids,
+            seeding.owner_weights(len(owner_ids), options["zipf_exponent"]),
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+            distribution=distribution,
+            workers=options["workers"],
+            progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created:,} tasks in {elapsed:.1f}s "
+                f"({rate:,.0f} rows/s, {rate * 60:,.0f} rows/min)"
+            )
+        )
+
+    def distribution(self, options):
+        try:
+            distribution = {
+                "due_date_days": seeding.parse_range(options["due_date_days"]),
+                "description_words": seeding.parse_range(options["description_words"]),
+                "due_date_null": options["due_date_null"],
+                "created_days": options["created_days"],
+            }
+            if options["status"]:
+                distribution["status"] = seeding.parse_weights(
+                    options["status"], [value for value, _ in Task.STATUS_CHOICES]
+                )
+            if options["priority"]:
+                distribution["priority"] = seeding.parse_weights(
+                    options["priority"], [value for value, _ in Task.PRIORITY_CHOICES]
+                )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if not 0 <= options["due_date_null"] <= 1:
+            raise CommandError("--due-date-null must be between 0 and 1")
+        if distribution["description_words"][0] < 0 or options["created_days"] < 0:
+            raise CommandError("Word counts and --created-days can't be negative")
+        return distribution
@@ -1,11 +1,11 @@
-import os
-import redis
 import logging
 from datetime import datetime, timedelta
-from django.core.cache import cache
+from .bench_harness import latest_run_summary
 from .models import Alert
 from .slack_alerts import slack_alerter
-from django.conf import settings
+from .circuit_breaker import guarded_cache as cache, redis_breaker
+from .redis_client import get_redis
+from .server_timing import summarize as summarize_phases
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +37,7 @@ class MetricsAggregator:
         total_errors = 0
         all_latencies = []
         unique_users = set()
+        phase_aggregates = []
 
         for minute_key in minute_keys:
             # Requests
@@ -55,6 +56,11 @@ class MetricsAggregator:
             users = cache.get(f"metrics:users:{minute_key}", set())
             unique_users.update(users)
 
+            # Server-Timing phases (SERVER_TIMING["RECORD_METRICS"])
+            phases = cache.get(f"metrics:phases:{minute_key}")
+            if phases:
+                phase_aggregates.append(phases)
+
         # Calculate error rate
         error_rate = (total_errors / total_requests * 100) if total_requests > 0 else 0
 
@@ -69,6 +75,8 @@ class MetricsAggregator:
             "latency": latency_stats,
             "time_window": "5 minutes",
         }
+        if phase_aggregates:
+            result["phases"] = summarize_phases(phase_aggregates)
         # Obtener métricas de ab (si existen)
         ab_metrics = cls._get_ab_metrics()
         if ab_metrics:
@@ -181,20 +189,27 @@ class MetricsAggregator:
         """
         Recupera métricas de Apache Bench almacenadas en Redis.
         Devuelve un diccionario con claves y valores convertidos a números cuando es posible.
+        Incluye la última corrida del benchmark harness y su delta contra el baseline.
         """
+        metrics = {}
         try:
-            redis_url = os.environ.get(
-                "REDIS_URL", settings.CACHES["default"]["LOCATION"]
-            )
-            r = redis.Redis.from_url(redis_url)
-            raw = r.hgetall("ab_metrics")
-            metrics = {}
-            for k, v in raw.items():
-                key = k.decode() if isinstance(k, bytes) else k
-                try:
-                    metrics[key] = float(v)
-                except (ValueError, TypeError):
-                    metrics[key] = v.decode() if isinstance(v, bytes) else v
-            return metrics
+            r = get_redis()
+            if r is not None:
+                raw = redis_breaker.call(r.hgetall, "ab_metrics")
+                for k, v in raw.items():
+                    key = k.decode() if isinstance(k, bytes) else k
+                    try:
+                        metrics[key] = float(v)
+                    except (ValueError, TypeError):
+                        metrics[key] = v.decode() if isinstance(v, bytes) else v
         except Exception:
-            return {}
+            pass
+
+        try:
+            latest_run = latest_run_summary()
+        except Exception as e:
+            logger.warning(f"Could not load latest benchmark run: {e}")
+            latest_run = None
+        if latest_run:
+            metrics["latest_run"] = latest_run
+        return metrics
@@ -1,8 +1,17 @@
 import time
 import logging
-from django.core.cache import cache
+from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from datetime import datetime
+from . import (
+    db_routers,
+    fault_injection,
+    load_shedding,
+    profiling,
+    server_timing,
+    traffic_capture,
+)
+from .circuit_breaker import guarded_cache as cache
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +28,7 @@ class MetricsMiddleware(MiddlewareMixin):
     def process_request(self, request):
         request.metrics_start_time = time.time()
 
+    @server_timing.timed_phase("metrics")
     def process_response(self, request, response):
         if not hasattr(request, "metrics_start_time"):
             return response
@@ -67,3 +77,175 @@ class MetricsMiddleware(MiddlewareMixin):
             )
 
         return response
+
+
+class ReadYourWritesMiddleware:
+    """
+    Scope ReadWriteRouter state to the request
+
+    Unsafe methods read from the primary for the whole request; safe ones
+    switch to it as soon as they write.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = db_routers.start_request(pinned=request.method not in self.SAFE_METHODS)
+        try:
+            return self.get_response(request)
+        finally:
+            db_routers.end_request(token)
+
+
+class LoadSheddingMiddleware:
+    """
+    Reject low-priority requests with 503 while this worker is overloaded
+
+    See ``load_shedding`` for how pressure and priorities are computed.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.shedder = load_shedding.load_shedder
+
+    def __call__(self, request):
+        config = load_shedding.get_config()
+        if not config["ENABLED"]:
+            return self.get_response(request)
+
+        priority = load_shedding.request_priority(request, config)
+        queue_ms = load_shedding.queue_time_ms(request, config)
+        if self.shedder.should_shed(priority, config, queue_ms):
+            response = JsonResponse(
+                {"detail": "Server is overloaded, try again later."}, status=503
+            )
+            response["Retry-After"] = str(config["RETRY_AFTER"])
+            return response
+
+        start = time.perf_counter()
+        self.shedder.started()
+        load_shedding.in_flight_requests.inc()
+        try:
+            return self.get_response(request)
+        finally:
+            load_shedding.in_flight_requests.dec()
+            self.shedder.finished((time.perf_counter() - start) * 1000)
+
+
+class TrafficCaptureMiddleware:
+    """
+    Record a sample of requests for replay (off unless
+    ``TRAFFIC_CAPTURE["ENABLED"]``, see ``traffic_capture``)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.capture = traffic_capture.traffic_capture
+
+    def __call__(self, request):
+        config = traffic_capture.get_config()
+        if not self.capture.should_capture(request, config):
+            return self.get_response(request)
+
+        try:
+            body = request.body
+        except Exception:
+            # Too large or already consumed: capture without it
+            body = b""
+        started_at = time.time()
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+        try:
+            record = self.capture.record(
+                request, response, started_at, duration, body, config
+            )
+            self.capture.write(record, config)
+        except Exception as e:
+            logger.error(f"Traffic capture error: {e}")
+        return response
+
+
+class FaultInjectionMiddleware:
+    """
+    Inject latency, errors, DB delays or Redis failures into matching
+    requests (off unless ``FAULT_INJECTION["ENABLED"]``, see
+    ``fault_injection``)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.injector = fault_injection.fault_injector
+
+    def __call__(self, request):
+        config = fault_injection.get_config()
+        if not config["ENABLED"]:
+            return self.get_response(request)
+
+        plan = self.injector.plan(request, config)
+        if plan is None:
+            return self.get_response(request)
+
+        if plan.latency:
+            time.sleep(plan.latency / 1000)
+        if plan.error_status:
+            response = JsonResponse(
+                {"detail": "Injected fault."}, status=plan.error_status
+            )
+        else:
+            with plan.activate():
+                response = self.get_response(request)
+        response["X-Fault-Injected"] = ",".join(plan.names)
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Add a ``Server-Timing`` header with per-phase times (off unless
+    ``SERVER_TIMING["ENABLED"]``, see ``server_timing``)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = server_timing.get_config()
+        if not config["ENABLED"]:
+            return self.get_response(request)
+
+        with server_timing.timing_request() as timings:
+            start = time.perf_counter()
+            response = self.get_response(request)
+            timings.add("total", time.perf_counter() - start)
+        response["Server-Timing"] = timings.header()
+
+        if config["RECORD_METRICS"]:
+            try:
+                server_timing.record_metrics(timings, cache)
+            except Exception as e:
+                logger.error(f"Server timing metrics error: {e}")
+        return response
+
+
+class RequestProfilingMiddleware:
+    """
+    Profile requests asked for by staff (``X-Profile``) or sampled 1-in-N
+    (off unless ``REQUEST_PROFILING["ENABLED"]``, see ``profiling``)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.decider = profiling.profiling_decider
+
+    def __call__(self, request):
+        config = profiling.get_config()
+        if not config["ENABLED"]:
+            return self.get_response(request)
+
+        trigger = self.decider.trigger(request, config)
+        if trigger is None:
+            return self.get_response(request)
+        return profiling.profile_request(self.get_response, request, trigger, config)
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.16 on 2026-10-19 09:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0004_archivedtask"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BenchmarkRun",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("scenario", models.CharField(max_length=50)),
+                (
+                    "mode",
+                    models.CharField(
+                        choices=[("inprocess", "In-process"), ("http", "HTTP")],
+                        max_length=20,
+                    ),
+                ),
+                ("requests", models.PositiveIntegerField()),
+                ("errors", models.PositiveIntegerField(default=0)),
+                ("duration_s", models.FloatField()),
+                ("throughput_rps", models.FloatField()),
+                ("p50_ms", models.FloatField()),
+                ("p95_ms", models.FloatField()),
+                ("p99_ms", models.FloatField()),
+                ("latency_samples", models.JSONField(default=list)),
+                ("throughput_samples", models.JSONField(default=list)),
+                ("environment", models.JSONField(default=dict)),
+                ("comparison", models.JSONField(default=dict)),
+                ("regression", models.BooleanField(default=False)),
+                ("is_baseline", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "baseline",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="tasks.benchmarkrun",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["scenario", "mode", "-created_at"],
+                        name="tasks_bench_scenari_7638bd_idx",
+                    )
+                ],
+            },
+        ),
+    ]
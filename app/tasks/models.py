@@ -1,8 +1,22 @@
-from django.db import models
+from django.db import models, router
 from django.contrib.auth.models import User
 import uuid
 
 
+class TaskQuerySet(models.QuerySet):
+    def create(self, **kwargs):
+        """
+        Route the insert with the instance as hint, so routers can place it
+        by owner (the default create() only passes the model)
+        """
+        if self._db is not None:
+            return super().create(**kwargs)
+        obj = self.model(**kwargs)
+        self._for_write = True
+        obj.save(force_insert=True, using=router.db_for_write(self.model, instance=obj))
+        return obj
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ("TODO", "To Do"),
@@ -23,10 +37,15 @@ class Task(models.Model):
         max_length=20, choices=PRIORITY_CHOICES, default="MEDIUM"
     )
     due_date = models.DateTimeField(null=True, blank=True)
-    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tasks")
+    # No DB constraint: with sharding, tasks live in other databases than users
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="tasks", db_constraint=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
@@ -39,6 +58,39 @@ class Task(models.Model):
         return f"{self.title} ({self.status})"
 
 
+class ArchivedTask(models.Model):
+    """
+    Cold storage for DONE tasks moved out of the Task table (see archive.py)
+
+    Same columns as Task, with timestamps copied verbatim.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=20, choices=Task.PRIORITY_CHOICES)
+    due_date = models.DateTimeField(null=True, blank=True)
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_tasks",
+        db_constraint=False,
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["owner", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+
 class Alert(models.Model):
     """Store alert history"""
 
@@ -67,3 +119,60 @@ class Alert(models.Model):
 
     def __str__(self):
         return f"{self.severity}: {self.alert_type} at {self.created_at}"
+
+
+class TaskShardAssignment(models.Model):
+    """Pin an owner's tasks to a shard, overriding the hash placement"""
+
+    owner = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="task_shard", primary_key=True
+    )
+    alias = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.owner_id} -> {self.alias}"
+
+
+class BenchmarkRun(models.Model):
+    """
+    One benchmark harness run (see bench_harness.py)
+
+    Latency and per-batch throughput samples are kept so later runs can be
+    compared against this one statistically.
+    """
+
+    MODE_CHOICES = [
+        ("inprocess", "In-process"),
+        ("http", "HTTP"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    scenario = models.CharField(max_length=50)
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES)
+    requests = models.PositiveIntegerField()
+    errors = models.PositiveIntegerField(default=0)
+    duration_s = models.FloatField()
+    throughput_rps = models.FloatField()
+    p50_ms = models.FloatField()
+    p95_ms = models.FloatField()
+    p99_ms = models.FloatField()
+    latency_samples = models.JSONField(default=list)
+    throughput_samples = models.JSONField(default=list)
+    environment = models.JSONField(default=dict)
+    baseline = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    comparison = models.JSONField(default=dict)
+    regression = models.BooleanField(default=False)
+    is_baseline = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["scenario", "mode", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.scenario} ({self.mode}) at {self.created_at}"
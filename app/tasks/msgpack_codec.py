@@ -0,0 +1,54 @@
+"""
+MessagePack encoding shared by the API renderer/parser
+
+UUIDs are packed as a 16 byte ext type and aware datetimes as the standard
+msgpack Timestamp extension, both far smaller than their string forms.
+"""
+import datetime
+import decimal
+import uuid
+
+import msgpack
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+
+# Application-specific msgpack ext type codes (0-127)
+UUID_EXT_TYPE = 1
+
+
+def _default(obj):
+    """Encode types msgpack doesn't know about"""
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(UUID_EXT_TYPE, obj.bytes)
+    if isinstance(obj, datetime.datetime):
+        # Aware datetimes are handled natively (datetime=True)
+        return obj.isoformat()
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def _ext_hook(code, data):
+    if code == UUID_EXT_TYPE:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def packb(data):
+    """Serialize ``data`` to MessagePack bytes"""
+    return msgpack.packb(data, default=_default, use_bin_type=True, datetime=True)
+
+
+def unpackb(payload):
+    """Deserialize MessagePack bytes (timestamps become aware UTC datetimes)"""
+    return msgpack.unpackb(
+        payload, ext_hook=_ext_hook, timestamp=3, raw=False, strict_map_key=False
+    )
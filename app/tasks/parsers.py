@@ -0,0 +1,21 @@
+"""
+Custom parsers for Task Manager API
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from . import msgpack_codec
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses MessagePack-serialized request bodies
+    """
+
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack_codec.unpackb(stream.read())
+        except Exception as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
@@ -0,0 +1,301 @@
+"""
+On-demand profiling of single requests
+
+``RequestProfilingMiddleware`` profiles a request when
+
+- it carries the ``HEADER`` (``X-Profile: 1``) with a staff user's API
+  token (checked before the request runs, so others can't trigger it), or
+- it is the random 1-in-``SAMPLE_EVERY`` sample (0 turns sampling off).
+
+Both need ``REQUEST_PROFILING["ENABLED"]``. ``MODE`` picks the profiler:
+
+- ``"sampling"``: a thread records the request thread's stack every
+  ``SAMPLE_INTERVAL`` seconds; stored as collapsed stacks (``.folded``,
+  one ``frame;frame;frame count`` line per stack) for flamegraph.pl or
+  speedscope. Low overhead, statistical.
+- ``"cprofile"``: deterministic cProfile; stored as pstats (``.prof``) for
+  ``python -m pstats`` or snakeviz. Exact call counts, slows the request.
+
+Profiles get a server-generated id (returned in ``X-Profile-Id``) and are
+kept in ``DIRECTORY`` on the worker's host, with a JSON sidecar describing
+the request, including the client's ``X-Request-ID`` if it sent one. After each write the
+oldest profiles are removed beyond ``MAX_FILES`` or ``MAX_BYTES``. Staff
+list and download them at ``/api/v1/profiles/``.
+"""
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from prometheus_client import Counter as PrometheusCounter
+from rest_framework import exceptions
+
+from .authentication import CachedTokenAuthentication
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUEST_PROFILING = {
+    "ENABLED": False,
+    "HEADER": "X-Profile",
+    # Profile one request in this many (0: only on request)
+    "SAMPLE_EVERY": 0,
+    "MODE": "sampling",
+    "SAMPLE_INTERVAL": 0.005,
+    "DIRECTORY": "profiles",
+    "MAX_FILES": 200,
+    "MAX_BYTES": 50 * 1024 * 1024,
+}
+
+MODES = {"sampling": ".folded", "cprofile": ".prof"}
+
+SAFE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+profiles_written = PrometheusCounter(
+    "taskmgr_request_profiles_total",
+    "Requests profiled",
+    ["trigger"],
+)
+
+
+def get_config():
+    return {**DEFAULT_REQUEST_PROFILING, **getattr(settings, "REQUEST_PROFILING", {})}
+
+
+def client_request_id(request):
+    """The client's X-Request-ID, if it looks like one"""
+    given = request.META.get("HTTP_X_REQUEST_ID", "")
+    return given if SAFE_ID.match(given) else None
+
+
+def is_staff_request(request):
+    """Whether the request carries a staff user's API token"""
+    try:
+        result = CachedTokenAuthentication().authenticate(request)
+    except exceptions.AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+def collapse(frame):
+    """``outer;...;inner`` for a frame and its callers"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        names.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names)).replace(" ", "_")
+
+
+class StackSampler:
+    """Samples one thread's stack from a background thread"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self):
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+class RequestProfiler:
+    """Runs a request under the configured profiler and stores the result"""
+
+    def __init__(self, config):
+        self.config = config
+        self.mode = config["MODE"]
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {self.mode!r}")
+
+    def run(self, func, *args):
+        """``func(*args)`` under the profiler; returns (result, profile data)"""
+        if self.mode == "cprofile":
+            profile = cProfile.Profile()
+            result = profile.runcall(func, *args)
+            return result, profile
+        sampler = StackSampler(threading.get_ident(), self.config["SAMPLE_INTERVAL"])
+        sampler.start()
+        try:
+            result = func(*args)
+        finally:
+            sampler.stop()
+        return result, sampler
+
+    def save(self, profile_id, data, metadata):
+        directory = self.config["DIRECTORY"]
+        os.makedirs(directory, exist_ok=True)
+        filename = profile_id + MODES[self.mode]
+        path = os.path.join(directory, filename)
+        if self.mode == "cprofile":
+            data.dump_stats(path)
+            samples = None
+        else:
+            with open(path, "w") as f:
+                f.write(data.folded())
+            samples = sum(data.stacks.values())
+        metadata = {
+            **metadata,
+            "id": profile_id,
+            "mode": self.mode,
+            "file": filename,
+            "bytes": os.path.getsize(path),
+            "samples": samples,
+        }
+        with open(os.path.join(directory, profile_id + ".json"), "w") as f:
+            json.dump(metadata, f)
+        enforce_retention(directory, self.config["MAX_FILES"], self.config["MAX_BYTES"])
+        return metadata
+
+
+def _profile_files(directory):
+    """{profile id: [paths]} for everything in the profile directory"""
+    files = {}
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return files
+    for name in names:
+        profile_id, extension = os.path.splitext(name)
+        if extension in (".json", *MODES.values()):
+            files.setdefault(profile_id, []).append(os.path.join(directory, name))
+    return files
+
+
+def enforce_retention(directory, max_files, max_bytes):
+    """Delete the oldest profiles beyond ``max_files`` or ``max_bytes``"""
+    profiles = []
+    for profile_id, paths in _profile_files(directory).items():
+        try:
+            stats = [os.stat(path) for path in paths]
+        except FileNotFoundError:
+            # Removed by another worker meanwhile
+            continue
+        profiles.append(
+            (
+                max(stat.st_mtime for stat in stats),
+                sum(stat.st_size for stat in stats),
+                paths,
+            )
+        )
+    profiles.sort(reverse=True)
+
+    kept_bytes = 0
+    removed = 0
+    for index, (_, size, paths) in enumerate(profiles):
+        kept_bytes += size
+        if index < max_files and kept_bytes <= max_bytes:
+            continue
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        removed += 1
+    return removed
+
+
+def list_profiles(directory):
+    """Metadata of the stored profiles, newest first"""
+    profiles = []
+    for profile_id, paths in _profile_files(directory).items():
+        sidecar = os.path.join(directory, profile_id + ".json")
+        if sidecar not in paths:
+            continue
+        try:
+            with open(sidecar) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    profiles.sort(key=lambda profile: profile["created_at"], reverse=True)
+    return profiles
+
+
+def profile_path(directory, profile_id):
+    """(path, metadata) of a stored profile, or None"""
+    if not SAFE_ID.match(profile_id):
+        return None
+    try:
+        with open(os.path.join(directory, profile_id + ".json")) as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None
+    path = os.path.join(directory, os.path.basename(metadata["file"]))
+    return (path, metadata) if os.path.exists(path) else None
+
+
+class ProfilingDecider:
+    """Whether to profile a request, and why"""
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+
+    def trigger(self, request, config):
+        """ "header", "sample" or None"""
+        header = "HTTP_" + config["HEADER"].upper().replace("-", "_")
+        if request.META.get(header) and is_staff_request(request):
+            return "header"
+        sample_every = config["SAMPLE_EVERY"]
+        if sample_every and self.rng.random() * sample_every < 1:
+            return "sample"
+        return None
+
+
+profiling_decider = ProfilingDecider()
+
+
+def profile_request(get_response, request, trigger, config):
+    """Handle the request under the profiler and store the profile"""
+    # Not the client's request id: that could overwrite another profile
+    profile_id = uuid.uuid4().hex
+    profiler = RequestProfiler(config)
+    started_at = time.time()
+    start = time.perf_counter()
+    response, data = profiler.run(get_response, request)
+    duration_ms = (time.perf_counter() - start) * 1000
+    try:
+        profiler.save(
+            profile_id,
+            data,
+            {
+                "created_at": started_at,
+                "method": request.method,
+                "path": request.path_info,
+                "status": response.status_code,
+                "duration_ms": round(duration_ms, 3),
+                "trigger": trigger,
+                "request_id": client_request_id(request),
+            },
+        )
+        profiles_written.labels(trigger=trigger).inc()
+        response["X-Profile-Id"] = profile_id
+    except Exception as e:
+        logger.error(f"Could not store request profile {profile_id}: {e}")
+    return response
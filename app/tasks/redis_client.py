@@ -0,0 +1,211 @@
+"""
+Shared Redis clients
+
+Everything in ``app.tasks`` that talks to Redis directly goes through
+``get_redis()``, which reuses django-redis's connection pool for the
+default cache, so a worker holds at most ``REDIS_POOL["MAX_CONNECTIONS"]``
+connections. Pools are blocking: when all connections are busy, callers
+wait up to ``REDIS_POOL["TIMEOUT"]`` seconds for one instead of opening
+more. Pool usage and wait times are exported to Prometheus.
+
+``InvalidationChannel`` broadcasts local cache invalidations to every
+worker over pub/sub.
+"""
+import logging
+import threading
+import time
+
+import redis
+from django.conf import settings
+from prometheus_client import Gauge, Histogram
+
+from .circuit_breaker import CircuitOpen, redis_breaker
+from .fault_injection import redis_failure_active
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REDIS_POOL = {
+    "MAX_CONNECTIONS": 50,
+    "TIMEOUT": 1,
+}
+
+# Seconds between invalidation listener reconnect attempts
+LISTENER_RETRY = 5
+
+pool_connections_in_use = Gauge(
+    "taskmgr_redis_pool_connections_in_use",
+    "Redis connections checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+pool_connections_max = Gauge(
+    "taskmgr_redis_pool_connections_max",
+    "Redis pool size limit",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+pool_wait_seconds = Histogram(
+    "taskmgr_redis_pool_wait_seconds",
+    "Time spent waiting for a Redis connection from the pool",
+    ["pool"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+
+
+def get_pool_config():
+    return {**DEFAULT_REDIS_POOL, **getattr(settings, "REDIS_POOL", {})}
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """BlockingConnectionPool that reports usage and wait time"""
+
+    # Label for the metrics; django-redis builds the "cache" pool itself
+    name = "cache"
+
+    def get_connection(self, command_name, *keys, **options):
+        fault = redis_failure_active()
+        if fault:
+            raise redis.ConnectionError(f"Injected Redis failure ({fault})")
+        start = time.perf_counter()
+        connection = super().get_connection(command_name, *keys, **options)
+        pool_wait_seconds.labels(pool=self.name).observe(time.perf_counter() - start)
+        self._update_usage()
+        return connection
+
+    def release(self, connection):
+        super().release(connection)
+        self._update_usage()
+
+    def in_use(self):
+        idle = sum(1 for connection in self.pool.queue if connection is not None)
+        return len(self._connections) - idle
+
+    def _update_usage(self):
+        pool_connections_in_use.labels(pool=self.name).set(self.in_use())
+        pool_connections_max.labels(pool=self.name).set(self.max_connections)
+
+    def stats(self):
+        return {
+            "in_use": self.in_use(),
+            "created": len(self._connections),
+            "max": self.max_connections,
+        }
+
+
+def create_pool(url, name, **kwargs):
+    """Pool for ``url`` sized by ``REDIS_POOL``"""
+    config = get_pool_config()
+    pool = InstrumentedConnectionPool.from_url(
+        url,
+        max_connections=config["MAX_CONNECTIONS"],
+        timeout=config["TIMEOUT"],
+        **kwargs,
+    )
+    pool.name = name
+    return pool
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_own_client(name, **kwargs):
+    url = getattr(settings, "REDIS_URL", None)
+    if not url:
+        return None
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            client = _clients[name] = redis.Redis(
+                connection_pool=create_pool(url, name, **kwargs)
+            )
+    return client
+
+
+def get_redis():
+    """
+    Client on the default cache's pool, or None if Redis isn't configured
+
+    Falls back to a pool of its own when the cache isn't django-redis
+    (e.g. management commands run with another cache backend).
+    """
+    from django_redis import get_redis_connection
+
+    try:
+        return get_redis_connection("default")
+    except NotImplementedError:
+        return _get_own_client(
+            "default",
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+
+
+def get_blocking_redis():
+    """
+    Client for blocking commands (BRPOP), or None if Redis isn't configured
+
+    The cache pool's short read timeout would cut blocking calls off, so
+    these use a separate pool without one.
+    """
+    return _get_own_client(
+        "blocking", socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT
+    )
+
+
+class InvalidationChannel:
+    """
+    Pub/sub channel telling every worker to drop keys from a local cache
+
+    Each process runs one listener thread (started by ``ensure_listening``)
+    calling ``on_message(key)`` per message, and ``on_connect()`` after
+    every (re)subscribe since messages sent while disconnected are lost.
+    Without Redis nothing is sent or received.
+    """
+
+    def __init__(self, channel, on_message, on_connect, name):
+        self.channel = channel
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.name = name
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def publish(self, key):
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            redis_breaker.call(client.publish, self.channel, key)
+        except CircuitOpen:
+            pass
+        except Exception as e:
+            logger.error(f"Invalidation publish on {self.channel} failed: {e}")
+
+    def ensure_listening(self):
+        """Start this process's listener if Redis is configured"""
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            client = get_blocking_redis()
+            if client is None:
+                return
+            self._listener = threading.Thread(
+                target=self.listen, args=(client,), name=self.name, daemon=True
+            )
+            self._listener.start()
+
+    def listen(self, client):
+        while True:
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self.on_connect()
+                for message in pubsub.listen():
+                    data = message["data"]
+                    self.on_message(data.decode() if isinstance(data, bytes) else data)
+            except Exception as e:
+                logger.error(f"Invalidation listener {self.name} error: {e}")
+                time.sleep(LISTENER_RETRY)
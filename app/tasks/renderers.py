@@ -0,0 +1,82 @@
+"""
+Custom renderers for Task Manager API
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from . import msgpack_codec
+from .server_timing import timed_phase
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson.
+
+    Produces the same bytes as the stock DRF renderer for compact, unicode
+    output, except for floats: orjson writes ``1e16`` for ``1e+16`` and
+    ``null`` for NaN/Infinity. Only used by ``TaskViewSet``, whose payloads
+    hold no floats; other views keep the stock renderer.
+
+    Indented output (browsable API or ``Accept: application/json;
+    indent=4``), non-compact settings and any payload orjson cannot encode
+    fall back to the stock renderer.
+    """
+
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+    )
+
+    @timed_phase("render")
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+
+        if (
+            orjson is None
+            or indent is not None
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=self.ORJSON_OPTIONS
+            )
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same javascript-subset escaping as JSONRenderer
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer which serializes to MessagePack.
+
+    ``native_types`` tells views they may hand over UUID and datetime objects
+    instead of their string forms so they get packed compactly.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    native_types = True
+
+    @timed_phase("render")
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack_codec.packb(data)
@@ -0,0 +1,322 @@
+"""
+Synthetic users and tasks for benchmarks and staging
+
+Owners get tasks in a Zipf-like distribution (a few owners hold most of
+the rows, like real tenants), and tasks get configurable distributions of
+status, priority, due dates, description sizes and creation times (see
+``DEFAULT_DISTRIBUTION``).
+
+On SQLite, rows are generated directly in their stored form and inserted
+with batched ``executemany`` in large transactions: ``bulk_create`` spends
+most of its time preparing each value in Python and splits batches into
+~100-row statements to stay under SQLite's variable limit. Generation can
+run in worker processes while the main process inserts. Other databases
+get the same rows through ``bulk_create``. With sharding on, each batch is
+split by the owners' shards and inserted on each shard's connection.
+"""
+import multiprocessing
+import random
+import uuid
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from . import sharding
+from .models import Task
+from .sqlite_tuning import bulk_load_pragmas
+
+STATUS_WEIGHTS = {"TODO": 40, "IN_PROGRESS": 20, "DONE": 40}
+PRIORITY_WEIGHTS = {"LOW": 30, "MEDIUM": 50, "HIGH": 20}
+
+DEFAULT_DISTRIBUTION = {
+    "status": STATUS_WEIGHTS,
+    "priority": PRIORITY_WEIGHTS,
+    # Share of tasks without a due date
+    "due_date_null": 0.3,
+    # Due dates fall this many days (min, max) after creation
+    "due_date_days": (-5, 60),
+    # Words per description (min, max)
+    "description_words": (5, 30),
+    # Tasks are created over this many days before now
+    "created_days": 365,
+}
+
+WORDS = (
+    "release review deploy report meeting invoice budget roadmap customer "
+    "backlog design migration incident onboarding audit"
+).split()
+
+# Titles and descriptions are drawn from pools this large
+TEXT_POOL_SIZE = 5000
+
+# Column order of the rows produced by generate_rows()
+TASK_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "owner",
+    "created_at",
+    "updated_at",
+)
+
+
+def owner_weights(count, exponent=1.1):
+    """Zipf weights: owner i gets a share proportional to 1 / (i + 1) ** exponent"""
+    return [1 / (i + 1) ** exponent for i in range(count)]
+
+
+def get_distribution(overrides=None):
+    return {**DEFAULT_DISTRIBUTION, **(overrides or {})}
+
+
+def parse_weights(spec, choices):
+    """``"TODO=40,DONE=60"`` -> ``{"TODO": 40.0, "DONE": 60.0}``"""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in choices:
+            raise ValueError(f"Unknown value {name!r}, expected one of {choices}")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight for {name}: {weight!r}")
+        if weights[name] < 0:
+            raise ValueError(f"Negative weight for {name}")
+    if not any(weights.values()):
+        raise ValueError("No positive weights")
+    return weights
+
+
+def parse_range(spec):
+    """``"5:30"`` -> ``(5, 30)``"""
+    low, _, high = spec.partition(":")
+    try:
+        low, high = int(low), int(high)
+    except ValueError:
+        raise ValueError(f"Expected MIN:MAX, got {spec!r}")
+    if low > high:
+        raise ValueError(f"Empty range {spec!r}")
+    return low, high
+
+
+def create_owners(count, prefix="seed", password=None, batch_size=1000):
+    """
+    Create ``count`` users sharing one password hash; returns their ids
+
+    Without ``password`` the users can't log in (tokens only).
+    """
+    run_id = uuid.uuid4().hex[:8]
+    password = make_password(password)
+    created = []
+    for start in range(0, count, batch_size):
+        with transaction.atomic():
+            created += User.objects.bulk_create(
+                User(username=f"{prefix}-{run_id}-{i}", password=password)
+                for i in range(start, min(count, start + batch_size))
+            )
+    if created and created[0].pk is None:
+        # Backends that don't return ids from bulk inserts
+        users = User.objects.filter(username__startswith=f"{prefix}-{run_id}-")
+        return sorted(users.values_list("pk", flat=True))
+    return [user.pk for user in created]
+
+
+def create_tokens(user_ids, batch_size=1000):
+    """Create an API token per user; returns the keys in the same order"""
+    tokens = [Token(key=Token.generate_key(), user_id=pk) for pk in user_ids]
+    for start in range(0, len(tokens), batch_size):
+        with transaction.atomic():
+            Token.objects.bulk_create(tokens[start : start + batch_size])
+    return [token.key for token in tokens]
+
+
+@contextmanager
+def historical_timestamps():
+    """Let ``bulk_create`` keep the created_at/updated_at values we set"""
+    fields = [Task._meta.get_field("created_at"), Task._meta.get_field("updated_at")]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _uuid4_hex(rng):
+    value = rng.getrandbits(128)
+    # Version 4, RFC 4122 variant, like uuid.uuid4()
+    value = (value & ~(0xF000 << 64)) | (0x4000 << 64)
+    value = (value & ~(0xC000 << 48)) | (0x8000 << 48)
+    return "%032x" % value
+
+
+def _text_pools(rng, distribution, size):
+    low, high = distribution["description_words"]
+    titles = [
+        " ".join(rng.choices(WORDS, k=3)).capitalize() + f" {i}" for i in range(size)
+    ]
+    descriptions = [
+        " ".join(rng.choices(WORDS, k=rng.randint(low, high))) for _ in range(size)
+    ]
+    return titles, descriptions
+
+
+def generate_rows(count, owner_ids, weights, distribution, seed, now):
+    """
+    ``count`` task rows as tuples in ``TASK_FIELDS`` order, with ids and
+    datetimes formatted the way Django stores them on SQLite (hex UUIDs,
+    naive UTC timestamps)
+    """
+    rng = random.Random(seed)
+    titles, descriptions = _text_pools(rng, distribution, min(count, TEXT_POOL_SIZE))
+    statuses, status_weights = zip(*distribution["status"].items())
+    priorities, priority_weights = zip(*distribution["priority"].items())
+    due_low, due_high = distribution["due_date_days"]
+    due_null = distribution["due_date_null"]
+    span = int(distribution["created_days"] * 86400)
+    now = now.astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+    owners = rng.choices(owner_ids, cum_weights=list(accumulate(weights)), k=count)
+    status_column = rng.choices(statuses, status_weights, k=count)
+    priority_column = rng.choices(priorities, priority_weights, k=count)
+    title_column = rng.choices(titles, k=count)
+    description_column = rng.choices(descriptions, k=count)
+
+    rows = []
+    for i in range(count):
+        created_at = now - timedelta(seconds=rng.randrange(span + 1))
+        due_date = None
+        if rng.random() >= due_null:
+            due_date = str(created_at + timedelta(days=rng.randint(due_low, due_high)))
+        rows.append(
+            (
+                _uuid4_hex(rng),
+                title_column[i],
+                description_column[i],
+                status_column[i],
+                priority_column[i],
+                due_date,
+                owners[i],
+                str(created_at),
+                str(created_at + timedelta(seconds=rng.randrange(86400))),
+            )
+        )
+    return rows
+
+
+def _generate_chunk(args):
+    # Worker process entry point
+    return generate_rows(*args)
+
+
+def _task_from_row(row):
+    """Unsaved Task for a generate_rows() row, for databases other than SQLite"""
+    values = dict(zip(TASK_FIELDS, row))
+    values["id"] = uuid.UUID(values["id"])
+    values["owner_id"] = values.pop("owner")
+    for name in ("due_date", "created_at", "updated_at"):
+        if values[name] is not None:
+            values[name] = datetime.fromisoformat(values[name]).replace(
+                tzinfo=dt_timezone.utc
+            )
+    return Task(**values)
+
+
+def insert_sql(connection):
+    """INSERT for rows from generate_rows(), using the Task table's columns"""
+    meta = Task._meta
+    columns = ", ".join(
+        connection.ops.quote_name(meta.get_field(name).column) for name in TASK_FIELDS
+    )
+    placeholders = ", ".join(["%s"] * len(TASK_FIELDS))
+    return (
+        f"INSERT INTO {connection.ops.quote_name(meta.db_table)} "
+        f"({columns}) VALUES ({placeholders})"
+    )
+
+
+def insert_rows(rows, using):
+    """Insert generate_rows() output into ``using`` in one transaction"""
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.executemany(insert_sql(connection), rows)
+        else:
+            Task.objects.using(using).bulk_create(
+                [_task_from_row(row) for row in rows], batch_size=1000
+            )
+
+
+def _chunks(count, chunk_size):
+    start = 0
+    while start < count:
+        yield min(chunk_size, count - start)
+        start += chunk_size
+
+
+def seed_tasks(
+    count,
+    owner_ids,
+    weights=None,
+    batch_size=50_000,
+    seed=None,
+    distribution=None,
+    workers=0,
+    progress=None,
+):
+    """
+    Insert ``count`` tasks; returns the number created
+
+    Each batch is one transaction per shard it touches. With ``workers`` >
+    0, batches are generated in that many processes while this one
+    inserts. ``progress`` is called with the running total after each
+    batch.
+    """
+    weights = weights or owner_weights(len(owner_ids))
+    distribution = get_distribution(distribution)
+    seed = random.randrange(2**32) if seed is None else seed
+    shard_of = {owner_id: sharding.shard_for_owner(owner_id) for owner_id in owner_ids}
+    owner_column = TASK_FIELDS.index("owner")
+
+    now = timezone.now()
+    jobs = [
+        (size, owner_ids, weights, distribution, seed + i, now)
+        for i, size in enumerate(_chunks(count, batch_size))
+    ]
+    created = 0
+    with ExitStack() as stack:
+        stack.enter_context(historical_timestamps())
+        for alias in sorted(set(shard_of.values())):
+            stack.enter_context(bulk_load_pragmas(connections[alias]))
+        pool = multiprocessing.Pool(workers) if workers > 0 else None
+        try:
+            batches = (
+                pool.imap(_generate_chunk, jobs)
+                if pool
+                else (generate_rows(*job) for job in jobs)
+            )
+            for rows in batches:
+                by_shard = {}
+                for row in rows:
+                    by_shard.setdefault(shard_of[row[owner_column]], []).append(row)
+                for alias, shard_rows in by_shard.items():
+                    insert_rows(shard_rows, alias)
+                created += len(rows)
+                if progress:
+                    progress(created)
+        finally:
+            if pool:
+                pool.terminate()
+    return created
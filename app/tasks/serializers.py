@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Task, Alert
+from .server_timing import timed_phase
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -21,6 +22,14 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
+class TimedListSerializer(serializers.ListSerializer):
+    """ListSerializer counted as one ``serialize`` phase in Server-Timing"""
+
+    @timed_phase("serialize")
+    def to_representation(self, data):
+        return super().to_representation(data)
+
+
 class TaskSerializer(serializers.ModelSerializer):
     """Serializer for Task model"""
 
@@ -40,6 +49,18 @@ class TaskSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "owner", "created_at", "updated_at"]
+        list_serializer_class = TimedListSerializer
+
+    # Fields kept as UUID/datetime objects when the view asks for native types
+    NATIVE_FIELDS = ("id", "due_date", "created_at", "updated_at")
+
+    @timed_phase("serialize")
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if self.context.get("native_types"):
+            for field in self.NATIVE_FIELDS:
+                data[field] = getattr(instance, field)
+        return data
 
 
 class AlertSerializer(serializers.ModelSerializer):
@@ -102,3 +123,5 @@ class MetricsSummarySerializer(serializers.Serializer):
     ab_metrics = serializers.DictField(required=False)
     # Número de alertas generadas durante la petición (opcional)
     alerts_triggered = serializers.IntegerField(required=False)
+    # Tiempo y llamadas por fase (Server-Timing), si se registran (opcional)
+    phases = serializers.DictField(required=False)
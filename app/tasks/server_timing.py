@@ -0,0 +1,173 @@
+"""
+Per-request phase timings, sent as a ``Server-Timing`` header
+
+With ``SERVER_TIMING["ENABLED"]``, ``ServerTimingMiddleware`` tracks for
+each request the time spent and number of calls per phase:
+
+- ``db``: queries, via ``connection.execute_wrapper`` on every connection
+- ``cache``: Django cache calls through ``guarded_cache``
+- ``auth``: token authentication
+- ``throttle``: rate limit checks
+- ``serialize``: TaskSerializer and TaskRowSerializer
+- ``render``: the JSON/MessagePack renderers
+- ``metrics``: MetricsMiddleware bookkeeping
+- ``total``: the whole request below this middleware
+
+and answers with e.g. ``Server-Timing: db;dur=4.1;desc="3 calls",
+total;dur=9.8``. Phases can nest (queries run during authentication count
+in both ``db`` and ``auth``); a phase re-entered while already running is
+counted once.
+
+With ``RECORD_METRICS`` the totals also go to the per-minute metrics store
+(``metrics:phases:<minute>``), summarized under ``phases`` in
+``/api/v1/metrics/summary/``.
+
+Disabled, instrumented code pays one context variable lookup per call.
+"""
+import contextvars
+import functools
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_SERVER_TIMING = {
+    "ENABLED": False,
+    "RECORD_METRICS": False,
+}
+
+# Seconds the per-minute aggregates are kept, like the other metrics keys
+METRICS_TTL = 3600
+
+_current = contextvars.ContextVar("server_timing", default=None)
+
+
+def get_config():
+    return {**DEFAULT_SERVER_TIMING, **getattr(settings, "SERVER_TIMING", {})}
+
+
+class RequestTimings:
+    """Seconds and call count per phase for one request"""
+
+    __slots__ = ("phases", "active")
+
+    def __init__(self):
+        self.phases = {}
+        self.active = set()
+
+    def add(self, phase, seconds, count=1):
+        totals = self.phases.get(phase)
+        if totals is None:
+            self.phases[phase] = [seconds, count]
+        else:
+            totals[0] += seconds
+            totals[1] += count
+
+    def header(self):
+        """``Server-Timing`` value, phases in the order they were first seen"""
+        entries = []
+        for phase, (seconds, count) in self.phases.items():
+            entry = f"{phase};dur={seconds * 1000:.2f}"
+            if phase != "total":
+                entry += f';desc="{count} call{"" if count == 1 else "s"}"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+def current():
+    """Timings of the request being handled, None when not timing"""
+    return _current.get()
+
+
+@contextmanager
+def timed(phase):
+    """Count the enclosed code towards ``phase`` of the current request"""
+    timings = _current.get()
+    if timings is None or phase in timings.active:
+        yield
+        return
+    timings.active.add(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(phase)
+        timings.add(phase, time.perf_counter() - start)
+
+
+def timed_phase(phase):
+    """Decorator form of ``timed``"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            # Cheap enough for per-item calls while already in the phase
+            if timings is None or phase in timings.active:
+                return func(*args, **kwargs)
+            with timed(phase):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _time_query(execute, sql, params, many, context):
+    with timed("db"):
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def timing_request():
+    """Collect timings for the enclosed request; yields the RequestTimings"""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_time_query))
+            yield timings
+    finally:
+        _current.reset(token)
+
+
+def record_metrics(timings, cache, now=None):
+    """Add the request's phase totals to the per-minute metrics store"""
+    minute_key = (now or datetime.utcnow()).strftime("%Y-%m-%d-%H-%M")
+    key = f"metrics:phases:{minute_key}"
+    aggregates = cache.get(key, {"requests": 0, "phases": {}})
+    aggregates["requests"] += 1
+    for phase, (seconds, count) in timings.phases.items():
+        totals = aggregates["phases"].setdefault(phase, [0.0, 0, 0])
+        totals[0] += seconds * 1000
+        totals[1] += count
+        totals[2] += 1
+    cache.set(key, aggregates, METRICS_TTL)
+
+
+def summarize(aggregates):
+    """
+    Per-phase averages over several minutes of aggregates: time and calls
+    per request, and the share of requests that hit the phase
+    """
+    requests = sum(minute["requests"] for minute in aggregates)
+    if not requests:
+        return {}
+    merged = {}
+    for minute in aggregates:
+        for phase, (ms, count, hits) in minute["phases"].items():
+            totals = merged.setdefault(phase, [0.0, 0, 0])
+            totals[0] += ms
+            totals[1] += count
+            totals[2] += hits
+    return {
+        phase: {
+            "avg_ms": round(ms / requests, 3),
+            "avg_calls": round(count / requests, 2),
+            "requests_percent": round(hits / requests * 100, 1),
+        }
+        for phase, (ms, count, hits) in sorted(merged.items())
+    }
@@ -0,0 +1,189 @@
+"""
+Owner-based sharding of Task rows
+
+Opt-in: set ``settings.TASK_SHARDS`` to the database aliases holding Task
+rows. Each owner maps to one shard by a stable hash of ``owner_id``,
+unless a ``TaskShardAssignment`` pins them elsewhere (written by
+``manage.py reshard_tasks``). Users and everything else stay on
+``default``. ``fan_out``, ``count_all`` and ``ShardedResults`` run
+cross-owner queries (e.g. the admin changelist) on every shard.
+"""
+import logging
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS
+
+from .local_cache import LocalLRUCache
+from .models import Task, TaskShardAssignment
+from .circuit_breaker import guarded_cache as cache
+
+logger = logging.getLogger(__name__)
+
+# Workers may route with a stale assignment for up to this many seconds
+ASSIGNMENT_LOCAL_TTL = 5
+ASSIGNMENT_CACHE_TTL = 300
+
+_assignments = LocalLRUCache(maxsize=100000, ttl=ASSIGNMENT_LOCAL_TTL)
+
+
+def get_shards():
+    return list(getattr(settings, "TASK_SHARDS", []))
+
+
+def is_enabled():
+    return bool(get_shards())
+
+
+def hash_shard(owner_id, shards=None):
+    """Stable hash placement, independent of the Python hash seed"""
+    shards = shards or get_shards()
+    return shards[zlib.crc32(str(owner_id).encode()) % len(shards)]
+
+
+def _assignment_cache_key(owner_id):
+    return f"shard:owner:{owner_id}"
+
+
+def _load_assignment(owner_id):
+    key = _assignment_cache_key(owner_id)
+    try:
+        alias = cache.get(key)
+    except Exception as e:
+        logger.error(f"Shard assignment cache error: {e}")
+        alias = None
+
+    if alias is None:
+        alias = (
+            TaskShardAssignment.objects.using(DEFAULT_DB_ALIAS)
+            .filter(owner_id=owner_id)
+            .values_list("alias", flat=True)
+            .first()
+        ) or ""
+        try:
+            cache.set(key, alias, ASSIGNMENT_CACHE_TTL)
+        except Exception as e:
+            logger.error(f"Shard assignment cache error: {e}")
+    return alias or None
+
+
+def shard_for_owner(owner_id):
+    """Database alias holding ``owner_id``'s tasks"""
+    shards = get_shards()
+    if not shards:
+        return DEFAULT_DB_ALIAS
+
+    alias = _assignments.get(owner_id)
+    if alias is None:
+        alias = _load_assignment(owner_id) or hash_shard(owner_id, shards)
+        _assignments.set(owner_id, alias)
+    return alias
+
+
+def assign_owner(owner_id, alias):
+    """Pin ``owner_id`` to ``alias`` and drop cached placements"""
+    TaskShardAssignment.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        owner_id=owner_id, defaults={"alias": alias}
+    )
+    _assignments.delete(owner_id)
+    try:
+        cache.delete(_assignment_cache_key(owner_id))
+    except Exception as e:
+        logger.error(f"Shard assignment cache error: {e}")
+
+
+def task_queryset(owner_id, model=Task):
+    """Tasks (or ArchivedTasks) of one owner, on their shard"""
+    queryset = model.objects.filter(owner_id=owner_id)
+    if is_enabled():
+        queryset = queryset.using(shard_for_owner(owner_id))
+    return queryset
+
+
+def _sort_key(value):
+    # None sorts first, like SQLite
+    return (value is not None, value)
+
+
+def _attname(name):
+    if name == "pk":
+        return "pk"
+    try:
+        return Task._meta.get_field(name).attname
+    except FieldDoesNotExist:
+        return None
+
+
+def fan_out(build=None, order_by=None, limit=None):
+    """
+    Run a cross-owner Task query on every shard and merge the results
+
+    ``build`` receives each shard's base queryset and returns the query to
+    run. With ``order_by`` the merged list is sorted the same way (on the
+    Task's own fields); with ``limit`` each shard returns at most that many
+    rows and so does the merged list.
+    """
+    shards = get_shards() or [DEFAULT_DB_ALIAS]
+    results = []
+    for alias in shards:
+        queryset = Task.objects.using(alias)
+        if build is not None:
+            queryset = build(queryset)
+        if order_by:
+            queryset = queryset.order_by(*order_by)
+        if limit is not None:
+            queryset = queryset[:limit]
+        results.extend(queryset)
+
+    for field in reversed(order_by or []):
+        attname = _attname(field.lstrip("-")) if isinstance(field, str) else None
+        if attname is None:
+            continue
+        results.sort(
+            key=lambda obj: _sort_key(getattr(obj, attname)),
+            reverse=field.startswith("-"),
+        )
+    return results[:limit] if limit is not None else results
+
+
+def count_all(build=None):
+    """Count a cross-owner Task query over every shard"""
+    shards = get_shards() or [DEFAULT_DB_ALIAS]
+    total = 0
+    for alias in shards:
+        queryset = Task.objects.using(alias)
+        if build is not None:
+            queryset = build(queryset)
+        total += queryset.count()
+    return total
+
+
+class ShardedResults:
+    """
+    A Task queryset run on every shard, sliceable and countable like one
+    (e.g. by a Paginator)
+
+    A slice fetches up to its end from each shard and merges them in the
+    queryset's ordering, so deep pages cost more than shallow ones. Joins
+    from ``select_related`` are dropped: users only exist on ``default``.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.order_by = list(queryset.query.order_by) or ["-created_at", "-pk"]
+
+    def _build(self, base):
+        return self.queryset.using(base.db).select_related(None)
+
+    def count(self):
+        return count_all(self._build)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+        start, stop = index.start or 0, index.stop
+        return fan_out(self._build, self.order_by, stop)[start:stop]
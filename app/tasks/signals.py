@@ -0,0 +1,68 @@
+"""
+Signal handlers for Task Manager
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import coalescing, sharding
+from .task_cache import task_detail_cache
+from .authentication import token_cache
+from .models import ArchivedTask, Task
+from .sqlite_tuning import configure_sqlite_connection
+
+connection_created.connect(configure_sqlite_connection)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Drop a deleted token from the auth cache, once committed"""
+    key = instance.key
+    transaction.on_commit(lambda: token_cache.invalidate(key), using=instance._state.db)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Drop cached tokens when a user changes (e.g. is deactivated), once committed"""
+    if created:
+        return
+    keys = list(Token.objects.filter(user_id=instance.pk).values_list("key", flat=True))
+
+    def invalidate():
+        for key in keys:
+            token_cache.invalidate(key)
+
+    transaction.on_commit(invalidate, using=instance._state.db)
+
+
+@receiver(pre_delete, sender=User)
+def delete_sharded_tasks(sender, instance, **kwargs):
+    """The cascade only reaches the user's database, clear the other shards"""
+    for alias in sharding.get_shards():
+        if alias != instance._state.db:
+            Task.objects.using(alias).filter(owner_id=instance.pk).delete()
+            ArchivedTask.objects.using(alias).filter(owner_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_stats(sender, instance, **kwargs):
+    """Recompute the owner's coalesced /tasks/stats/ on the next call, once committed"""
+    owner_id = instance.owner_id
+    transaction.on_commit(
+        lambda: coalescing.invalidate("tasks_stats", user_id=owner_id),
+        using=instance._state.db,
+    )
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_detail(sender, instance, **kwargs):
+    """Drop the task from the near cache in every worker, once committed"""
+    task_id = str(instance.pk)
+    transaction.on_commit(
+        lambda: task_detail_cache.invalidate(task_id), using=instance._state.db
+    )
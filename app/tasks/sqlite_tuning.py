@@ -0,0 +1,82 @@
+"""
+SQLite connection tuning
+
+Applies ``settings.SQLITE_PRAGMAS`` to every new SQLite connection (via the
+``connection_created`` signal, see signals.py). ``SQLITE_ALIAS_PRAGMAS``
+overrides them per database alias; a value of None drops the pragma.
+``bulk_load_pragmas`` relaxes them temporarily for seeding.
+"""
+import re
+from contextlib import contextmanager
+
+from django.conf import settings
+
+_PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+_PRAGMA_VALUE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+
+def pragma_statements(pragmas):
+    """Build validated ``PRAGMA name=value`` statements"""
+    statements = []
+    for name, value in pragmas.items():
+        value = str(value)
+        if not _PRAGMA_NAME.match(name) or not _PRAGMA_VALUE.match(value):
+            raise ValueError(f"Invalid SQLite pragma: {name}={value}")
+        statements.append(f"PRAGMA {name}={value}")
+    return statements
+
+
+def apply_pragmas(cursor, pragmas):
+    """Run the pragmas on a DB-API cursor"""
+    for statement in pragma_statements(pragmas):
+        cursor.execute(statement)
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """``connection_created`` handler"""
+    if connection.vendor != "sqlite":
+        return
+
+    pragmas = {
+        **getattr(settings, "SQLITE_PRAGMAS", {}),
+        **getattr(settings, "SQLITE_ALIAS_PRAGMAS", {}).get(connection.alias, {}),
+    }
+    pragmas = {name: value for name, value in pragmas.items() if value is not None}
+    if not pragmas:
+        return
+
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, pragmas)
+
+
+# Durability traded for speed while bulk loading: a crash mid-load loses
+# the load, which is rerun anyway
+BULK_LOAD_PRAGMAS = {
+    "synchronous": "OFF",
+    "cache_size": -262144,
+    "temp_store": "MEMORY",
+}
+
+
+@contextmanager
+def bulk_load_pragmas(connection, pragmas=None):
+    """Apply ``BULK_LOAD_PRAGMAS`` on a Django connection, then restore the previous values"""
+    pragmas = pragmas or BULK_LOAD_PRAGMAS
+    # SQLite won't change the safety level inside a transaction
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        yield
+        return
+
+    with connection.cursor() as cursor:
+        saved = {}
+        for name in pragmas:
+            if not _PRAGMA_NAME.match(name):
+                raise ValueError(f"Invalid SQLite pragma: {name}")
+            cursor.execute(f"PRAGMA {name}")
+            saved[name] = cursor.fetchone()[0]
+        apply_pragmas(cursor, pragmas)
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor, saved)
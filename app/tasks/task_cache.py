@@ -0,0 +1,140 @@
+"""
+Near cache for task detail reads
+
+``GET /api/v1/tasks/<id>/`` rows are looked up in a per-process LRU, then
+in Redis, then in the database. Once a Task save or delete commits, its
+entry is replaced by a short-lived tombstone in this process and Redis and
+the id is published on a Redis channel; every worker runs a listener
+thread that tombstones it in its own LRU. Fills only go in where there is
+no entry (``cache.add``), so a reader that fetched the row before the
+commit can't put the old version back while the tombstone lasts
+(``TOMBSTONE_TTL``). Updates that bypass model signals
+(``QuerySet.update``) are only picked up when the entries expire.
+"""
+import logging
+
+from django.conf import settings
+from prometheus_client import Counter
+
+from .circuit_breaker import guarded_cache
+from .local_cache import LocalLRUCache
+from .redis_client import InvalidationChannel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASK_DETAIL_CACHE = {
+    "ENABLED": True,
+    "LOCAL_TTL": 30,
+    "LOCAL_MAXSIZE": 10000,
+    "REDIS_TTL": 300,
+    # Seconds an invalidated task refuses fills; longer than a detail read
+    "TOMBSTONE_TTL": 10,
+}
+
+KEY_PREFIX = "task:detail:"
+INVALIDATION_CHANNEL = "tasks:invalidate"
+
+# Cached in place of an invalidated entry
+TOMBSTONE = "invalidated"
+
+lookups = Counter(
+    "taskmgr_task_detail_cache_lookups_total",
+    "Task detail cache lookups by tier and result",
+    ["tier", "result"],
+)
+
+
+def get_config():
+    return {
+        **DEFAULT_TASK_DETAIL_CACHE,
+        **getattr(settings, "TASK_DETAIL_CACHE", {}),
+    }
+
+
+class TaskDetailCache:
+    """
+    Two-tier cache of task rows keyed by task id
+
+    Entries are ``(owner_id, row)``; a row is only returned to its owner.
+    """
+
+    def __init__(self):
+        config = get_config()
+        self.redis_ttl = config["REDIS_TTL"]
+        self.tombstone_ttl = config["TOMBSTONE_TTL"]
+        self.local = LocalLRUCache(
+            maxsize=config["LOCAL_MAXSIZE"], ttl=config["LOCAL_TTL"]
+        )
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.channel = InvalidationChannel(
+            INVALIDATION_CHANNEL,
+            on_message=self.tombstone,
+            # Invalidations may have been missed while disconnected
+            on_connect=lambda: self.local.clear(reset_stats=False),
+            name="task-cache",
+        )
+
+    def get(self, task_id, owner_id):
+        """Return the cached row for the owner, or None"""
+        self.ensure_listening()
+        local_entry = self.local.get(task_id)
+        if local_entry not in (None, TOMBSTONE):
+            lookups.labels(tier="local", result="hit").inc()
+            entry = local_entry
+        else:
+            lookups.labels(tier="local", result="miss").inc()
+            entry = guarded_cache.get(KEY_PREFIX + task_id)
+            if entry in (None, TOMBSTONE):
+                self.redis_misses += 1
+                lookups.labels(tier="redis", result="miss").inc()
+                return None
+            self.redis_hits += 1
+            lookups.labels(tier="redis", result="hit").inc()
+            if local_entry is None:
+                self.local.set(task_id, entry)
+
+        cached_owner_id, row = entry
+        return row if cached_owner_id == owner_id else None
+
+    def set(self, task_id, owner_id, row):
+        """Fill both tiers with a row read from the database, unless invalidated"""
+        entry = (owner_id, row)
+        # Refused while tombstoned (or already filled by another reader)
+        if guarded_cache.add(KEY_PREFIX + task_id, entry, self.redis_ttl):
+            self.local.set(task_id, entry)
+
+    def tombstone(self, task_id):
+        self.local.set(task_id, TOMBSTONE, ttl=self.tombstone_ttl)
+
+    def invalidate(self, task_id):
+        """Tombstone the entry here and in Redis, and tell the other workers"""
+        self.tombstone(task_id)
+        guarded_cache.set_tombstone(KEY_PREFIX + task_id, TOMBSTONE, self.tombstone_ttl)
+        self.channel.publish(task_id)
+
+    def ensure_listening(self):
+        """Start this process's invalidation listener if Redis is configured"""
+        self.channel.ensure_listening()
+
+    def stats(self):
+        """Hit ratios per tier for this process"""
+        redis_total = self.redis_hits + self.redis_misses
+        return {
+            "local": self.local.stats(),
+            "redis": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "hit_ratio": (
+                    round(self.redis_hits / redis_total, 4) if redis_total else 0
+                ),
+            },
+        }
+
+    def clear(self):
+        self.local.clear()
+        self.redis_hits = 0
+        self.redis_misses = 0
+
+
+task_detail_cache = TaskDetailCache()
@@ -0,0 +1,184 @@
+"""
+Sliding-window rate limiting for the API
+
+Each throttle scope (task reads, task writes, ``stats``, registration) has
+its own budget per user, or per client IP for anonymous requests. Budgets
+are shared by all workers through a Redis sorted set updated by one Lua
+script per request (a single round trip, timed with Redis' own clock).
+``THROTTLE_OVERRIDES`` gives individual users (by username) other rates,
+e.g. ``{"loadtest": {"tasks_read": "6000/min", "tasks_write": None}}``.
+
+If the cache isn't Redis, Redis errors or its circuit breaker is open,
+requests are checked against an in-process sliding window instead, so the
+API fails open rather than rejecting everyone when Redis is down.
+"""
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
+
+from .circuit_breaker import CircuitOpen, redis_breaker
+from .redis_client import get_redis
+from .server_timing import timed_phase
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ratelimit:"
+
+# KEYS[1]: window key; ARGV: limit, window (ms), unique member
+# Returns {allowed, remaining, retry_after_ms}
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('PEXPIRE', key, window)
+    return {1, limit - count - 1, 0}
+end
+
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+local retry_after = window
+if oldest[2] then
+    retry_after = tonumber(oldest[2]) + window - now
+end
+return {0, 0, retry_after}
+"""
+
+
+class LocalSlidingWindow:
+    """
+    In-process sliding window log, used when Redis is unavailable
+
+    Tracks at most ``max_keys`` identities, evicting the least recently
+    used. Budgets are per worker process.
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window):
+        """Record a request; returns (allowed, remaining, retry_after seconds)"""
+        now = time.monotonic()
+        with self._lock:
+            hits = self._windows.get(key)
+            if hits is None:
+                hits = self._windows[key] = deque()
+                if len(self._windows) > self.max_keys:
+                    self._windows.popitem(last=False)
+            else:
+                self._windows.move_to_end(key)
+
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+            if len(hits) < limit:
+                hits.append(now)
+                return True, limit - len(hits), 0
+            return False, 0, hits[0] + window - now
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
+
+
+class SlidingWindowRateLimiter:
+    """Redis sliding window with a local fallback"""
+
+    def __init__(self, local=None, breaker=redis_breaker):
+        self.local = local or LocalSlidingWindow()
+        self.breaker = breaker
+        self._script = None
+        self._script_client = None
+
+    def _get_script(self):
+        """Return the registered Lua script, or None if there's no Redis"""
+        client = get_redis()
+        if client is None:
+            return None
+        if client is not self._script_client:
+            self._script = client.register_script(SLIDING_WINDOW_LUA)
+            self._script_client = client
+        return self._script
+
+    def hit(self, key, limit, window):
+        """Record a request; returns (allowed, remaining, retry_after seconds)"""
+        try:
+            script = self._get_script()
+            if script is not None:
+                allowed, remaining, retry_after_ms = self.breaker.call(
+                    script,
+                    keys=[key],
+                    args=[limit, int(window * 1000), uuid.uuid4().hex],
+                )
+                return bool(allowed), remaining, retry_after_ms / 1000
+        except CircuitOpen:
+            pass
+        except Exception as e:
+            logger.warning(f"Rate limiter falling back to local windows: {e}")
+        return self.local.hit(key, limit, window)
+
+
+rate_limiter = SlidingWindowRateLimiter()
+
+
+class SlidingWindowScopedThrottle(ScopedRateThrottle):
+    """
+    ScopedRateThrottle backed by ``rate_limiter``
+
+    Views opt in with ``throttle_scope``; rates come from
+    ``DEFAULT_THROTTLE_RATES`` (a ``None`` rate disables the scope).
+    """
+
+    limiter = rate_limiter
+
+    @timed_phase("throttle")
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        # Read at request time so setting overrides take effect
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        self.rate = self.get_user_rate(request)
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        allowed, _, self.retry_after = self.limiter.hit(
+            self.get_cache_key(request, view), self.num_requests, self.duration
+        )
+        return allowed
+
+    def get_user_rate(self, request):
+        """The user's ``THROTTLE_OVERRIDES`` rate for the scope, else the default"""
+        user = request.user
+        if user and user.is_authenticated:
+            overrides = getattr(settings, "THROTTLE_OVERRIDES", {})
+            rates = overrides.get(user.get_username(), {})
+            if self.scope in rates:
+                return rates[self.scope]
+        return self.get_rate()
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        return f"{KEY_PREFIX}{self.scope}:{ident}"
+
+    def wait(self):
+        # Whole seconds for the Retry-After header, never 0
+        return max(1, math.ceil(self.retry_after))
@@ -0,0 +1,185 @@
+"""
+Sampled capture of real API traffic for replay
+
+When ``TRAFFIC_CAPTURE["ENABLED"]``, ``TrafficCaptureMiddleware`` records a
+``SAMPLE_RATE`` share of requests to an append-only log of msgpack
+records, one ``os.write`` each so several workers can share the file. A
+record holds the method, path, route name, query string (with sensitive
+parameters redacted), a SHA-256 of the body plus the body itself with
+sensitive fields redacted (``BODY_MODE "redact"``) or only the hash
+(``"hash"``), the wall-clock start time, the duration and status, and a
+keyed pseudonym of the user: ids are never written.
+
+``read_capture`` iterates over a log; see traffic_replay.py for replaying
+it.
+"""
+import hashlib
+import hmac
+import json
+import os
+import random
+import threading
+from urllib.parse import parse_qsl, urlencode
+
+import msgpack
+from django.conf import settings
+
+DEFAULT_TRAFFIC_CAPTURE = {
+    "ENABLED": False,
+    "SAMPLE_RATE": 0.01,
+    "PATH": "traffic.capture",
+    # "redact": redacted JSON body and its hash; "hash": the hash only
+    "BODY_MODE": "redact",
+    # Bodies larger than this are only hashed
+    "MAX_BODY_BYTES": 16384,
+    "REDACT_FIELDS": ("password", "token", "secret", "api_key", "authorization"),
+    "EXCLUDE_PATHS": ("/health", "/status", "/metrics"),
+    # HMAC key for user pseudonyms, SECRET_KEY when empty
+    "PSEUDONYM_KEY": "",
+}
+
+REDACTED = "[REDACTED]"
+
+# Record format version, bumped on incompatible changes
+FORMAT_VERSION = 1
+
+
+def get_config():
+    return {**DEFAULT_TRAFFIC_CAPTURE, **getattr(settings, "TRAFFIC_CAPTURE", {})}
+
+
+def pseudonym(user_id, key):
+    """Stable per user, not reversible without the key"""
+    digest = hmac.new(key.encode(), str(user_id).encode(), hashlib.sha256)
+    return digest.hexdigest()[:16]
+
+
+def redact(value, fields):
+    """Copy of a parsed JSON body with ``fields`` (any depth) replaced"""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key.lower() in fields else redact(item, fields)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item, fields) for item in value]
+    return value
+
+
+def capture_body(body, content_type, config):
+    """(sha256 hex, body to store or None)"""
+    if not body:
+        return None, None
+    digest = hashlib.sha256(body).hexdigest()
+    if config["BODY_MODE"] != "redact" or len(body) > config["MAX_BODY_BYTES"]:
+        return digest, None
+    if not content_type.startswith("application/json"):
+        return digest, None
+    try:
+        parsed = json.loads(body)
+    except ValueError:
+        return digest, None
+    fields = {field.lower() for field in config["REDACT_FIELDS"]}
+    return digest, redact(parsed, fields)
+
+
+def capture_query(query_string, config):
+    """Query string with the values of ``REDACT_FIELDS`` parameters replaced"""
+    if not query_string:
+        return ""
+    fields = {field.lower() for field in config["REDACT_FIELDS"]}
+    params = parse_qsl(query_string, keep_blank_values=True)
+    if not any(name.lower() in fields for name, _ in params):
+        return query_string
+    return urlencode(
+        [
+            (name, REDACTED if name.lower() in fields else value)
+            for name, value in params
+        ]
+    )
+
+
+class CaptureWriter:
+    """Appends records to the capture file, shared by the worker's threads"""
+
+    def __init__(self):
+        self._fd = None
+        self._path = None
+        self._lock = threading.Lock()
+
+    def write(self, record, path):
+        data = msgpack.packb(record, use_bin_type=True)
+        with self._lock:
+            if self._fd is None or self._path != path:
+                self._close()
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                self._path = path
+            os.write(self._fd, data)
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+capture_writer = CaptureWriter()
+
+
+def read_capture(path):
+    """Yield the records of a capture file, oldest first"""
+    with open(path, "rb") as f:
+        for record in msgpack.Unpacker(f, raw=False):
+            if isinstance(record, dict) and record.get("v") == FORMAT_VERSION:
+                yield record
+
+
+class TrafficCapture:
+    """Decides what to sample and builds the records"""
+
+    def __init__(self, writer=capture_writer, rng=None):
+        self.writer = writer
+        self.rng = rng or random.Random()
+
+    def should_capture(self, request, config):
+        if not config["ENABLED"] or self.rng.random() >= config["SAMPLE_RATE"]:
+            return False
+        return request.path_info.rstrip("/") not in config["EXCLUDE_PATHS"]
+
+    def record(self, request, response, started_at, duration, body, config):
+        match = getattr(request, "resolver_match", None)
+        user = getattr(request, "user", None)
+        user_id = user.pk if user is not None and user.is_authenticated else None
+        body_hash, stored_body = capture_body(
+            body, request.META.get("CONTENT_TYPE", ""), config
+        )
+        return {
+            "v": FORMAT_VERSION,
+            "ts": round(started_at, 6),
+            "m": request.method,
+            "p": request.path_info,
+            "r": match.view_name if match else None,
+            "q": capture_query(request.META.get("QUERY_STRING", ""), config),
+            "ct": request.META.get("CONTENT_TYPE", "") if body else "",
+            "bh": body_hash,
+            "b": stored_body,
+            "s": response.status_code,
+            "d": round(duration * 1000, 3),
+            "u": (
+                pseudonym(user_id, config["PSEUDONYM_KEY"] or settings.SECRET_KEY)
+                if user_id is not None
+                else None
+            ),
+        }
+
+    def write(self, record, config):
+        self.writer.write(record, config["PATH"])
+
+
+traffic_capture = TrafficCapture()
@@ -0,0 +1,184 @@
+"""
+Replay captured traffic against a test instance
+
+Requests are sent at their captured offsets from the first one, divided
+by ``speed`` (2 replays twice as fast). Requests of one user pseudonym go
+out in captured order, each after the previous one has been answered: if
+the test instance is slower than production, that user's later requests
+are delayed (reported as send lag) rather than reordered. Anonymous
+requests are independent.
+
+Pseudonyms are mapped to the given API tokens round-robin, so every
+captured user acts as the same test user throughout the replay.
+
+The report compares, per route, the latency captured in production (time
+spent in the Django stack) with the replayed latency (measured from the
+client, so it includes the network) and counts responses whose status
+differs from the captured one.
+"""
+import asyncio
+import time
+from collections import defaultdict
+
+from .loadgen import PERCENTILES, LatencyHistogram
+from .traffic_capture import read_capture
+
+
+def load_records(path, routes=None, limit=None):
+    """Captured records sorted by start time, optionally filtered by route name"""
+    records = [
+        record
+        for record in read_capture(path)
+        if not routes or record.get("r") in routes
+    ]
+    records.sort(key=lambda record: record["ts"])
+    return records[:limit] if limit else records
+
+
+def route_label(record):
+    return f"{record['m']} {record.get('r') or record['p']}"
+
+
+def assign_tokens(records, tokens):
+    """pseudonym -> token, round-robin in order of first appearance"""
+    mapping = {}
+    if not tokens:
+        return mapping
+    for record in records:
+        user = record.get("u")
+        if user is not None and user not in mapping:
+            mapping[user] = tokens[len(mapping) % len(tokens)]
+    return mapping
+
+
+def user_sequences(records):
+    """Records grouped into sequences that must be replayed in order"""
+    sequences = defaultdict(list)
+    for index, record in enumerate(records):
+        key = record.get("u")
+        sequences[key if key is not None else ("anonymous", index)].append(record)
+    return list(sequences.values())
+
+
+class RouteStats:
+    def __init__(self):
+        self.captured = LatencyHistogram()
+        self.replayed = LatencyHistogram()
+        self.status_mismatches = 0
+        self.errors = 0
+
+    def summary(self):
+        captured = self.captured.summary()
+        replayed = self.replayed.summary()
+        diff = {}
+        for key in ["mean"] + [f"p{percent:g}" for percent in PERCENTILES]:
+            if key in captured and key in replayed:
+                change = replayed[key] - captured[key]
+                diff[key] = {
+                    "ms": round(change, 3),
+                    "percent": (
+                        round(change / captured[key] * 100, 1)
+                        if captured[key]
+                        else None
+                    ),
+                }
+        return {
+            "requests": captured["count"],
+            "captured_ms": captured,
+            "replayed_ms": replayed,
+            "diff": diff,
+            "status_mismatches": self.status_mismatches,
+            "errors": self.errors,
+        }
+
+
+class TrafficReplayer:
+    """
+    Replays records on an ``httpx.AsyncClient`` whose base URL points at
+    the test instance
+    """
+
+    def __init__(self, client, records, tokens=None, speed=1.0):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.client = client
+        self.records = records
+        self.speed = speed
+        self.tokens = assign_tokens(records, tokens)
+        self.routes = defaultdict(RouteStats)
+        self.send_lag = LatencyHistogram()
+        self.skipped_bodies = 0
+        self.sent = 0
+
+    async def run(self):
+        if not self.records:
+            return self.report(0.0)
+        first = self.records[0]["ts"]
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(
+            *(
+                self._replay_sequence(sequence, start, first)
+                for sequence in user_sequences(self.records)
+            )
+        )
+        return self.report(loop.time() - start)
+
+    async def _replay_sequence(self, sequence, start, first):
+        loop = asyncio.get_running_loop()
+        for record in sequence:
+            intended = start + (record["ts"] - first) / self.speed
+            delay = intended - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.send_lag.record(max(0.0, loop.time() - intended))
+            await self._send(record)
+
+    def build_request(self, record):
+        """(method, url, headers, json body or None)"""
+        url = record["p"] + (f"?{record['q']}" if record.get("q") else "")
+        headers = {}
+        token = self.tokens.get(record.get("u"))
+        if token:
+            headers["Authorization"] = f"Token {token}"
+        body = record.get("b")
+        if body is None and record.get("bh"):
+            # Only the hash was captured: replay without the body
+            self.skipped_bodies += 1
+        return record["m"], url, headers, body
+
+    async def _send(self, record):
+        method, url, headers, body = self.build_request(record)
+        stats = self.routes[route_label(record)]
+        stats.captured.record(record["d"] / 1000)
+        self.sent += 1
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(
+                method, url, headers=headers, json=body
+            )
+        except Exception:
+            stats.errors += 1
+            return
+        stats.replayed.record(time.perf_counter() - started)
+        if response.status_code != record["s"]:
+            stats.status_mismatches += 1
+
+    def report(self, elapsed):
+        routes = {name: stats.summary() for name, stats in sorted(self.routes.items())}
+        captured_span = (
+            self.records[-1]["ts"] - self.records[0]["ts"] if self.records else 0.0
+        )
+        return {
+            "config": {"speed": self.speed, "users": len(self.tokens)},
+            "requests": self.sent,
+            "captured_span_s": round(captured_span, 3),
+            "elapsed_s": round(elapsed, 3),
+            "errors": sum(stats["errors"] for stats in routes.values()),
+            "status_mismatches": sum(
+                stats["status_mismatches"] for stats in routes.values()
+            ),
+            "bodies_not_captured": self.skipped_bodies,
+            "send_lag_ms": self.send_lag.summary(),
+            "routes": routes,
+        }
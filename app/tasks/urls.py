@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import TaskViewSet, UserRegistrationView
 from .views_metrics import metrics_summary
+from .views_profiles import profile_detail, profile_list
 from .views_alerts import AlertViewSet
 
 router = DefaultRouter()
@@ -11,5 +12,7 @@ router.register("alerts", AlertViewSet, basename="alert")
 urlpatterns = [
     path("auth/register/", UserRegistrationView.as_view(), name="register"),
     path("metrics/summary/", metrics_summary, name="metrics-summary"),
+    path("profiles/", profile_list, name="profile-list"),
+    path("profiles/<str:profile_id>/", profile_detail, name="profile-detail"),
     path("", include(router.urls)),
 ]
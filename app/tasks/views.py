@@ -1,12 +1,26 @@
+import uuid
+
+from django.conf import settings
+from django.db.models import Count
+from django.http import Http404
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, status
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import get_object_or_404
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated, AllowAny
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
-from .models import Task
+from . import sharding, task_cache
+from .coalescing import coalesced
+from .models import ArchivedTask
 from .permissions import IsOwner
+from .renderers import FastJSONRenderer, MessagePackRenderer
 from .filters import TaskFilter
+from .fast_serializers import TaskRowSerializer, is_fast_path_compatible
+from .write_queue import get_task_writer, submit_task_write
 from drf_spectacular.utils import extend_schema
 from .serializers import (
     UserRegistrationSerializer,
@@ -20,6 +34,7 @@ class UserRegistrationView(APIView):
     """API endpoint for user registration"""
 
     permission_classes = [AllowAny]
+    throttle_scope = "register"
 
     @extend_schema(
         request=UserRegistrationSerializer,
@@ -60,21 +75,207 @@ class TaskViewSet(viewsets.ModelViewSet):
 
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsOwner]
+    # Task payloads hold no floats, the one place orjson's output differs
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer, MessagePackRenderer]
     filterset_class = TaskFilter
     search_fields = ["title", "description"]
     ordering_fields = ["created_at", "updated_at", "due_date", "priority"]
     ordering = ["-created_at"]
 
+    @property
+    def throttle_scope(self):
+        """Separate rate limit budgets for reads, writes and stats"""
+        if self.action == "stats":
+            return "tasks_stats"
+        if self.request.method in SAFE_METHODS:
+            return "tasks_read"
+        return "tasks_write"
+
     def get_queryset(self):
         """Return tasks owned by the authenticated user"""
-        return Task.objects.filter(owner=self.request.user)
+        return sharding.task_queryset(self.request.user.pk)
+
+    def wants_native_types(self):
+        """True if the negotiated renderer packs UUIDs/datetimes natively"""
+        renderer = getattr(self.request, "accepted_renderer", None)
+        return getattr(renderer, "native_types", False)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["native_types"] = self.wants_native_types()
+        return context
+
+    def get_row_serializer(self):
+        # Shards don't hold auth_user, so the owner can't be joined there
+        owner_username = self.request.user.username if sharding.is_enabled() else None
+        return TaskRowSerializer(
+            native=self.wants_native_types(), owner_username=owner_username
+        )
+
+    def use_fast_read_path(self):
+        """Serve list/retrieve from values_list rows instead of TaskSerializer"""
+        return getattr(settings, "TASKS_FAST_READ_PATH", False) and (
+            is_fast_path_compatible()
+        )
+
+    def include_archived(self):
+        """
+        Archived tasks are only read when asked for with
+        ?include_archived=true or a status=DONE filter
+        """
+        params = self.request.query_params
+        return (
+            params.get("include_archived", "").lower() in ("true", "1")
+            or params.get("status") == "DONE"
+        )
+
+    def get_archived_queryset(self):
+        """Return archived tasks owned by the authenticated user"""
+        return sharding.task_queryset(self.request.user.pk, model=ArchivedTask)
+
+    def filter_archived_queryset(self, queryset):
+        """Apply the same filters, search and ordering to archived tasks"""
+        for backend in self.filter_backends:
+            if issubclass(backend, DjangoFilterBackend):
+                queryset = self.filterset_class(
+                    self.request.query_params, queryset=queryset, request=self.request
+                ).qs
+            else:
+                queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    def get_ordering(self, queryset):
+        for backend in self.filter_backends:
+            if issubclass(backend, OrderingFilter):
+                return backend().get_ordering(self.request, queryset, self)
+        return self.ordering
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_read_path() and not self.include_archived():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        row_serializer = self.get_row_serializer()
+        rows = row_serializer.get_rows(queryset)
+
+        if self.include_archived():
+            # SQLite rejects ORDER BY inside compound selects, so order the union
+            ordering = self.get_ordering(queryset)
+            archived = self.filter_archived_queryset(self.get_archived_queryset())
+            rows = (
+                rows.order_by()
+                .union(row_serializer.get_rows(archived).order_by(), all=True)
+                .order_by(*ordering)
+            )
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.many(page))
+
+        return Response(row_serializer.many(rows))
+
+    def get_row(self, queryset, row_serializer):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return get_object_or_404(
+            row_serializer.get_rows(queryset),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+
+    def use_detail_cache(self):
+        """Plain detail reads (no filters or archive) go through the near cache"""
+        return (
+            self.use_fast_read_path()
+            and task_cache.get_config()["ENABLED"]
+            and not self.request.query_params
+        )
+
+    def retrieve_cached(self, request):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            task_id = str(uuid.UUID(self.kwargs[lookup_url_kwarg]))
+        except ValueError:
+            raise Http404
+
+        # Rows are only served to their owner, so the username comes from
+        # the request instead of the join
+        row_serializer = TaskRowSerializer(
+            native=self.wants_native_types(), owner_username=request.user.username
+        )
+        row = task_cache.task_detail_cache.get(task_id, request.user.pk)
+        if row is None:
+            row = get_object_or_404(
+                row_serializer.get_rows(self.get_queryset()), pk=task_id
+            )
+            task_cache.task_detail_cache.set(task_id, request.user.pk, row)
+        return Response(row_serializer.to_representation(row))
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.use_detail_cache():
+            return self.retrieve_cached(request)
+        if not self.use_fast_read_path() and not self.include_archived():
+            return super().retrieve(request, *args, **kwargs)
+
+        # get_queryset() is already scoped to the owner, which is exactly
+        # what IsOwner enforces on the object path
+        row_serializer = self.get_row_serializer()
+        try:
+            row = self.get_row(
+                self.filter_queryset(self.get_queryset()), row_serializer
+            )
+        except Http404:
+            if not self.include_archived():
+                raise
+            archived = self.filter_archived_queryset(self.get_archived_queryset())
+            row = self.get_row(archived, row_serializer)
+        return Response(row_serializer.to_representation(row))
 
     def perform_create(self, serializer):
         """Set the owner to the current user when creating a task"""
-        serializer.save(owner=self.request.user)
+        writer = get_task_writer()
+        if writer is None:
+            serializer.save(owner=self.request.user)
+            return
+
+        serializer.instance = submit_task_write(
+            writer,
+            "create",
+            self.request.user,
+            fields=serializer.validated_data,
+            idempotency_key=self.request.headers.get("Idempotency-Key"),
+        )
+
+    def perform_update(self, serializer):
+        writer = get_task_writer()
+        if writer is None:
+            serializer.save()
+            return
+
+        serializer.instance = submit_task_write(
+            writer,
+            "update",
+            self.request.user,
+            task_id=serializer.instance.pk,
+            fields=serializer.validated_data,
+            idempotency_key=self.request.headers.get("Idempotency-Key"),
+        )
+
+    def perform_destroy(self, instance):
+        writer = get_task_writer()
+        if writer is None:
+            instance.delete()
+            return
+
+        submit_task_write(
+            writer,
+            "delete",
+            self.request.user,
+            task_id=instance.pk,
+            idempotency_key=self.request.headers.get("Idempotency-Key"),
+        )
 
     @extend_schema(responses=TaskStatsSerializer)
     @action(detail=False, methods=["get"])
+    @coalesced("tasks_stats", vary_on_user=True)
     def stats(self, request):
         """
         Get task statistics for the current user
@@ -84,20 +285,28 @@ class TaskViewSet(viewsets.ModelViewSet):
         - by_status: Count by status (TODO, IN_PROGRESS, DONE)
         - by_priority: Count by priority (LOW, MEDIUM, HIGH)
         """
-        queryset = self.get_queryset()
+        by_status = {"TODO": 0, "IN_PROGRESS": 0, "DONE": 0}
+        by_priority = {"LOW": 0, "MEDIUM": 0, "HIGH": 0}
+
+        # Archived tasks still count towards the totals
+        for queryset in (self.get_queryset(), self.get_archived_queryset()):
+            counts = (
+                queryset.order_by()
+                .values("status", "priority")
+                .annotate(count=Count("pk"))
+            )
+            for row in counts:
+                by_status[row["status"]] = (
+                    by_status.get(row["status"], 0) + row["count"]
+                )
+                by_priority[row["priority"]] = (
+                    by_priority.get(row["priority"], 0) + row["count"]
+                )
 
         stats = {
-            "total": queryset.count(),
-            "by_status": {
-                "TODO": queryset.filter(status="TODO").count(),
-                "IN_PROGRESS": queryset.filter(status="IN_PROGRESS").count(),
-                "DONE": queryset.filter(status="DONE").count(),
-            },
-            "by_priority": {
-                "LOW": queryset.filter(priority="LOW").count(),
-                "MEDIUM": queryset.filter(priority="MEDIUM").count(),
-                "HIGH": queryset.filter(priority="HIGH").count(),
-            },
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "by_priority": by_priority,
         }
 
         return Response(stats)
@@ -106,7 +315,17 @@ class TaskViewSet(viewsets.ModelViewSet):
     def mark_done(self, request, pk=None):
         """Mark a task as done"""
         task = self.get_object()
-        task.status = "DONE"
-        task.save()
+        writer = get_task_writer()
+        if writer is None:
+            task.status = "DONE"
+            task.save()
+        else:
+            task = submit_task_write(
+                writer,
+                "mark_done",
+                request.user,
+                task_id=task.pk,
+                idempotency_key=request.headers.get("Idempotency-Key"),
+            )
         serializer = self.get_serializer(task)
         return Response(serializer.data)
@@ -1,17 +1,25 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+    throttle_classes,
+)
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.cache import cache
-from django.db import connection
+from .circuit_breaker import redis_breaker
+from .health_probe import dependency_prober
+from .task_cache import task_detail_cache
 
 
 @api_view(["GET"])
+@authentication_classes([])
 @permission_classes([AllowAny])
+@throttle_classes([])
 def health_check(request):
     """
     Simple health check endpoint
-    Returns 200 if service is healthy
+    Returns 200 if the process is serving requests (no dependency checks)
     """
     return Response(
         {"status": "healthy", "service": "taskmgr-api"}, status=status.HTTP_200_OK
@@ -19,31 +27,19 @@ def health_check(request):
 
 
 @api_view(["GET"])
+@authentication_classes([])
 @permission_classes([AllowAny])
+@throttle_classes([])
 def status_check(request):
     """
     Detailed status check with dependencies
-    Returns service status + Redis + Database connectivity
+    Returns service status + Redis + Database connectivity from the
+    background prober's latest snapshot, plus the Redis circuit breaker state
+    and this worker's task detail cache hit ratios
     """
-    health_status = {"api": "ok", "redis": "unknown", "database": "unknown"}
-
-    # Check Redis
-    try:
-        cache.set("health_check", "ok", 10)
-        if cache.get("health_check") == "ok":
-            health_status["redis"] = "ok"
-        else:
-            health_status["redis"] = "error"
-    except Exception as e:
-        health_status["redis"] = f"error: {str(e)}"
-
-    # Check Database
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            health_status["database"] = "ok"
-    except Exception as e:
-        health_status["database"] = f"error: {str(e)}"
+    probes = dependency_prober.snapshot()
+    health_status = {"api": "ok"}
+    health_status.update({name: probe["status"] for name, probe in probes.items()})
 
     # Determine overall status
     overall_healthy = all(v == "ok" for v in health_status.values())
@@ -52,6 +48,9 @@ def status_check(request):
         {
             "status": "healthy" if overall_healthy else "unhealthy",
             "checks": health_status,
+            "probes": probes,
+            "circuit_breakers": {"redis": redis_breaker.status()},
+            "caches": {"task_detail": task_detail_cache.stats()},
         },
         status=status.HTTP_200_OK
         if overall_healthy
@@ -2,6 +2,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
+from .coalescing import coalesced
 from .metrics_aggregator import MetricsAggregator
 from drf_spectacular.utils import extend_schema
 from .serializers import MetricsSummarySerializer
@@ -10,6 +11,7 @@ from .serializers import MetricsSummarySerializer
 @extend_schema(responses=MetricsSummarySerializer, auth=[])
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@coalesced("metrics_summary")
 def metrics_summary(request):
     """
     Get aggregated metrics summary for last 5 minutes
@@ -0,0 +1,46 @@
+from django.http import FileResponse, Http404
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from . import profiling
+
+CONTENT_TYPES = {"sampling": "text/plain", "cprofile": "application/octet-stream"}
+
+
+@extend_schema(responses=OpenApiTypes.OBJECT)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    """
+    Stored request profiles of this worker, newest first (staff only)
+
+    Each entry has id, created_at, method, path, status, duration_ms,
+    trigger (header/sample), mode, file, bytes and samples.
+    """
+    directory = profiling.get_config()["DIRECTORY"]
+    return Response({"profiles": profiling.list_profiles(directory)})
+
+
+@extend_schema(responses=OpenApiTypes.BINARY)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_detail(request, profile_id):
+    """
+    Download a profile (staff only)
+
+    Sampling profiles are collapsed stacks for flamegraph.pl or speedscope,
+    cProfile ones pstats files for ``python -m pstats`` or snakeviz.
+    """
+    found = profiling.profile_path(profiling.get_config()["DIRECTORY"], profile_id)
+    if found is None:
+        raise Http404("Profile not found")
+    path, metadata = found
+    return FileResponse(
+        open(path, "rb"),
+        as_attachment=True,
+        filename=metadata["file"],
+        content_type=CONTENT_TYPES[metadata["mode"]],
+    )
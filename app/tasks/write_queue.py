@@ -0,0 +1,402 @@
+"""
+Single-writer queue for Task mutations
+
+When ``TASK_WRITE_QUEUE["MODE"]`` is set, TaskViewSet funnels create, update,
+delete and mark_done through a writer that groups pending operations from
+many requests into one transaction (group commit). Callers block until
+their operation is committed.
+
+Modes:
+- ``""``: disabled, views write directly (default)
+- ``"inline"``: same operation path, applied in the calling thread
+- ``"local"``: one writer thread per worker process
+- ``"redis"``: one writer for all workers (``manage.py run_task_writer``),
+  operations and results travel over Redis lists
+
+Every operation has a job id, derived from the request's ``Idempotency-Key``
+header and the operation itself when there is one. The writer remembers the results of applied jobs
+for ``IDEMPOTENCY_TTL`` seconds, so a client retrying after a timeout gets
+the first result back instead of e.g. creating the task twice.
+"""
+import hashlib
+import json
+import logging
+import math
+import queue
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, transaction
+from django.http import Http404
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import msgpack_codec, sharding
+from .local_cache import LocalLRUCache
+from .models import Task
+from .redis_client import get_blocking_redis
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASK_WRITE_QUEUE = {
+    "MODE": "",
+    "MAX_BATCH": 100,
+    "MAX_WAIT_MS": 2,
+    "TIMEOUT": 5,
+    "IDEMPOTENCY_TTL": 3600,
+}
+
+QUEUE_KEY = "taskwriter:queue"
+REPLY_KEY_PREFIX = "taskwriter:reply:"
+REPLY_TTL = 60
+APPLIED_KEY_PREFIX = "taskwriter:applied:"
+
+# Fields a write operation may set on a Task
+WRITABLE_FIELDS = ("title", "description", "status", "priority", "due_date")
+
+
+class WriteQueueTimeout(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Write queue timed out, try again later."
+    default_code = "write_queue_timeout"
+
+
+class WriteFailed(APIException):
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    default_detail = "Write failed."
+    default_code = "write_failed"
+
+
+def get_config():
+    return {**DEFAULT_TASK_WRITE_QUEUE, **getattr(settings, "TASK_WRITE_QUEUE", {})}
+
+
+def _task_values(task):
+    return {
+        field.attname: getattr(task, field.attname)
+        for field in Task._meta.concrete_fields
+    }
+
+
+def _apply_operation(op, using):
+    action = op["action"]
+    fields = {k: v for k, v in op.get("fields", {}).items() if k in WRITABLE_FIELDS}
+
+    if action == "create":
+        task = Task(owner_id=op["owner_id"], **fields)
+        task.save(using=using)
+        return _task_values(task)
+
+    task = Task.objects.using(using).get(pk=op["task_id"], owner_id=op["owner_id"])
+    if action == "delete":
+        task.delete()
+        return None
+    if action == "mark_done":
+        fields = {"status": "DONE"}
+    elif action != "update":
+        raise ValueError(f"Unknown write action: {action}")
+
+    for name, value in fields.items():
+        setattr(task, name, value)
+    task.save()
+    return _task_values(task)
+
+
+def apply_batch(ops):
+    """
+    Apply operations in a single transaction (group commit)
+
+    Each operation gets its own savepoint so one failure doesn't abort the
+    others; with sharding there is one transaction per shard. Returns one
+    result dict per operation.
+    """
+    by_shard = {}
+    for index, op in enumerate(ops):
+        alias = sharding.shard_for_owner(op["owner_id"])
+        by_shard.setdefault(alias, []).append(index)
+
+    results = [None] * len(ops)
+    for alias, indexes in by_shard.items():
+        with transaction.atomic(using=alias):
+            for index in indexes:
+                op = ops[index]
+                try:
+                    with transaction.atomic(using=alias):
+                        task = _apply_operation(op, alias)
+                    results[index] = {"ok": True, "task": task}
+                except Task.DoesNotExist:
+                    results[index] = {"ok": False, "not_found": True}
+                except Exception as e:
+                    logger.error(f"Task write failed: {op.get('action')} - {e}")
+                    results[index] = {"ok": False, "error": str(e)}
+    return results
+
+
+def apply_jobs(jobs, applied, apply_func=apply_batch):
+    """
+    Apply ``(job_id, op)`` pairs, skipping jobs that were already applied
+
+    ``applied`` maps job ids to results from earlier batches. Those jobs,
+    and repeats of a job within the batch, get the earlier result instead
+    of being applied again. Returns the results and ``{job_id: result}``
+    for the newly applied jobs that succeeded.
+    """
+    results = [None] * len(jobs)
+    first = {}
+    for index, (job_id, _) in enumerate(jobs):
+        if job_id in applied:
+            results[index] = applied[job_id]
+        else:
+            first.setdefault(job_id, index)
+
+    todo = sorted(first.values())
+    if todo:
+        for index, result in zip(todo, apply_func([jobs[i][1] for i in todo])):
+            results[index] = result
+    for index, (job_id, _) in enumerate(jobs):
+        if results[index] is None:
+            results[index] = results[first[job_id]]
+    return results, {jobs[i][0]: results[i] for i in todo if results[i].get("ok")}
+
+
+class InlineTaskWriter:
+    """Apply each operation immediately in the calling thread"""
+
+    def submit(self, op, timeout=None, job_id=None):
+        return apply_batch([op])[0]
+
+
+class _PendingWrite:
+    __slots__ = ("job_id", "op", "result", "done")
+
+    def __init__(self, job_id, op):
+        self.job_id = job_id
+        self.op = op
+        self.result = None
+        self.done = threading.Event()
+
+
+class LocalTaskWriter:
+    """
+    One writer thread per process, batching operations from request threads
+
+    The thread takes the first pending operation, waits up to ``max_wait``
+    seconds for more (up to ``max_batch``) and commits them together.
+    """
+
+    def __init__(
+        self,
+        apply_func=apply_batch,
+        max_batch=100,
+        max_wait=0.002,
+        idempotency_ttl=3600,
+    ):
+        self.apply_func = apply_func
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.applied = LocalLRUCache(maxsize=10000, ttl=idempotency_ttl)
+        self.batches = 0
+        self.operations = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="task-writer", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, op, timeout=None, job_id=None):
+        self._ensure_started()
+        pending = _PendingWrite(job_id or uuid.uuid4().hex, op)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise WriteQueueTimeout()
+        return pending.result
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            jobs = [(pending.job_id, pending.op) for pending in batch]
+            try:
+                close_old_connections()
+                applied = {}
+                for job_id, _ in jobs:
+                    result = self.applied.get(job_id)
+                    if result is not None:
+                        applied[job_id] = result
+                results, new = apply_jobs(jobs, applied, self.apply_func)
+                for job_id, result in new.items():
+                    self.applied.set(job_id, result)
+            except Exception as e:
+                logger.error(f"Task writer batch failed: {e}")
+                results = [{"ok": False, "error": str(e)}] * len(batch)
+
+            self.batches += 1
+            self.operations += len(batch)
+            for pending, result in zip(batch, results):
+                pending.result = result
+                pending.done.set()
+
+
+def _redis_client():
+    client = get_blocking_redis()
+    if client is None:
+        raise ImproperlyConfigured("TASK_WRITE_QUEUE mode 'redis' needs REDIS_URL")
+    return client
+
+
+class RedisTaskWriter:
+    """Submit operations to the shared writer process over Redis"""
+
+    def submit(self, op, timeout=None, job_id=None):
+        client = _redis_client()
+        job_id = job_id or uuid.uuid4().hex
+        client.lpush(QUEUE_KEY, msgpack_codec.packb({"id": job_id, "op": op}))
+        # BRPOP takes whole seconds and 0 would wait forever
+        wait = max(1, math.ceil(timeout)) if timeout else 0
+        reply = client.brpop(REPLY_KEY_PREFIX + job_id, timeout=wait)
+        if reply is None:
+            # The operation may still be applied later by the writer
+            raise WriteQueueTimeout()
+        return msgpack_codec.unpackb(reply[1])
+
+
+def run_redis_writer(max_batch=100, max_wait=0.002, stop=None, idempotency_ttl=3600):
+    """Writer loop used by ``manage.py run_task_writer``"""
+    client = _redis_client()
+    while stop is None or not stop.is_set():
+        item = client.brpop(QUEUE_KEY, timeout=1)
+        if item is None:
+            continue
+
+        jobs = [item[1]]
+        deadline = time.monotonic() + max_wait
+        while len(jobs) < max_batch:
+            job = client.rpop(QUEUE_KEY)
+            if job is None:
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(max_wait / 4)
+                continue
+            jobs.append(job)
+
+        decoded = [msgpack_codec.unpackb(job) for job in jobs]
+        new = {}
+        try:
+            close_old_connections()
+            job_ids = [job["id"] for job in decoded]
+            packed = client.mget([APPLIED_KEY_PREFIX + job_id for job_id in job_ids])
+            applied = {
+                job_id: msgpack_codec.unpackb(result)
+                for job_id, result in zip(job_ids, packed)
+                if result is not None
+            }
+            results, new = apply_jobs(
+                [(job["id"], job["op"]) for job in decoded], applied
+            )
+        except Exception as e:
+            logger.error(f"Task writer batch failed: {e}")
+            results = [{"ok": False, "error": str(e)}] * len(decoded)
+
+        pipe = client.pipeline()
+        for job_id, result in new.items():
+            pipe.set(
+                APPLIED_KEY_PREFIX + job_id,
+                msgpack_codec.packb(result),
+                ex=idempotency_ttl,
+            )
+        for job, result in zip(decoded, results):
+            reply_key = REPLY_KEY_PREFIX + job["id"]
+            pipe.lpush(reply_key, msgpack_codec.packb(result))
+            pipe.expire(reply_key, REPLY_TTL)
+        pipe.execute()
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_task_writer():
+    """Return the writer for the configured mode, or None if disabled"""
+    config = get_config()
+    mode = config["MODE"]
+    if not mode:
+        return None
+
+    with _writers_lock:
+        writer = _writers.get(mode)
+        if writer is None:
+            if mode == "inline":
+                writer = InlineTaskWriter()
+            elif mode == "local":
+                writer = LocalTaskWriter(
+                    max_batch=config["MAX_BATCH"],
+                    max_wait=config["MAX_WAIT_MS"] / 1000,
+                    idempotency_ttl=config["IDEMPOTENCY_TTL"],
+                )
+            elif mode == "redis":
+                writer = RedisTaskWriter()
+            else:
+                raise ValueError(f"Unknown TASK_WRITE_QUEUE mode: {mode}")
+            _writers[mode] = writer
+    return writer
+
+
+def submit_task_write(
+    writer, action, owner, task_id=None, fields=None, idempotency_key=None
+):
+    """
+    Submit one operation and wait for it to commit
+
+    Returns the saved Task (owner attached), or None for deletes. Retries
+    of the same operation with the same ``idempotency_key`` (scoped to the
+    owner) get the result of the first attempt.
+    """
+    op = {"action": action, "owner_id": owner.pk}
+    if task_id is not None:
+        op["task_id"] = task_id
+    if fields:
+        op["fields"] = {k: v for k, v in fields.items() if k in WRITABLE_FIELDS}
+
+    job_id = None
+    if idempotency_key:
+        # A key reused for a different operation is a new job, not a replay
+        fingerprint = hashlib.sha256(
+            json.dumps(op, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        job_id = f"{owner.pk}:{idempotency_key}:{fingerprint}"
+    result = writer.submit(op, timeout=get_config()["TIMEOUT"], job_id=job_id)
+    if result.get("not_found"):
+        raise Http404
+    if not result.get("ok"):
+        # Details stay in the logs, not in the response
+        logger.error(f"Task write {action} failed: {result.get('error')}")
+        raise WriteFailed()
+    if result["task"] is None:
+        return None
+
+    task = Task(**result["task"])
+    task._state.adding = False
+    task.owner = owner
+    return task
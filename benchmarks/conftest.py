@@ -0,0 +1,116 @@
+"""
+Microbenchmark plumbing
+
+Run with ``pytest benchmarks/`` (not part of the default ``tests/`` run).
+Because it runs under pytest, settings use the test configuration: locmem
+cache and in-memory SQLite, so numbers reflect our code rather than
+network round trips.
+
+Results are written as JSON to ``--microbench-json`` (default
+``reports/microbench.json``). Pass ``--microbench-compare old.json`` to
+print the change in median time per benchmark against an earlier run.
+"""
+import json
+import os
+
+import pytest
+
+from app.tasks.bench_harness import collect_environment
+from app.tasks.benchmarking import time_call
+
+# Median slowdown reported as a regression by --microbench-compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("microbench")
+    group.addoption(
+        "--microbench-json",
+        default="reports/microbench.json",
+        help="Where to write results",
+    )
+    group.addoption("--microbench-compare", help="Earlier results to compare with")
+    group.addoption(
+        "--microbench-repeat",
+        type=int,
+        default=None,
+        help="Override the repeat count of every benchmark",
+    )
+
+
+class BenchmarkRecorder:
+    def __init__(self, repeat_override=None):
+        self.repeat_override = repeat_override
+        self.results = {}
+
+    def __call__(self, name, func, repeat=50, warmup=3, **params):
+        """Time ``func`` and record the stats under ``name``"""
+        repeat = self.repeat_override or repeat
+        stats = time_call(func, repeat=repeat, warmup=warmup)
+        self.results[name] = {**stats, "params": params}
+        return stats
+
+
+recorder_key = pytest.StashKey[BenchmarkRecorder]()
+diff_key = pytest.StashKey[list]()
+
+
+def pytest_configure(config):
+    config.stash[recorder_key] = BenchmarkRecorder(
+        config.getoption("--microbench-repeat")
+    )
+
+
+@pytest.fixture
+def bench(request):
+    return request.config.stash[recorder_key]
+
+
+def pytest_sessionfinish(session, exitstatus):
+    results = session.config.stash[recorder_key].results
+    if not results:
+        return
+
+    path = session.config.getoption("--microbench-json")
+    report = {
+        "environment": collect_environment(mode="microbench"),
+        "benchmarks": dict(sorted(results.items())),
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    compare_path = session.config.getoption("--microbench-compare")
+    if compare_path:
+        with open(compare_path) as f:
+            previous = json.load(f)["benchmarks"]
+        session.config.stash[diff_key] = diff_results(previous, results)
+
+
+def diff_results(previous, current):
+    """(name, old median, new median, change %, regressed) per shared benchmark"""
+    rows = []
+    for name in sorted(set(previous) & set(current)):
+        old = previous[name]["median_ms"]
+        new = current[name]["median_ms"]
+        change = (new - old) / old if old else 0
+        rows.append(
+            (name, old, new, round(change * 100, 1), change > REGRESSION_THRESHOLD)
+        )
+    return rows
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    rows = config.stash.get(diff_key, None)
+    if rows is None:
+        path = config.getoption("--microbench-json")
+        if os.path.exists(path):
+            terminalreporter.write_line(f"Microbenchmark results written to {path}")
+        return
+    terminalreporter.section("microbenchmark comparison")
+    for name, old, new, change, regressed in rows:
+        terminalreporter.write_line(
+            f"{name:<48} {old:>10.3f}ms -> {new:>10.3f}ms {change:+7.1f}%",
+            red=regressed,
+            green=change < -REGRESSION_THRESHOLD * 100,
+        )
@@ -0,0 +1,246 @@
+"""
+Microbenchmarks for the request hot path
+
+Sizes: 100-item pages over 10k tasks, 100k latency samples and 10k-user
+sets per metrics window.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from app.tasks.filters import TaskFilter
+from app.tasks.metrics_aggregator import MetricsAggregator
+from app.tasks.middleware import MetricsMiddleware
+from app.tasks.models import Task
+from app.tasks.pagination import CustomPageNumberPagination
+from app.tasks.serializers import TaskSerializer
+
+TASKS = 10_000
+PAGE_SIZE = 100
+LATENCY_SAMPLES = 100_000
+USERS = 10_000
+
+factory = APIRequestFactory()
+
+
+@pytest.fixture(scope="module")
+def owner(django_db_setup, django_db_blocker):
+    """10k tasks for one owner, created once for the module"""
+    rng = random.Random(42)
+    now = datetime(2025, 10, 7, 12, 0, tzinfo=timezone.utc)
+    with django_db_blocker.unblock():
+        user = User.objects.create_user(username="microbench", password="benchpass123")
+        Task.objects.bulk_create(
+            (
+                Task(
+                    title=f"Task {i} {rng.choice(('release', 'review', 'deploy'))}",
+                    description="Follow up with the team about the release",
+                    status=rng.choice(("TODO", "IN_PROGRESS", "DONE")),
+                    priority=rng.choice(("LOW", "MEDIUM", "HIGH")),
+                    due_date=now + timedelta(days=rng.randint(-30, 30)),
+                    owner=user,
+                )
+                for i in range(TASKS)
+            ),
+            batch_size=1000,
+        )
+        yield user
+        Task.objects.filter(owner=user).delete()
+        user.delete()
+
+
+@pytest.fixture
+def page(owner):
+    return list(Task.objects.filter(owner=owner).select_related("owner")[:PAGE_SIZE])
+
+
+@pytest.mark.django_db
+class TestTaskSerializer:
+    """TaskSerializer on a 100-item page"""
+
+    def test_serialize_page(self, bench, page):
+        bench(
+            "serializer.serialize_page",
+            lambda: TaskSerializer(page, many=True).data,
+            page_size=PAGE_SIZE,
+        )
+
+    def test_serialize_and_render_page(self, bench, page):
+        bench(
+            "serializer.render_page",
+            lambda: JSONRenderer().render(TaskSerializer(page, many=True).data),
+            page_size=PAGE_SIZE,
+        )
+
+    def test_validate_create(self, bench, owner):
+        payload = {
+            "title": "Ship the release",
+            "description": "Follow up with the team",
+            "priority": "HIGH",
+            "due_date": "2030-01-01T12:00:00Z",
+        }
+
+        def validate():
+            serializer = TaskSerializer(data=payload)
+            serializer.is_valid(raise_exception=True)
+
+        bench("serializer.validate_create", validate, repeat=500)
+
+
+@pytest.mark.django_db
+class TestTaskFilter:
+    """TaskFilter building and running 100-item pages over 10k tasks"""
+
+    @pytest.mark.parametrize(
+        "name,params",
+        [
+            ("status", {"status": "TODO"}),
+            ("status_priority", {"status": "TODO", "priority": "HIGH"}),
+            (
+                "date_range",
+                {
+                    "due_after": "2025-10-01T00:00:00Z",
+                    "due_before": "2025-10-20T00:00:00Z",
+                },
+            ),
+        ],
+    )
+    def test_filter_page(self, bench, owner, name, params):
+        queryset = Task.objects.filter(owner=owner)
+
+        def run():
+            filtered = TaskFilter(params, queryset=queryset).qs
+            return list(filtered.order_by("-created_at")[:PAGE_SIZE])
+
+        bench(f"filter.{name}", run, tasks=TASKS, page_size=PAGE_SIZE)
+
+    def test_filter_build_only(self, bench, owner):
+        queryset = Task.objects.filter(owner=owner)
+        params = {"status": "TODO", "priority": "HIGH"}
+        bench(
+            "filter.build_queryset",
+            lambda: TaskFilter(params, queryset=queryset).qs,
+            repeat=500,
+        )
+
+
+@pytest.mark.django_db
+class TestPagination:
+    """CustomPageNumberPagination over 10k tasks"""
+
+    @pytest.mark.parametrize("page_number", [1, 50])
+    def test_paginate(self, bench, owner, page_number):
+        queryset = Task.objects.filter(owner=owner).order_by("-created_at")
+        request = Request(
+            factory.get("/api/v1/tasks/", {"page": page_number, "page_size": PAGE_SIZE})
+        )
+
+        def paginate():
+            paginator = CustomPageNumberPagination()
+            results = paginator.paginate_queryset(queryset, request)
+            return paginator.get_paginated_response(results)
+
+        bench(
+            f"pagination.page_{page_number}",
+            paginate,
+            tasks=TASKS,
+            page_size=PAGE_SIZE,
+        )
+
+
+def fill_metrics_window(latencies_per_minute, users_per_minute, minutes=5):
+    """Cache the current metrics window as a busy server would have it"""
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    # One minute ahead too, so a run crossing a minute boundary sees the
+    # same sizes
+    for offset in range(-minutes + 1, 2):
+        minute_key = (now + timedelta(minutes=offset)).strftime("%Y-%m-%d-%H-%M")
+        cache.set(
+            f"metrics:latencies:{minute_key}",
+            [rng.uniform(1, 250) for _ in range(latencies_per_minute)],
+            3600,
+        )
+        cache.set(
+            f"metrics:users:{minute_key}",
+            set(range(1, users_per_minute + 1)),
+            3600,
+        )
+        cache.set(f"metrics:requests:{minute_key}", latencies_per_minute, 3600)
+        cache.set(f"metrics:errors:{minute_key}", latencies_per_minute // 100, 3600)
+
+
+class TestMetricsMiddleware:
+    """MetricsMiddleware.process_response with a busy minute in the cache"""
+
+    @pytest.fixture(autouse=True)
+    def busy_window(self):
+        cache.clear()
+        fill_metrics_window(LATENCY_SAMPLES, USERS, minutes=1)
+        yield
+        cache.clear()
+
+    def make_request(self, user):
+        request = factory.get("/api/v1/tasks/")
+        request.user = user
+        request.metrics_start_time = 0
+        return request
+
+    def test_process_response_authenticated(self, bench):
+        middleware = MetricsMiddleware(lambda request: HttpResponse())
+        user = User(pk=USERS + 1, username="someone")
+        request = self.make_request(user)
+        response = HttpResponse()
+        bench(
+            "middleware.process_response",
+            lambda: middleware.process_response(request, response),
+            latency_samples=LATENCY_SAMPLES,
+            users=USERS,
+        )
+
+    def test_process_response_anonymous_error(self, bench):
+        middleware = MetricsMiddleware(lambda request: HttpResponse())
+        request = self.make_request(AnonymousUser())
+        response = HttpResponse(status=404)
+        bench(
+            "middleware.process_response_error",
+            lambda: middleware.process_response(request, response),
+            latency_samples=LATENCY_SAMPLES,
+        )
+
+
+@pytest.mark.django_db
+class TestMetricsAggregator:
+    """Latency stats and the 5-minute summary"""
+
+    def test_calculate_latency_stats(self, bench):
+        rng = random.Random(3)
+        latencies = [rng.uniform(1, 250) for _ in range(LATENCY_SAMPLES)]
+        bench(
+            "aggregator.calculate_latency_stats",
+            lambda: MetricsAggregator._calculate_latency_stats(latencies),
+            repeat=20,
+            latency_samples=LATENCY_SAMPLES,
+        )
+
+    def test_metrics_summary(self, bench):
+        cache.clear()
+        # 100k samples and 10k users spread over the 5-minute window
+        fill_metrics_window(LATENCY_SAMPLES // 5, USERS // 5)
+        try:
+            bench(
+                "aggregator.metrics_summary",
+                MetricsAggregator.get_metrics_summary,
+                repeat=20,
+                latency_samples=LATENCY_SAMPLES,
+                users=USERS,
+            )
+        finally:
+            cache.clear()
@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-import re, sys, json, redis, os
+import re, sys, json, os
+
+# Use the app's shared Redis client (same URL, pool and timeouts as the API)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
 def parse(path):
     metrics = {}
@@ -19,11 +23,16 @@ def parse(path):
 
 def main():
     log = sys.argv[1]
-    r = redis.Redis.from_url(os.environ.get("REDIS_URL", "redis://redis:6379/0"))
+    import django
+
+    django.setup()
+    from app.tasks.redis_client import get_redis
+
+    r = get_redis()
     metrics = parse(log)
     # Guardar en Redis en un hash
     if metrics:
-        r.hmset("ab_metrics", metrics)
+        r.hset("ab_metrics", mapping=metrics)
     print(json.dumps(metrics, indent=2))
 
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Replay captured production traffic against a test instance
+
+Reads a capture written by TrafficCaptureMiddleware (TRAFFIC_CAPTURE_ENABLED),
+replays it keeping inter-arrival times (scaled by --speed) and per-user
+ordering, and writes a JSON report comparing captured and replayed
+latency per route (see app/tasks/traffic_replay.py).
+
+Usage:
+    scripts/traffic_replay.py captures/traffic.capture --speed 2 \
+        --tokens-file tokens.txt --base-url http://staging:8000 \
+        --output reports/replay.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx  # noqa: E402
+
+from app.tasks.traffic_replay import TrafficReplayer, load_records  # noqa: E402
+
+
+async def replay(args, records, tokens):
+    limits = httpx.Limits(
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_connections,
+    )
+    async with httpx.AsyncClient(
+        base_url=args.base_url, timeout=args.timeout, limits=limits
+    ) as client:
+        replayer = TrafficReplayer(client, records, tokens=tokens, speed=args.speed)
+        return await replayer.run()
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("capture", help="Archivo de captura")
+    p.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="1 = tiempo real, 2 = el doble de rápido",
+    )
+    p.add_argument(
+        "--tokens-file",
+        help="Tokens de prueba, uno por línea (se asignan a los usuarios capturados)",
+    )
+    p.add_argument(
+        "--route",
+        action="append",
+        dest="routes",
+        help="Solo estas rutas (p. ej. task-list)",
+    )
+    p.add_argument(
+        "--limit", type=int, help="Reproducir solo las primeras N solicitudes"
+    )
+    p.add_argument(
+        "--max-connections", type=int, default=1000, help="Conexiones simultáneas"
+    )
+    p.add_argument(
+        "--timeout", type=float, default=10, help="Timeout por solicitud (s)"
+    )
+    p.add_argument(
+        "--base-url", default="http://localhost:8000", help="URL base del API de prueba"
+    )
+    p.add_argument("--output", help="Archivo para el reporte JSON (por defecto stdout)")
+    args = p.parse_args()
+
+    records = load_records(args.capture, routes=args.routes, limit=args.limit)
+    tokens = []
+    if args.tokens_file:
+        with open(args.tokens_file) as f:
+            tokens = [line.strip() for line in f if line.strip()]
+    print(f"{len(records)} solicitudes capturadas", file=sys.stderr)
+
+    report = asyncio.run(replay(args, records, tokens))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(
+            f"{report['requests']} solicitudes en {report['elapsed_s']} s, "
+            f"{report['status_mismatches']} con otro status -> {args.output}",
+            file=sys.stderr,
+        )
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,102 @@
 #!/usr/bin/env python3
-import asyncio, httpx, random, time, argparse
-
-async def worker(queue, client, token, slow_percent, error_rate):
-    headers = {"Authorization": f"Token {token}"} if token else {}
-    while True:
-        try:
-            queue.get_nowait()
-        except asyncio.QueueEmpty:
-            return
-        # Decide endpoint y retraso
-        url = "/api/v1/tasks/" if random.random() > error_rate else "/api/v1/tasks/999999/"
-        if random.random() < slow_percent:
-            await asyncio.sleep(2)
-        try:
-            await client.get(url, headers=headers, timeout=10)
-        finally:
-            queue.task_done()
-
-async def simulate(rps, duration, token, slow_percent, error_rate, base_url):
-    total = rps * duration
-    q = asyncio.Queue()
-    for _ in range(total):
-        q.put_nowait(None)
-    async with httpx.AsyncClient(base_url=base_url) as client:
-        tasks = [asyncio.create_task(worker(q, client, token, slow_percent, error_rate))
-                 for _ in range(min(100, rps*2))]
-        started = time.perf_counter()
-        await q.join()
-        elapsed = time.perf_counter() - started
-        print(f"Dispatched {total} requests in {elapsed:.2f}s")
+"""
+Open-loop load generator for the API
+
+Sends a weighted mix of list / filter / search / create / mark_done / stats
+requests at a fixed rate, regardless of how fast responses come back, and
+writes a JSON report with throughput, error rate and latency percentiles
+(coordinated-omission corrected, see app/tasks/loadgen.py).
+
+Users come from existing tokens, e.g. written by
+``manage.py seed_data --users 20 --tokens-file tokens.txt``.
+
+Usage:
+    scripts/traffic_sim.py --rate 50 --duration 60 --tokens-file tokens.txt \
+        --mix list=40,filter=20,search=10,create=15,mark_done=10,stats=5 \
+        --output reports/loadgen.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx  # noqa: E402
+
+from app.tasks.loadgen import (  # noqa: E402
+    DEFAULT_MIX,
+    LoadGenerator,
+    load_users,
+    parse_mix,
+)
+
+
+async def simulate(args):
+    limits = httpx.Limits(
+        max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight
+    )
+    async with httpx.AsyncClient(
+        base_url=args.base_url, timeout=args.timeout, limits=limits
+    ) as client:
+        with open(args.tokens_file) as f:
+            tokens = [line.strip() for line in f if line.strip()]
+        if args.users:
+            tokens = tokens[: args.users]
+        users = await load_users(client, tokens, args.tasks_per_user)
+        print(f"{len(users)} usuarios listos", file=sys.stderr)
+
+        generator = LoadGenerator(
+            client,
+            users,
+            mix=args.mix,
+            rate=args.rate,
+            duration=args.duration,
+            arrival=args.arrival,
+            max_in_flight=args.max_in_flight,
+            seed=args.seed,
+        )
+        return await generator.run()
+
 
 def main():
-    p = argparse.ArgumentParser()
-    p.add_argument("--rps", type=int, default=10, help="Solicitudes por segundo")
-    p.add_argument("--duration", type=int, default=60, help="Duración (s)")
-    p.add_argument("--error-rate", type=float, default=0.0, help="Proporción de errores 0-1")
-    p.add_argument("--slow-percent", type=float, default=0.0, help="Proporción lentas 0-1")
-    p.add_argument("--token", help="Token de autenticación")
+    default_mix = ",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items())
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--rate", "--rps", type=float, default=10, help="Solicitudes por segundo")
+    p.add_argument("--duration", type=float, default=60, help="Duración (s)")
+    p.add_argument(
+        "--arrival",
+        choices=["constant", "poisson"],
+        default="constant",
+        help="Intervalos fijos o llegadas de Poisson",
+    )
+    p.add_argument("--mix", type=parse_mix, default=default_mix, help="Pesos por escenario")
+    p.add_argument(
+        "--tokens-file", required=True, help="Tokens existentes, uno por línea (manage.py seed_data --tokens-file)"
+    )
+    p.add_argument("--users", type=int, help="Usar solo los primeros N tokens")
+    p.add_argument("--tasks-per-user", type=int, default=5, help="Tareas iniciales por usuario")
+    p.add_argument("--max-in-flight", type=int, default=1000, help="Máximo de solicitudes simultáneas")
+    p.add_argument("--timeout", type=float, default=10, help="Timeout por solicitud (s)")
+    p.add_argument("--seed", type=int, help="Semilla para reproducir la mezcla")
     p.add_argument("--base-url", default="http://localhost:8000", help="URL base del API")
+    p.add_argument("--output", help="Archivo para el reporte JSON (por defecto stdout)")
     args = p.parse_args()
-    asyncio.run(simulate(args.rps, args.duration, args.token,
-                         args.slow_percent, args.error_rate, args.base_url))
+
+    report = asyncio.run(simulate(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(
+            f"{report['requests']} solicitudes, {report['throughput_rps']} rps, "
+            f"p99 {report['latency_ms'].get('p99')} ms, {report['rejected']} con 429 -> {args.output}",
+            file=sys.stderr,
+        )
+    else:
+        print(output)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,106 @@
+"""
+Phase 6 - Hot/cold task archival tests
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from app.tasks.archive import archive_done_tasks
+from app.tasks.models import ArchivedTask, Task
+
+
+@pytest.fixture
+def user():
+    """Create test user"""
+    return User.objects.create_user(username="archiver", password="testpass123")
+
+
+@pytest.fixture
+def authenticated_client(user):
+    """Create authenticated API client"""
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+@pytest.fixture
+def archived(user):
+    """Two old DONE tasks archived, plus live tasks in the hot table"""
+    Task.objects.create(title="Live todo", owner=user, priority="HIGH")
+    Task.objects.create(title="Recent done", owner=user, status="DONE")
+    for title in ("Old done 1", "Old done 2"):
+        Task.objects.create(title=title, owner=user, status="DONE", priority="LOW")
+    Task.objects.filter(title__startswith="Old").update(
+        updated_at=timezone.now() - timedelta(days=90)
+    )
+    archive_done_tasks(days=30, batch_size=1)
+    return ArchivedTask.objects.filter(owner=user)
+
+
+@pytest.mark.django_db
+class TestArchival:
+    """Test moving old DONE tasks and reading them back"""
+
+    def test_only_old_done_tasks_archived(self, archived, user):
+        assert sorted(t.title for t in archived) == ["Old done 1", "Old done 2"]
+        assert Task.objects.filter(owner=user).count() == 2
+
+    def test_archived_fields_preserved(self, user):
+        task = Task.objects.create(title="Keep me", owner=user, status="DONE")
+        Task.objects.filter(pk=task.pk).update(
+            updated_at=timezone.now() - timedelta(days=90)
+        )
+        task.refresh_from_db()
+
+        call_command("archive_tasks", "--days", "30", stdout=None)
+
+        archived = ArchivedTask.objects.get(pk=task.pk)
+        assert archived.created_at == task.created_at
+        assert archived.updated_at == task.updated_at
+
+    def test_list_excludes_archived_by_default(self, authenticated_client, archived):
+        response = authenticated_client.get("/api/v1/tasks/")
+        assert response.json()["count"] == 2
+
+    @pytest.mark.parametrize("fast_path", [True, False])
+    def test_include_archived(
+        self, authenticated_client, archived, settings, fast_path
+    ):
+        settings.TASKS_FAST_READ_PATH = fast_path
+        response = authenticated_client.get(
+            "/api/v1/tasks/?include_archived=true&ordering=created_at&page_size=3"
+        )
+        data = response.json()
+
+        assert data["count"] == 4
+        assert [t["title"] for t in data["results"]] == [
+            "Live todo",
+            "Recent done",
+            "Old done 1",
+        ]
+
+    def test_done_filter_includes_archived(self, authenticated_client, archived):
+        response = authenticated_client.get("/api/v1/tasks/?status=DONE&search=Old")
+        titles = sorted(t["title"] for t in response.json()["results"])
+        assert titles == ["Old done 1", "Old done 2"]
+
+    def test_retrieve_archived(self, authenticated_client, archived):
+        task = archived.first()
+        url = f"/api/v1/tasks/{task.pk}/"
+
+        assert authenticated_client.get(url).status_code == 404
+        response = authenticated_client.get(url + "?include_archived=true")
+        assert response.status_code == 200
+        assert response.json()["title"] == task.title
+
+    def test_stats_include_archived(self, authenticated_client, archived):
+        data = authenticated_client.get("/api/v1/tasks/stats/").json()
+
+        assert data["total"] == 4
+        assert data["by_status"] == {"TODO": 1, "IN_PROGRESS": 0, "DONE": 3}
+        assert data["by_priority"] == {"LOW": 2, "MEDIUM": 1, "HIGH": 1}
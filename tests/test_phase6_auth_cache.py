@@ -0,0 +1,156 @@
+"""
+Phase 6 - Cached token authentication tests
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from app.tasks import redis_client
+from app.tasks.authentication import (
+    CachedTokenAuthentication,
+    TokenCache,
+    token_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Start every test with empty cache tiers"""
+    token_cache.local.clear()
+    cache.clear()
+    yield
+    token_cache.local.clear()
+
+
+@pytest.fixture
+def token():
+    """Create a user with a token"""
+    user = User.objects.create_user(username="cacheduser", password="testpass123")
+    return Token.objects.create(user=user)
+
+
+def authenticate(key):
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Token {key}")
+    return CachedTokenAuthentication().authenticate(request)
+
+
+@pytest.mark.django_db
+class TestCachedTokenAuthentication:
+    """Test token -> user resolution through the cache tiers"""
+
+    def test_second_request_costs_no_queries(self, token, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            user, auth = authenticate(token.key)
+        with django_assert_num_queries(0):
+            cached_user, cached_auth = authenticate(token.key)
+
+        assert user.pk == cached_user.pk == token.user_id
+        assert cached_auth.key == token.key
+
+    def test_redis_tier_used_when_local_misses(self, token, django_assert_num_queries):
+        authenticate(token.key)
+        token_cache.local.clear()
+
+        with django_assert_num_queries(0):
+            user, _ = authenticate(token.key)
+        assert user.username == "cacheduser"
+
+    def test_deleted_token_invalidated(self, token, django_capture_on_commit_callbacks):
+        authenticate(token.key)
+        key = token.key
+        with django_capture_on_commit_callbacks(execute=True):
+            token.delete()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(key)
+
+    def test_deactivated_user_invalidated(
+        self, token, django_capture_on_commit_callbacks
+    ):
+        authenticate(token.key)
+        token.user.is_active = False
+        with django_capture_on_commit_callbacks(execute=True):
+            token.user.save()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token.key)
+
+    def test_user_tokens_invalidated_on_commit(
+        self, token, django_capture_on_commit_callbacks
+    ):
+        authenticate(token.key)
+        user = token.user
+        user.is_active = False
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            user.save()
+            # Not committed yet: other requests still read the committed user
+            assert token_cache.get(token.key)["is_active"]
+        for callback in callbacks:
+            callback()
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token.key)
+
+    def test_invalid_token_rejected(self):
+        with pytest.raises(AuthenticationFailed):
+            authenticate("0" * 40)
+
+    def test_api_request_with_cached_token(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        assert client.get("/api/v1/tasks/").status_code == 200
+        assert client.get("/api/v1/tasks/").status_code == 200
+
+    def test_only_user_essentials_cached(self, token, django_assert_num_queries):
+        authenticate(token.key)
+        entry = cache.get(TokenCache.cache_key(token.key))
+        assert entry == {
+            "id": token.user_id,
+            "username": "cacheduser",
+            "is_active": True,
+            "is_staff": False,
+        }
+
+        token_cache.local.clear()
+        user, auth = authenticate(token.key)
+        assert auth.user_id == user.pk
+        # Anything else is loaded on demand
+        with django_assert_num_queries(1):
+            assert user.check_password("testpass123")
+
+
+class FakeRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+@pytest.mark.django_db
+class TestInvalidationBroadcast:
+    """Test invalidations reaching the other workers' local tier"""
+
+    def test_invalidation_published_hashed(
+        self, token, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        client = FakeRedis()
+        monkeypatch.setattr(redis_client, "get_redis", lambda: client)
+        key = token.key
+        with django_capture_on_commit_callbacks(execute=True):
+            token.delete()
+
+        cache_key = TokenCache.cache_key(key)
+        assert client.published == [("auth:invalidate", cache_key)]
+        assert key not in cache_key
+
+    def test_message_drops_local_entry(self, token):
+        authenticate(token.key)
+        cache_key = TokenCache.cache_key(token.key)
+        assert token_cache.local.get(cache_key) is not None
+
+        # As received by another worker's listener
+        token_cache.channel.on_message(cache_key)
+        assert token_cache.local.get(cache_key) is None
@@ -0,0 +1,203 @@
+"""
+Phase 6 - Benchmark harness tests
+"""
+import json
+import random
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from app.tasks import bench_harness
+from app.tasks.bench_harness import RunResult, mann_whitney_greater
+from app.tasks.metrics_aggregator import MetricsAggregator
+from app.tasks.models import BenchmarkRun
+
+
+def make_result(scenario="list", latency_ms=2.0, rps=500, requests=400, seed=0):
+    """RunResult with jittered latencies around latency_ms at about rps"""
+    rng = random.Random(seed)
+    result = RunResult(scenario, "inprocess")
+    now = 0.0
+    for _ in range(requests):
+        latency = latency_ms * rng.uniform(0.8, 1.2) / 1000
+        sent = now
+        now += 1 / (rps * rng.uniform(0.9, 1.1))
+        result.record(0.0, sent, sent + latency, failed=False)
+    result.duration_s = now
+    return result
+
+
+class TestStatistics:
+    """Test the comparison statistics"""
+
+    def test_mann_whitney(self):
+        rng = random.Random(1)
+        low = [rng.gauss(10, 1) for _ in range(50)]
+        high = [rng.gauss(12, 1) for _ in range(50)]
+        assert mann_whitney_greater(high, low) < 0.001
+        assert mann_whitney_greater(low, high) > 0.99
+        assert mann_whitney_greater([1, 1, 1], [1, 1, 1]) == 1.0
+        assert mann_whitney_greater([], low) == 1.0
+
+    def test_batch_throughputs(self):
+        finish_times = [i * 0.01 for i in range(1, 101)]
+        assert bench_harness.batch_throughputs(finish_times, 10) == [100.0] * 10
+
+    def test_summary(self):
+        summary = make_result(latency_ms=2.0, requests=100).summary()
+        assert summary["requests"] == 100
+        assert summary["errors"] == 0
+        assert summary["throughput_rps"] == pytest.approx(500, rel=0.1)
+        assert 1.6 <= summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"] <= 2.4
+
+
+@pytest.mark.django_db
+class TestRunHistory:
+    """Test stored runs, baselines and regression flags"""
+
+    def test_first_run_has_no_comparison(self):
+        run = bench_harness.save_run(make_result(), {"git_commit": "abc"})
+        assert run.baseline is None
+        assert run.comparison == {}
+        assert run.regression is False
+        assert len(run.latency_samples) == 400
+        assert len(run.throughput_samples) == 10
+
+    def test_noise_is_not_a_regression(self):
+        baseline = bench_harness.save_run(make_result(seed=1), {}, set_baseline=True)
+        run = bench_harness.save_run(make_result(seed=2), {})
+
+        assert run.baseline == baseline
+        assert run.regression is False
+        assert run.comparison["baseline_id"] == str(baseline.pk)
+        assert abs(run.comparison["p95_ms"]["change_pct"]) < 10
+
+    def test_slower_run_flagged(self):
+        bench_harness.save_run(make_result(seed=1), {}, set_baseline=True)
+        run = bench_harness.save_run(make_result(latency_ms=3.0, rps=300, seed=2), {})
+
+        assert run.regression is True
+        assert run.comparison["throughput_rps"]["regression"] is True
+        assert run.comparison["throughput_rps"]["p_value"] < 0.05
+        assert run.comparison["p95_ms"]["regression"] is True
+        assert run.comparison["p95_ms"]["ci_ms"][0] > 0
+        assert run.comparison["p99_ms"]["change_pct"] > 10
+
+    def test_compares_against_marked_baseline(self):
+        baseline = bench_harness.save_run(make_result(seed=1), {}, set_baseline=True)
+        bench_harness.save_run(make_result(latency_ms=3.0, seed=2), {})
+        run = bench_harness.save_run(make_result(seed=3), {})
+        assert run.baseline == baseline
+
+        newer = bench_harness.save_run(make_result(seed=4), {}, set_baseline=True)
+        baseline.refresh_from_db()
+        assert baseline.is_baseline is False
+        assert newer.is_baseline is True
+
+    def test_other_scenarios_are_separate(self):
+        bench_harness.save_run(make_result("list"), {})
+        run = bench_harness.save_run(make_result("stats"), {})
+        assert run.baseline is None
+
+    def test_samples_bounded(self, settings):
+        settings.BENCHMARKS = {"MAX_SAMPLES": 100}
+        run = bench_harness.save_run(make_result(), {})
+        assert len(run.latency_samples) == 100
+
+
+@pytest.mark.django_db
+class TestRunners:
+    """Test the in-process runner"""
+
+    @pytest.mark.parametrize("scenario", bench_harness.SCENARIOS)
+    def test_inprocess_scenarios(self, scenario):
+        result = bench_harness.run_inprocess(scenario, requests=10, tasks=5, warmup=2)
+        assert len(result.latencies_ms) == 10
+        assert result.errors == 0
+        assert result.duration_s > 0
+
+    def test_environment_metadata(self):
+        environment = bench_harness.collect_environment(mode="inprocess")
+        assert environment["database"] == "sqlite"
+        assert environment["mode"] == "inprocess"
+        assert environment["python"]
+        assert environment["cpu_count"]
+
+    def test_provision_tokens(self):
+        from rest_framework.authtoken.models import Token
+
+        tokens = bench_harness.provision_tokens(3)
+        assert len(set(tokens)) == 3
+        assert Token.objects.filter(key__in=tokens).count() == 3
+
+    def test_http_needs_a_token_per_client(self):
+        with pytest.raises(ValueError):
+            bench_harness.run_http("list", "http://api", ["abc"], concurrency=2)
+
+
+@pytest.mark.django_db
+class TestLatestRunMetrics:
+    """Test the latest run in the metrics summary"""
+
+    def test_no_runs(self):
+        assert MetricsAggregator._get_ab_metrics() == {}
+
+    def test_latest_run_with_delta(self):
+        bench_harness.save_run(
+            make_result(seed=1), {"git_commit": "abc"}, set_baseline=True
+        )
+        run = bench_harness.save_run(
+            make_result(latency_ms=3.0, rps=300, seed=2), {"git_commit": "def"}
+        )
+
+        latest = MetricsAggregator._get_ab_metrics()["latest_run"]
+        assert latest["id"] == str(run.pk)
+        assert latest["git_commit"] == "def"
+        assert latest["regression"] is True
+        assert latest["delta"]["throughput_rps"] < -10
+        assert latest["delta"]["p95_ms"] > 10
+
+
+@pytest.mark.django_db
+class TestBenchmarkCommand:
+    """Test the benchmark management command"""
+
+    def test_history_json(self):
+        bench_harness.save_run(make_result("list"), {})
+        bench_harness.save_run(make_result("stats"), {})
+        out = StringIO()
+        call_command("benchmark", "list", "--history", "--json", stdout=out)
+
+        runs = json.loads(out.getvalue())
+        assert [run["scenario"] for run in runs] == ["list"]
+        assert BenchmarkRun.objects.count() == 2
+
+    def test_inprocess_runs_without_caches(self, monkeypatch):
+        from contextlib import nullcontext
+
+        from django.conf import settings
+        from app.tasks.management.commands import benchmark
+
+        seen = {}
+
+        def run_inprocess(scenario, requests, tasks):
+            seen["cache"] = settings.CACHES["default"]["BACKEND"]
+            seen["coalescing"] = settings.RESPONSE_COALESCING["ENABLED"]
+            seen["detail_cache"] = settings.TASK_DETAIL_CACHE["ENABLED"]
+            return make_result(scenario)
+
+        monkeypatch.setattr(benchmark, "temporary_test_database", nullcontext)
+        monkeypatch.setattr(bench_harness, "run_inprocess", run_inprocess)
+        call_command("benchmark", "list", "--json", stdout=StringIO())
+
+        assert seen == {
+            "cache": "django.core.cache.backends.locmem.LocMemCache",
+            "coalescing": False,
+            "detail_cache": False,
+        }
+
+    def test_unknown_scenario(self):
+        with pytest.raises(CommandError):
+            call_command("benchmark", "browse")
@@ -0,0 +1,111 @@
+"""
+Phase 6 - Compact cache codec tests
+"""
+import pickle
+import uuid
+from decimal import Decimal
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import pytest
+from django.contrib.auth.models import User
+from django_redis.exceptions import CompressorError
+from rest_framework.authtoken.models import Token
+from app.tasks import cache_codec
+from app.tasks.cache_codec import MSGPACK_MARKER, CompactSerializer, ThresholdCompressor
+
+COMPACT = {"COMPACT_WRITES": True}
+
+
+@pytest.fixture
+def serializer():
+    return CompactSerializer({"COMPACT_WRITES": True})
+
+
+class TestCompactSerializer:
+    """Test msgpack encoding with pickle fallback"""
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            [12.5, 3.25, 800.0],
+            {1, 2, 3},
+            frozenset({"a"}),
+            (1, "two", None),
+            {"nested": {"ids": [uuid.uuid4()], "flag": True}},
+            {1: "int keys"},
+            datetime(2025, 10, 7, 12, 30, 5, 123456, tzinfo=timezone.utc),
+            b"raw bytes",
+        ],
+    )
+    def test_round_trip_as_msgpack(self, serializer, value):
+        payload = serializer.dumps(value)
+        assert payload[:1] == MSGPACK_MARKER
+        restored = serializer.loads(payload)
+        assert restored == value
+        assert type(restored) is type(value)
+
+    def test_dict_subclass_stored_as_dict(self, serializer):
+        value = OrderedDict([("b", 1), ("a", 2)])
+        assert serializer.loads(serializer.dumps(value)) == {"b": 1, "a": 2}
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            datetime(2025, 10, 7, 12, 30),
+            2**70,
+            {"amount": Decimal("1.10")},
+        ],
+    )
+    def test_inexact_values_pickled(self, serializer, value):
+        payload = serializer.dumps(value)
+        assert payload[:1] != MSGPACK_MARKER
+        assert serializer.loads(payload) == value
+
+    def test_model_instances_pickled(self, serializer):
+        token = Token(key="a" * 40, user=User(pk=1, username="alice"))
+        restored = serializer.loads(serializer.dumps(token))
+        assert restored.key == token.key
+        assert restored.user.username == "alice"
+
+    def test_reads_legacy_pickles(self, serializer):
+        legacy = pickle.dumps({"user_set": {1, 2}}, pickle.DEFAULT_PROTOCOL)
+        assert serializer.loads(legacy) == {"user_set": {1, 2}}
+
+    def test_compact_writes_off_by_default(self):
+        serializer = CompactSerializer({})
+        payload = serializer.dumps([1.5])
+        assert pickle.loads(payload) == [1.5]
+
+
+class TestThresholdCompressor:
+    """Test size-threshold compression"""
+
+    def test_small_values_not_compressed(self):
+        compressor = ThresholdCompressor({**COMPACT, "COMPRESS_MIN_LENGTH": 100})
+        assert compressor.compress(b"x" * 100) == b"x" * 100
+        with pytest.raises(CompressorError):
+            compressor.decompress(b"x" * 100)
+
+    def test_large_values_round_trip(self):
+        compressor = ThresholdCompressor({**COMPACT, "COMPRESS_MIN_LENGTH": 100})
+        value = MSGPACK_MARKER + b"task " * 200
+        compressed = compressor.compress(value)
+        assert len(compressed) < len(value)
+        assert compressor.decompress(compressed) == value
+
+    def test_zlib_without_zstandard(self, monkeypatch):
+        compressor = ThresholdCompressor({**COMPACT, "COMPRESS_MIN_LENGTH": 10})
+        monkeypatch.setattr(cache_codec, "zstandard", None)
+        compressed = compressor.compress(b"payload " * 50)
+        assert compressed[:1] == b"\x78"
+        assert compressor.decompress(compressed) == b"payload " * 50
+
+    def test_uncompressed_pickle_passes_through(self):
+        compressor = ThresholdCompressor(COMPACT)
+        with pytest.raises(CompressorError):
+            compressor.decompress(pickle.dumps(list(range(1000))))
+
+    def test_compact_writes_off_by_default(self):
+        compressor = ThresholdCompressor({})
+        assert compressor.compress(b"x" * 10000) == b"x" * 10000
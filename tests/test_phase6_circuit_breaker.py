@@ -0,0 +1,183 @@
+"""
+Phase 6 - Redis circuit breaker tests
+"""
+import time
+
+import pytest
+from rest_framework.test import APIClient
+from app.tasks.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpen,
+    GuardedCache,
+    guarded_cache,
+    redis_breaker,
+)
+
+
+@pytest.fixture(autouse=True)
+def breaker_settings(settings):
+    """Trip after two failures, probe again after 50ms"""
+    settings.REDIS_CIRCUIT_BREAKER = {"FAILURE_THRESHOLD": 2, "RESET_TIMEOUT": 0.05}
+    redis_breaker.reset()
+    yield
+    redis_breaker.reset()
+
+
+class StalledCache:
+    """Cache stub that fails every call and counts them"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _fail(self, *args, **kwargs):
+        self.calls += 1
+        raise TimeoutError("Timeout reading from socket")
+
+    get = set = add = delete = get_many = clear = _fail
+
+
+def fail():
+    raise ConnectionError("redis down")
+
+
+class TestCircuitBreaker:
+    """Test state transitions"""
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker("test")
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                breaker.call(fail)
+
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpen):
+            breaker.call(lambda: "skipped")
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker("test")
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+        assert breaker.call(lambda: "ok") == "ok"
+        assert breaker.failures == 0
+
+    def test_half_open_probe_closes(self):
+        breaker = CircuitBreaker("test")
+        breaker.record_failure()
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        assert breaker.allow()
+        assert breaker.state == "half_open"
+        # Only one probe at a time
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("test")
+        breaker.record_failure()
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+
+class TestGuardedCache:
+    """Test the cache wrapper and its local fallback"""
+
+    def test_falls_back_and_stops_calling_redis(self):
+        stalled = StalledCache()
+        cache = GuardedCache(stalled, CircuitBreaker("test"))
+
+        for i in range(5):
+            cache.set("key", i)
+        assert cache.get("key") == 4
+        # Two failures tripped the breaker, later calls skip Redis
+        assert stalled.calls == 2
+
+    def test_healthy_cache_used(self):
+        from django.core.cache import cache as django_cache
+
+        cache = GuardedCache(django_cache, CircuitBreaker("test"))
+        cache.set("guarded", "value", 10)
+        assert django_cache.get("guarded") == "value"
+        assert cache.fallback.get("guarded") is None
+
+    def test_invalidations_replayed_after_outage(self):
+        redis = FlakyCache()
+        cache = GuardedCache(redis, CircuitBreaker("test"))
+        cache.set("token", "cached")
+        cache.set("task", "row")
+
+        redis.down = True
+        cache.delete("token")
+        cache.set_tombstone("task", "invalidated", 10)
+        assert cache.pending_invalidations() == 2
+        assert cache.get("token") is None
+
+        redis.down = False
+        time.sleep(0.06)
+        # Replayed before the first call that reaches Redis again
+        assert cache.get("token") is None
+        assert redis.data == {"task": "invalidated"}
+        assert cache.pending_invalidations() == 0
+
+    def test_pending_invalidations_bounded(self):
+        redis = FlakyCache()
+        redis.down = True
+        cache = GuardedCache(redis, CircuitBreaker("test"), max_pending=2)
+        for key in ("a", "b", "a", "c"):
+            cache.delete(key)
+        assert list(cache._pending) == ["a", "c"]
+
+
+class FlakyCache:
+    """Dict-backed cache stub that fails while ``down``"""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("redis down")
+
+    def get(self, key, default=None):
+        self._check()
+        return self.data.get(key, default)
+
+    def set(self, key, value, timeout=None):
+        self._check()
+        self.data[key] = value
+
+    def delete(self, key):
+        self._check()
+        return self.data.pop(key, None) is not None
+
+
+class TestRequestPath:
+    """Test the breaker on the request path"""
+
+    def test_requests_survive_stalled_redis(self, monkeypatch):
+        stalled = StalledCache()
+        monkeypatch.setattr(guarded_cache, "cache", stalled)
+
+        client = APIClient()
+        for _ in range(5):
+            assert client.get("/health").status_code == 200
+        assert stalled.calls == 2
+        assert redis_breaker.state == "open"
+
+    def test_breaker_state_on_status(self):
+        redis_breaker.record_failure(TimeoutError("Timeout reading from socket"))
+        response = APIClient().get("/status")
+
+        assert response.json()["circuit_breakers"]["redis"] == {
+            "state": "closed",
+            "consecutive_failures": 1,
+            "last_error": "Timeout reading from socket",
+        }
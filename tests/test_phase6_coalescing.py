@@ -0,0 +1,184 @@
+"""
+Phase 6 - Request coalescing tests
+"""
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from app.tasks.coalescing import coalesced, invalidate, make_key
+
+
+@pytest.fixture(autouse=True)
+def coalescing_enabled(settings):
+    """Enable coalescing and start with an empty cache"""
+    settings.RESPONSE_COALESCING = {"ENABLED": True, "TTL": 60, "STALE_TTL": 60}
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def counting_view(delay=0, **options):
+    """A view that counts its computations"""
+    calls = []
+
+    @api_view(["GET"])
+    @permission_classes([AllowAny])
+    @coalesced("counting", **options)
+    def view(request):
+        calls.append(1)
+        time.sleep(delay)
+        return Response({"calls": len(calls)})
+
+    return view, calls
+
+
+def get(view, path="/counting"):
+    return view(APIRequestFactory().get(path))
+
+
+class TestCoalesced:
+    """Test singleflight and stale-while-revalidate behaviour"""
+
+    def test_fresh_result_reused(self):
+        view, calls = counting_view()
+        assert get(view).data == {"calls": 1}
+        assert get(view).data == {"calls": 1}
+        assert len(calls) == 1
+
+    def test_query_string_is_part_of_key(self):
+        view, calls = counting_view()
+        get(view, "/counting?a=1")
+        get(view, "/counting?a=2")
+        assert len(calls) == 2
+
+    def test_concurrent_calls_compute_once(self):
+        view, calls = counting_view(delay=0.2)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get(view).data))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [{"calls": 1}] * 10
+
+    def test_stale_served_while_other_worker_revalidates(self):
+        view, calls = counting_view(TTL=0)
+        get(view)
+        # Another worker holds the lock while recomputing
+        cache.add(make_key("counting") + ":lock", 1, 10)
+
+        assert get(view).data == {"calls": 1}
+        assert len(calls) == 1
+
+    def test_stale_result_revalidated(self):
+        view, calls = counting_view(TTL=0)
+        get(view)
+        assert get(view).data == {"calls": 2}
+
+    def test_waits_for_other_worker_result(self):
+        view, calls = counting_view(WAIT_TIMEOUT=2)
+        key = make_key("counting")
+        cache.add(key + ":lock", 1, 10)
+
+        def other_worker():
+            time.sleep(0.1)
+            cache.set(
+                key, {"data": {"calls": 99}, "status": 200, "stored_at": time.time()}
+            )
+
+        thread = threading.Thread(target=other_worker)
+        thread.start()
+        assert get(view).data == {"calls": 99}
+        thread.join()
+        assert calls == []
+
+    def test_invalidate_covers_every_query_string(self):
+        view, calls = counting_view()
+        for path in ("/counting", "/counting?a=1", "/counting?a=1"):
+            get(view, path)
+        assert len(calls) == 2
+
+        invalidate("counting")
+        get(view, "/counting")
+        get(view, "/counting?a=1")
+        assert len(calls) == 4
+
+    def test_errors_not_stored(self):
+        calls = []
+
+        @api_view(["GET"])
+        @permission_classes([AllowAny])
+        @coalesced("failing")
+        def view(request):
+            calls.append(1)
+            if len(calls) == 1:
+                return Response({"detail": "busy"}, status=503)
+            return Response({"ok": True})
+
+        assert get(view).status_code == 503
+        assert get(view).data == {"ok": True}
+        assert get(view).data == {"ok": True}
+        assert len(calls) == 2
+
+    def test_disabled(self, settings):
+        settings.RESPONSE_COALESCING = {"ENABLED": False}
+        view, calls = counting_view()
+        get(view)
+        get(view)
+        assert len(calls) == 2
+
+
+@pytest.mark.django_db
+class TestCoalescedViews:
+    """Test coalescing on the API views"""
+
+    def stats_client(self):
+        user = User.objects.create_user(username="coalescer", password="testpass123")
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+        )
+        return user, client
+
+    def test_stats_per_user_and_invalidated_on_write(
+        self, django_capture_on_commit_callbacks
+    ):
+        user, client = self.stats_client()
+
+        assert client.get("/api/v1/tasks/stats/").json()["total"] == 0
+        assert cache.get(make_key("tasks_stats", user.pk)) is not None
+
+        assert client.get("/api/v1/tasks/stats/?fields=total").json()["total"] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post("/api/v1/tasks/", {"title": "New"}, format="json")
+        assert client.get("/api/v1/tasks/stats/").json()["total"] == 1
+        assert client.get("/api/v1/tasks/stats/?fields=total").json()["total"] == 1
+
+    def test_stats_invalidated_on_commit(self, django_capture_on_commit_callbacks):
+        user, client = self.stats_client()
+        assert client.get("/api/v1/tasks/stats/").json()["total"] == 0
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            client.post("/api/v1/tasks/", {"title": "New"}, format="json")
+            # Not committed yet: the cached count stays until the commit
+            assert client.get("/api/v1/tasks/stats/").json()["total"] == 0
+        for callback in callbacks:
+            callback()
+        assert client.get("/api/v1/tasks/stats/").json()["total"] == 1
+
+    def test_summary_cached(self):
+        assert APIClient().get("/api/v1/metrics/summary/").status_code == 200
+        assert cache.get(make_key("metrics_summary")) is not None
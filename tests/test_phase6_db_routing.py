@@ -0,0 +1,63 @@
+"""
+Phase 6 - Read/write database routing tests
+"""
+import pytest
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from app.tasks import db_routers
+from app.tasks.db_routers import ReadWriteRouter
+from app.tasks.middleware import ReadYourWritesMiddleware
+from app.tasks.models import Task
+
+
+@pytest.fixture
+def router(settings):
+    """Router with a read alias configured"""
+    settings.DATABASE_READ_ALIASES = ["read"]
+    return ReadWriteRouter()
+
+
+# Not wrapped in a test transaction: reads inside atomic blocks always
+# go to the primary
+@pytest.mark.django_db(transaction=True)
+class TestReadWriteRouter:
+    """Test alias selection and read-your-writes stickiness"""
+
+    def test_reads_go_to_read_alias(self, router):
+        assert router.db_for_read(Task) == "read"
+        assert router.db_for_write(Task) == "default"
+
+    def test_no_read_alias_uses_default(self, settings):
+        settings.DATABASE_READ_ALIASES = []
+        assert ReadWriteRouter().db_for_read(Task) == "default"
+
+    def test_reads_stick_to_primary_after_write(self, router):
+        token = db_routers.start_request()
+        try:
+            assert router.db_for_read(Task) == "read"
+            router.db_for_write(Task)
+            assert router.db_for_read(Task) == "default"
+        finally:
+            db_routers.end_request(token)
+        assert router.db_for_read(Task) == "read"
+
+    def test_reads_in_transaction_use_primary(self, router):
+        with transaction.atomic():
+            assert router.db_for_read(Task) == "default"
+
+    def test_read_aliases_not_migrated(self, router):
+        assert router.allow_migrate("read", "tasks") is False
+        assert router.allow_migrate("default", "tasks") is None
+
+    @pytest.mark.parametrize("method,expected", [("get", "read"), ("post", "default")])
+    def test_middleware_pins_unsafe_methods(self, router, method, expected):
+        seen = []
+
+        def view(request):
+            seen.append(router.db_for_read(Task))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)("/api/v1/tasks/")
+        ReadYourWritesMiddleware(view)(request)
+        assert seen == [expected]
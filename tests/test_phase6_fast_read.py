@@ -0,0 +1,118 @@
+"""
+Phase 6 - Fast read path tests
+"""
+import json
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+from app.tasks.models import Task
+from app.tasks.renderers import FastJSONRenderer
+from app.tasks.serializers import TaskSerializer
+from app.tasks.views import TaskViewSet
+
+
+@pytest.fixture
+def user():
+    """Create test user"""
+    return User.objects.create_user(username="fastuser", password="testpass123")
+
+
+@pytest.fixture
+def authenticated_client(user):
+    """Create authenticated API client"""
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+@pytest.fixture
+def tasks(user):
+    """Create tasks with a mix of optional values and unicode text"""
+    Task.objects.create(title="Plain", owner=user)
+    Task.objects.create(
+        title="Ünïcode \u2028 separator",
+        description='line\nbreak "quoted" </script>',
+        status="DONE",
+        priority="HIGH",
+        due_date="2030-01-01T10:30:00.123456Z",
+        owner=user,
+    )
+    return list(Task.objects.filter(owner=user))
+
+
+@pytest.mark.django_db
+class TestFastReadPath:
+    """The fast path must be byte-identical to TaskSerializer + JSONRenderer"""
+
+    def test_list_matches_serializer_bytes(self, authenticated_client, tasks, settings):
+        settings.TASKS_FAST_READ_PATH = True
+        response = authenticated_client.get("/api/v1/tasks/")
+        assert response.status_code == 200
+
+        expected = JSONRenderer().render(
+            {
+                "count": len(tasks),
+                "next": None,
+                "previous": None,
+                "results": TaskSerializer(tasks, many=True).data,
+            }
+        )
+        assert response.content == expected
+
+    def test_list_matches_slow_path(self, authenticated_client, tasks, settings):
+        url = "/api/v1/tasks/?ordering=priority&search=i&page_size=1"
+        settings.TASKS_FAST_READ_PATH = True
+        fast = authenticated_client.get(url)
+        settings.TASKS_FAST_READ_PATH = False
+        slow = authenticated_client.get(url)
+
+        assert fast.status_code == slow.status_code == 200
+        assert fast.content == slow.content
+
+    def test_retrieve_matches_serializer_bytes(
+        self, authenticated_client, tasks, settings
+    ):
+        settings.TASKS_FAST_READ_PATH = True
+        task = tasks[0]
+        response = authenticated_client.get(f"/api/v1/tasks/{task.id}/")
+
+        assert response.status_code == 200
+        assert response.content == JSONRenderer().render(TaskSerializer(task).data)
+
+    def test_retrieve_other_users_task_not_found(self, authenticated_client, settings):
+        settings.TASKS_FAST_READ_PATH = True
+        other = User.objects.create_user(username="other", password="otherpass123")
+        task = Task.objects.create(title="Not yours", owner=other)
+
+        response = authenticated_client.get(f"/api/v1/tasks/{task.id}/")
+        assert response.status_code == 404
+
+    def test_retrieve_invalid_id_not_found(self, authenticated_client, settings):
+        settings.TASKS_FAST_READ_PATH = True
+        response = authenticated_client.get("/api/v1/tasks/not-a-uuid/")
+        assert response.status_code == 404
+
+
+class TestFastJSONRenderer:
+    """FastJSONRenderer output matches the stock renderer"""
+
+    def test_matches_stock_renderer(self):
+        data = {"a": [1, 2.5, None, True], "b": "x y", "c": {"d": "é"}}
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_floats_left_to_stock_renderer(self):
+        default = api_settings.DEFAULT_RENDERER_CLASSES[0]
+        assert default().render({"big": 1e16}) == b'{"big":1e+16}'
+        assert FastJSONRenderer().render({"big": 1e16}) == b'{"big":1e16}'
+        assert TaskViewSet.renderer_classes[0] is FastJSONRenderer
+
+    def test_indent_falls_back_to_stock_renderer(self):
+        data = {"a": 1}
+        rendered = FastJSONRenderer().render(data, "application/json; indent=4", {})
+        assert json.loads(rendered) == data
+        assert b"\n" in rendered
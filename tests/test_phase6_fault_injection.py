@@ -0,0 +1,250 @@
+"""
+Phase 6 - Fault injection tests
+"""
+import json
+import random
+import time
+from io import StringIO
+
+import pytest
+import redis
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from app.tasks import fault_injection, redis_client
+from app.tasks.fault_injection import FaultInjector, fault_injector, normalize_rule
+from app.tasks.redis_client import InstrumentedConnectionPool
+
+
+class FakeRedis:
+    """Just the hash commands the rule store uses"""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field.encode()] = value.encode()
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hdel(self, key, *fields):
+        stored = self.hashes.get(key, {})
+        return sum(stored.pop(field.encode(), None) is not None for field in fields)
+
+    def hlen(self, key):
+        return len(self.hashes.get(key, {}))
+
+    def delete(self, key):
+        return int(self.hashes.pop(key, None) is not None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_injector():
+    fault_injector.reset()
+    yield
+    fault_injector.reset()
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(redis_client, "get_redis", lambda: client)
+    return client
+
+
+@pytest.fixture
+def enable_faults(settings):
+    """Enable injection with the given static rules"""
+
+    def enable(*rules):
+        settings.FAULT_INJECTION = {"ENABLED": True, "RULES": list(rules)}
+
+    return enable
+
+
+@pytest.fixture
+def authenticated_client():
+    """Create authenticated API client"""
+    user = User.objects.create_user(username="faulty", password="testpass123")
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+class TestRules:
+    """Test rule validation and matching"""
+
+    def test_defaults_filled_in(self):
+        rule = normalize_rule("slow", {"latency_ms": 100, "methods": ["get"]})
+        assert rule["name"] == "slow"
+        assert rule["fraction"] == 1.0
+        assert rule["methods"] == ["GET"]
+
+    @pytest.mark.parametrize(
+        "rule",
+        [
+            {"fraction": 1.5},
+            {"latency_ms": -1},
+            {"latency_ms": 60000},
+            {"error_status": 200},
+            {"routes": ["("]},
+            {"colour": "red"},
+        ],
+    )
+    def test_invalid_rules(self, rule):
+        with pytest.raises(Exception):
+            normalize_rule("bad", rule)
+
+    def test_matching(self):
+        factory = APIRequestFactory()
+        rule = normalize_rule(
+            "list", {"routes": [r"^/api/v1/tasks/$"], "methods": ["GET"]}
+        )
+        assert FaultInjector.matches(rule, factory.get("/api/v1/tasks/"))
+        assert not FaultInjector.matches(rule, factory.post("/api/v1/tasks/"))
+        assert not FaultInjector.matches(rule, factory.get("/api/v1/tasks/stats/"))
+        assert FaultInjector.matches(normalize_rule("all", {}), factory.get("/x"))
+
+    def test_fraction_is_respected(self, enable_faults, settings):
+        enable_faults({"name": "half", "fraction": 0.5, "latency_ms": 1})
+        config = fault_injection.get_config()
+        request = APIRequestFactory().get("/api/v1/tasks/")
+        fired = sum(
+            fault_injector.plan(request, config) is not None for _ in range(2000)
+        )
+        assert 800 < fired < 1200
+
+    def test_expired_rules_ignored(self, enable_faults):
+        enable_faults({"error_status": 500, "expires_at": time.time() - 1})
+        request = APIRequestFactory().get("/api/v1/tasks/")
+        assert fault_injector.plan(request, fault_injection.get_config()) is None
+
+
+@pytest.mark.django_db
+class TestFaultInjectionMiddleware:
+    """Test faults injected into real requests"""
+
+    def test_disabled_ignores_rules(self, settings, authenticated_client):
+        settings.FAULT_INJECTION = {"RULES": [{"error_status": 503}]}
+        response = authenticated_client.get("/api/v1/tasks/")
+        assert response.status_code == 200
+        assert "X-Fault-Injected" not in response
+
+    def test_error(self, enable_faults, authenticated_client):
+        enable_faults(
+            {"name": "boom", "routes": ["^/api/v1/tasks/$"], "error_status": 503}
+        )
+        response = authenticated_client.get("/api/v1/tasks/")
+        assert response.status_code == 503
+        assert response["X-Fault-Injected"] == "boom"
+        assert authenticated_client.get("/api/v1/tasks/stats/").status_code == 200
+
+    def test_latency(self, enable_faults, authenticated_client):
+        enable_faults({"name": "slow", "latency_ms": 50})
+        start = time.perf_counter()
+        response = authenticated_client.get("/api/v1/tasks/")
+        assert time.perf_counter() - start >= 0.05
+        assert response.status_code == 200
+        assert response["X-Fault-Injected"] == "slow"
+
+    def test_health_never_faulted(self, enable_faults):
+        enable_faults({"error_status": 500})
+        assert APIClient().get("/health").status_code == 200
+
+    def test_db_delay_applies_to_queries_of_the_request(self):
+        plan = fault_injection.FaultPlan(
+            [normalize_rule("db", {"db_delay_ms": 20})], random.Random()
+        )
+        with plan.activate():
+            start = time.perf_counter()
+            User.objects.count()
+            User.objects.count()
+            assert time.perf_counter() - start >= 0.04
+        start = time.perf_counter()
+        User.objects.count()
+        assert time.perf_counter() - start < 0.02
+        assert not connection.execute_wrappers
+
+    def test_redis_failure_scoped_to_request(self):
+        pool = InstrumentedConnectionPool.from_url("redis://localhost:6390/0")
+        plan = fault_injection.FaultPlan(
+            [normalize_rule("redis-down", {"redis_failure": True})], random.Random()
+        )
+        with plan.activate():
+            with pytest.raises(redis.ConnectionError, match="Injected"):
+                pool.get_connection("GET")
+        assert fault_injection.redis_failure_active() is None
+
+
+@pytest.mark.django_db
+class TestRuntimeControl:
+    """Test rules stored in Redis and the faults command"""
+
+    def test_runtime_rules_reach_requests(
+        self, settings, fake_redis, authenticated_client
+    ):
+        settings.FAULT_INJECTION = {"ENABLED": True, "REFRESH_INTERVAL": 0}
+        fault_injection.set_rule("teapot", {"error_status": 418, "methods": ["GET"]})
+        assert authenticated_client.get("/api/v1/tasks/").status_code == 418
+
+        fault_injection.delete_rules("teapot")
+        assert authenticated_client.get("/api/v1/tasks/").status_code == 200
+
+    def test_rules_cached_between_refreshes(self, settings, fake_redis):
+        settings.FAULT_INJECTION = {"ENABLED": True, "REFRESH_INTERVAL": 60}
+        config = fault_injection.get_config()
+        assert fault_injector.rules(config) == []
+        fault_injection.set_rule("later", {"latency_ms": 1})
+        assert fault_injector.rules(config) == []
+
+    def test_invalid_runtime_rule_skipped(self, fake_redis):
+        fake_redis.hset("faults:rules", "bad", json.dumps({"fraction": 7}))
+        fake_redis.hset("faults:rules", "good", json.dumps({"latency_ms": 1}))
+        rules = fault_injector.runtime_rules(fault_injection.get_config())
+        assert [rule["name"] for rule in rules] == ["good"]
+
+    def test_unreachable_redis_means_no_runtime_faults(self, monkeypatch):
+        def broken():
+            raise redis.ConnectionError("down")
+
+        monkeypatch.setattr(redis_client, "get_redis", broken)
+        assert fault_injector.runtime_rules(fault_injection.get_config()) == []
+
+    def test_command(self, fake_redis):
+        out = StringIO()
+        call_command(
+            "faults",
+            "set",
+            "slow-list",
+            "--route",
+            "^/api/v1/tasks/$",
+            "--fraction",
+            "0.2",
+            "--latency-ms",
+            "300",
+            "--ttl",
+            "60",
+            stdout=out,
+        )
+        stored = fault_injection.list_rules()["slow-list"]
+        assert stored["fraction"] == 0.2
+        assert stored["routes"] == ["^/api/v1/tasks/$"]
+        assert stored["expires_at"] > time.time()
+
+        call_command("faults", "set", "down", "--redis-failure", stdout=out)
+        call_command("faults", "clear", stdout=out)
+        assert fault_injection.list_rules() == {}
+        assert "Removed 2 rule(s)" in out.getvalue()
+
+        with pytest.raises(CommandError):
+            call_command("faults", "set", "bad", "--fraction", "2", stdout=out)
+
+    def test_command_without_redis(self, monkeypatch):
+        monkeypatch.setattr(redis_client, "get_redis", lambda: None)
+        with pytest.raises(CommandError, match="not configured"):
+            call_command("faults", "list")
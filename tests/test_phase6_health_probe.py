@@ -0,0 +1,88 @@
+"""
+Phase 6 - Background dependency prober tests
+"""
+import time
+
+import pytest
+from rest_framework.test import APIClient
+from app.tasks import health_probe, views_health
+from app.tasks.health_probe import DependencyProber
+
+
+def failing():
+    raise ConnectionError("connection refused")
+
+
+@pytest.fixture
+def prober(monkeypatch):
+    """A prober with stub checks, used by /status"""
+    prober = DependencyProber(checks={"redis": lambda: None, "database": lambda: None})
+    monkeypatch.setattr(views_health, "dependency_prober", prober)
+    return prober
+
+
+class TestDependencyProber:
+    """Test probe results and snapshots"""
+
+    def test_probe_records_latency_and_success(self):
+        prober = DependencyProber(checks={"redis": lambda: time.sleep(0.01)})
+        result = prober.probe("redis")
+
+        assert result["status"] == "ok"
+        assert result["latency_ms"] >= 10
+        assert result["last_success"] == result["checked_at"]
+
+    def test_failure_keeps_last_success(self):
+        checks = {"redis": lambda: None}
+        prober = DependencyProber(checks=checks)
+        success = prober.probe("redis")["last_success"]
+
+        checks["redis"] = failing
+        result = prober.probe("redis")
+        assert result["status"] == "error: connection refused"
+        assert result["last_success"] == success
+
+    def test_stale_snapshot_reported_as_error(self, settings):
+        settings.HEALTH_PROBE = {"INTERVAL": 60, "STALE_AFTER": 0}
+        prober = DependencyProber(checks={"redis": lambda: None})
+        prober.probe("redis")
+        prober._results["redis"]["checked_at"] -= 1
+
+        assert prober.snapshot()["redis"]["status"].startswith("error")
+
+    def test_gauges_exported(self):
+        prober = DependencyProber(checks={"database": failing})
+        prober.probe("database")
+        assert health_probe.probe_up.labels(dependency="database")._value.get() == 0
+
+    def test_default_checks_pass(self, db):
+        prober = DependencyProber()
+        prober.probe_all()
+        assert {r["status"] for r in prober._results.values()} == {"ok"}
+
+
+class TestStatusEndpoint:
+    """Test /status served from the prober snapshot"""
+
+    def test_status_uses_snapshot(self, prober):
+        calls = []
+        prober.checks["redis"] = lambda: calls.append(1)
+
+        client = APIClient()
+        for _ in range(3):
+            response = client.get("/status")
+        assert response.status_code == 200
+        assert response.json()["checks"] == {
+            "api": "ok",
+            "redis": "ok",
+            "database": "ok",
+        }
+        assert "latency_ms" in response.json()["probes"]["redis"]
+        assert len(calls) == 1
+
+    def test_status_unhealthy_when_probe_fails(self, prober):
+        prober.checks["database"] = failing
+        response = APIClient().get("/status")
+
+        assert response.status_code == 503
+        assert response.json()["checks"]["database"] == "error: connection refused"
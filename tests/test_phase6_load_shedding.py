@@ -0,0 +1,173 @@
+"""
+Phase 6 - Adaptive load shedding tests
+"""
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+from app.tasks import load_shedding
+from app.tasks.load_shedding import LoadShedder, load_shedder, request_priority
+
+
+@pytest.fixture(autouse=True)
+def shedding_enabled(settings):
+    """Enable shedding with a small in-flight limit and a fresh shedder"""
+    settings.LOAD_SHEDDING = {"ENABLED": True, "MAX_IN_FLIGHT": 2}
+    load_shedder.reset()
+    yield
+    load_shedder.reset()
+
+
+@pytest.fixture
+def authenticated_client():
+    """Create authenticated API client"""
+    user = User.objects.create_user(username="shedder", password="testpass123")
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def overload(shedder, latency_ms, count=load_shedding.MIN_SAMPLES):
+    for _ in range(count):
+        shedder.started()
+        shedder.finished(latency_ms)
+
+
+class TestRequestPriority:
+    """Test request classification"""
+
+    @pytest.mark.parametrize(
+        "method,path,expected",
+        [
+            ("get", "/health", "critical"),
+            ("get", "/status", "critical"),
+            ("get", "/api/v1/tasks/", "low"),
+            ("get", "/api/v1/tasks/?search=x", "low"),
+            ("get", "/api/v1/tasks/stats/", "normal"),
+            ("post", "/api/v1/tasks/", "high"),
+            ("delete", "/api/v1/tasks/abc/", "high"),
+        ],
+    )
+    def test_priorities(self, method, path, expected):
+        request = getattr(APIRequestFactory(), method)(path)
+        assert request_priority(request, load_shedding.get_config()) == expected
+
+
+class TestLoadShedder:
+    """Test pressure and shedding decisions"""
+
+    def test_no_pressure_when_idle(self):
+        config = load_shedding.get_config()
+        assert LoadShedder().pressure(config) == 0
+
+    def test_latency_sheds_low_priority_first(self):
+        config = load_shedding.get_config()
+        shedder = LoadShedder()
+        overload(shedder, config["LATENCY_THRESHOLD_MS"] * 1.2)
+
+        assert shedder.should_shed("low", config)
+        assert not shedder.should_shed("normal", config)
+        assert not shedder.should_shed("high", config)
+        assert shedder.shed == {"low": 1, "normal": 0, "high": 0}
+
+    def test_severe_pressure_sheds_writes_not_critical(self):
+        config = load_shedding.get_config()
+        shedder = LoadShedder()
+        overload(shedder, config["LATENCY_THRESHOLD_MS"] * 3)
+
+        assert shedder.should_shed("high", config)
+        assert not shedder.should_shed("critical", config)
+
+    def test_in_flight_pressure(self):
+        config = load_shedding.get_config()
+        shedder = LoadShedder()
+        shedder.started()
+        shedder.started()
+        assert shedder.pressure(config) == 1.0
+
+    def test_no_in_flight_limit_by_default(self):
+        config = load_shedding.DEFAULT_LOAD_SHEDDING
+        shedder = LoadShedder()
+        shedder.started()
+        assert shedder.pressure(config) == 0
+
+    def test_queue_time_pressure(self):
+        config = load_shedding.get_config()
+        shedder = LoadShedder()
+        assert shedder.pressure(config, queue_ms=50) == 0.5
+        assert shedder.should_shed("low", config, queue_ms=120)
+        assert not shedder.should_shed("normal", config, queue_ms=120)
+
+    @pytest.mark.parametrize(
+        "header",
+        ["t=1700000000.250", "1700000000250", "t=1700000000250000"],
+    )
+    def test_queue_time_header_formats(self, header):
+        config = load_shedding.get_config()
+        request = APIRequestFactory().get("/", HTTP_X_REQUEST_START=header)
+        queue_ms = load_shedding.queue_time_ms(request, config, now=1700000000.5)
+        assert queue_ms == pytest.approx(250)
+
+    def test_queue_time_without_header(self):
+        config = load_shedding.get_config()
+        for request in (
+            APIRequestFactory().get("/"),
+            APIRequestFactory().get("/", HTTP_X_REQUEST_START="garbage"),
+        ):
+            assert load_shedding.queue_time_ms(request, config) is None
+
+    def test_old_samples_expire(self):
+        config = {**load_shedding.get_config(), "LATENCY_WINDOW": 0}
+        shedder = LoadShedder()
+        overload(shedder, 10000)
+        assert shedder.latency_estimate(config["LATENCY_WINDOW"]) == 0
+
+
+@pytest.mark.django_db
+class TestLoadSheddingMiddleware:
+    """Test shedding through the request stack"""
+
+    def test_list_shed_with_retry_after(self, authenticated_client):
+        overload(load_shedder, 10000)
+
+        response = authenticated_client.get("/api/v1/tasks/")
+        assert response.status_code == 503
+        assert response["Retry-After"] == "1"
+        assert load_shedder.shed["low"] == 1
+
+    def test_writes_and_health_served_under_moderate_load(self, authenticated_client):
+        overload(load_shedder, 600)
+
+        response = authenticated_client.post("/api/v1/tasks/", {"title": "Still ok"})
+        assert response.status_code == 201
+        assert authenticated_client.get("/health").status_code == 200
+
+    def test_queued_list_shed(self, authenticated_client):
+        queued = f"t={time.time() - 0.5:.3f}"
+        response = authenticated_client.get(
+            "/api/v1/tasks/", HTTP_X_REQUEST_START=queued
+        )
+        assert response.status_code == 503
+
+        fresh = f"t={time.time():.3f}"
+        response = authenticated_client.get(
+            "/api/v1/tasks/", HTTP_X_REQUEST_START=fresh
+        )
+        assert response.status_code == 200
+
+    def test_disabled(self, authenticated_client, settings):
+        settings.LOAD_SHEDDING = {"ENABLED": False}
+        overload(load_shedder, 10000)
+
+        assert authenticated_client.get("/api/v1/tasks/").status_code == 200
+
+    def test_shed_counter_exported(self, authenticated_client):
+        counter = load_shedding.shed_requests.labels(priority="low")
+        before = counter._value.get()
+        overload(load_shedder, 10000)
+
+        authenticated_client.get("/api/v1/tasks/")
+        assert counter._value.get() == before + 1
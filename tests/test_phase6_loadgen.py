@@ -0,0 +1,214 @@
+"""
+Phase 6 - Open-loop load generator tests
+"""
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from app.tasks.loadgen import (
+    LatencyHistogram,
+    LoadGenerator,
+    VirtualUser,
+    arrival_offsets,
+    build_request,
+    load_users,
+    parse_mix,
+)
+
+
+class FakeAPI:
+    """Minimal stand-in for the task API, served through MockTransport"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        self.next_id = 0
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        path = request.url.path
+        if request.method == "POST" and path == "/api/v1/tasks/":
+            self.next_id += 1
+            return httpx.Response(201, json={"id": self.next_id})
+        if path.endswith("/mark_done/"):
+            return httpx.Response(200, json={"status": "DONE"})
+        return httpx.Response(200, json={"results": []})
+
+
+def run_generator(api, **kwargs):
+    async def run():
+        transport = httpx.MockTransport(api)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://api"
+        ) as client:
+            users = [VirtualUser("alice", "abc", task_ids=[1, 2, 3])]
+            return await LoadGenerator(client, users, seed=1, **kwargs).run()
+
+    return asyncio.run(run())
+
+
+class TestLatencyHistogram:
+    """Test histogram percentiles and merging"""
+
+    def test_percentiles_within_precision(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+
+        summary = histogram.summary()
+        assert summary["count"] == 1000
+        assert summary["min"] == 1.0
+        assert summary["max"] == 1000.0
+        assert summary["mean"] == pytest.approx(500.5)
+        for percent, expected in ((50, 500), (95, 950), (99, 990)):
+            assert histogram.percentile(percent) / 1000 == pytest.approx(
+                expected, rel=0.02
+            )
+
+    def test_small_values_exact(self):
+        histogram = LatencyHistogram()
+        for us in (5, 7, 100):
+            histogram.record(us / 1_000_000)
+        assert histogram.percentile(50) == 7
+        assert histogram.percentile(100) == 100
+
+    def test_merge(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.010)
+        second.record(0.200)
+        first.merge(second)
+        assert first.count == 2
+        assert first.summary()["max"] == 200.0
+        assert first.percentile(50) == pytest.approx(10_000, rel=0.02)
+
+    def test_empty(self):
+        assert LatencyHistogram().summary() == {"count": 0}
+
+
+class TestScheduling:
+    """Test arrival schedules and scenario mixes"""
+
+    def test_constant_arrivals(self):
+        offsets = list(arrival_offsets(rate=4, duration=2))
+        assert offsets == [0, 0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75]
+
+    def test_poisson_arrivals_average_rate(self):
+        offsets = list(arrival_offsets(200, 50, "poisson", random.Random(3)))
+        assert len(offsets) == pytest.approx(10_000, rel=0.05)
+        assert offsets == sorted(offsets)
+        assert offsets[-1] < 50
+
+    def test_invalid_arrivals(self):
+        with pytest.raises(ValueError):
+            list(arrival_offsets(0, 10))
+        with pytest.raises(ValueError):
+            list(arrival_offsets(10, 10, "bursty"))
+
+    def test_parse_mix(self):
+        assert parse_mix("list=3, create=1.5") == {"list": 3.0, "create": 1.5}
+        for spec in ("browse=1", "list=abc", "list=-1", "list=0"):
+            with pytest.raises(ValueError):
+                parse_mix(spec)
+
+    def test_mark_done_uses_owned_tasks(self):
+        user = VirtualUser("alice", "abc", task_ids=["t1"])
+        rng = random.Random(0)
+
+        assert build_request("mark_done", user, rng)[:3] == (
+            "mark_done",
+            "POST",
+            "/api/v1/tasks/t1/mark_done/",
+        )
+        scenario, method, path, body = build_request("mark_done", user, rng)
+        assert (scenario, method, path) == ("create", "POST", "/api/v1/tasks/")
+        assert body["title"]
+
+
+class TestLoadGenerator:
+    """Test open-loop runs against a fake API"""
+
+    def test_sends_at_target_rate(self):
+        api = FakeAPI()
+        report = run_generator(api, rate=100, duration=0.5)
+
+        assert report["requests"] == 50
+        assert len(api.requests) == 50
+        assert report["elapsed_s"] == pytest.approx(0.5, abs=0.2)
+        assert report["errors"] == 0
+        assert report["error_rate"] == 0
+        assert sum(s["requests"] for s in report["scenarios"].values()) == 50
+        assert set(report["scenarios"]) <= {
+            "list",
+            "filter",
+            "search",
+            "create",
+            "mark_done",
+            "stats",
+        }
+        assert all(r.headers["Authorization"] == "Token abc" for r in api.requests)
+
+    def test_does_not_wait_for_slow_responses(self):
+        # A closed loop with one worker would need 20 * 0.2s
+        api = FakeAPI(delay=0.2)
+        report = run_generator(api, rate=40, duration=0.5, mix={"list": 1})
+
+        assert report["requests"] == 20
+        assert report["elapsed_s"] < 1.5
+        assert report["latency_ms"]["p50"] >= 190
+
+    def test_queueing_counts_against_latency(self):
+        # One request at a time: later requests wait to be sent, and that
+        # wait is part of their latency but not of their service time
+        api = FakeAPI(delay=0.05)
+        report = run_generator(
+            api, rate=100, duration=0.1, mix={"stats": 1}, max_in_flight=1
+        )
+
+        assert report["requests"] == 10
+        assert report["service_time_ms"]["max"] < 150
+        assert report["latency_ms"]["max"] > 300
+        assert report["send_lag_ms"]["max"] > 300
+
+    def test_errors_counted(self):
+        async def failing(request):
+            if request.url.path.endswith("/stats/"):
+                raise httpx.ConnectError("refused")
+            return httpx.Response(503)
+
+        report = run_generator(
+            failing, rate=100, duration=0.2, mix={"stats": 1, "list": 1}
+        )
+
+        assert report["errors"] == 20
+        assert report["error_rate"] == 1.0
+        assert set(report["status_codes"]) <= {"503", "ConnectError"}
+
+    def test_throttled_requests_rejected(self):
+        async def throttled(request):
+            return httpx.Response(429)
+
+        report = run_generator(throttled, rate=100, duration=0.1, mix={"list": 1})
+
+        assert report["errors"] == 10
+        assert report["rejected"] == 10
+        assert report["scenarios"]["list"]["errors"] == 10
+
+    def test_load_users(self):
+        api = FakeAPI()
+
+        async def run():
+            transport = httpx.MockTransport(api)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://api"
+            ) as client:
+                return await load_users(client, ["a", "b"], tasks_per_user=3)
+
+        users = asyncio.run(run())
+        assert len(users) == 2
+        assert users[0].token != users[1].token
+        assert list(users[1].task_ids) == [4, 5, 6]
+        assert users[1].headers == {"Authorization": "Token b"}
@@ -0,0 +1,88 @@
+"""
+Phase 6 - MessagePack content negotiation tests
+"""
+import datetime
+import uuid
+
+import msgpack
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from app.tasks import msgpack_codec
+from app.tasks.models import Task
+
+MSGPACK = "application/msgpack"
+
+
+@pytest.fixture
+def user():
+    """Create test user"""
+    return User.objects.create_user(username="packuser", password="testpass123")
+
+
+@pytest.fixture
+def authenticated_client(user):
+    """Create authenticated API client"""
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+@pytest.mark.django_db
+class TestMessagePackNegotiation:
+    """Test MessagePack requests and responses on /api/v1/tasks/"""
+
+    @pytest.mark.parametrize("fast_path", [True, False])
+    def test_list_as_msgpack(self, authenticated_client, user, settings, fast_path):
+        settings.TASKS_FAST_READ_PATH = fast_path
+        task = Task.objects.create(title="Packed", owner=user)
+
+        response = authenticated_client.get("/api/v1/tasks/", HTTP_ACCEPT=MSGPACK)
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith(MSGPACK)
+        data = msgpack_codec.unpackb(response.content)
+        item = data["results"][0]
+        assert item["id"] == task.id
+        assert isinstance(item["created_at"], datetime.datetime)
+        assert item["created_at"] == task.created_at
+        assert item["owner"] == "packuser"
+
+    def test_create_from_msgpack(self, authenticated_client, user):
+        due = datetime.datetime(2030, 1, 1, 12, 0, tzinfo=datetime.timezone.utc)
+        body = msgpack_codec.packb({"title": "From msgpack", "due_date": due})
+
+        response = authenticated_client.post(
+            "/api/v1/tasks/", body, content_type=MSGPACK, HTTP_ACCEPT=MSGPACK
+        )
+
+        assert response.status_code == 201
+        data = msgpack_codec.unpackb(response.content)
+        assert isinstance(data["id"], uuid.UUID)
+        task = Task.objects.get(id=data["id"], owner=user)
+        assert task.due_date == due
+
+    def test_invalid_msgpack_body(self, authenticated_client):
+        response = authenticated_client.post(
+            "/api/v1/tasks/", b"\xc1", content_type=MSGPACK
+        )
+        assert response.status_code == 400
+
+    def test_json_stays_default(self, authenticated_client, user):
+        Task.objects.create(title="Json", owner=user)
+        response = authenticated_client.get("/api/v1/tasks/")
+
+        assert response["Content-Type"] == "application/json"
+        assert response.json()["results"][0]["title"] == "Json"
+
+
+class TestMessagePackCodec:
+    """Test compact UUID/datetime encoding"""
+
+    def test_uuid_round_trip_is_compact(self):
+        value = uuid.uuid4()
+        packed = msgpack_codec.packb(value)
+        assert len(packed) < len(msgpack.packb(str(value)))
+        assert msgpack_codec.unpackb(packed) == value
@@ -0,0 +1,221 @@
+"""
+Phase 6 - On-demand request profiling tests
+"""
+import os
+import pstats
+import random
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from app.tasks import profiling
+from app.tasks.profiling import ProfilingDecider, StackSampler, enforce_retention
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    """Enable profiling (header only) into a temporary directory"""
+    directory = tmp_path / "profiles"
+    settings.REQUEST_PROFILING = {"ENABLED": True, "DIRECTORY": str(directory)}
+    return directory
+
+
+def token_client(username, is_staff=False):
+    user = User.objects.create_user(
+        username=username, password="testpass123", is_staff=is_staff
+    )
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+@pytest.fixture
+def staff_client():
+    return token_client("profiler", is_staff=True)
+
+
+@pytest.fixture
+def authenticated_client():
+    return token_client("regular")
+
+
+def write_profile(directory, profile_id, size, mtime):
+    """A stored profile of ``size`` bytes plus its sidecar"""
+    os.makedirs(directory, exist_ok=True)
+    for name, content in (
+        (profile_id + ".folded", b"x" * size),
+        (profile_id + ".json", b"{}"),
+    ):
+        path = os.path.join(directory, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        os.utime(path, (mtime, mtime))
+
+
+class TestSampler:
+    """Test stack sampling and the collapsed format"""
+
+    def test_samples_the_target_thread(self):
+        def busy_wait():
+            end = time.perf_counter() + 0.1
+            while time.perf_counter() < end:
+                pass
+
+        sampler = StackSampler(threading.get_ident(), 0.002)
+        sampler.start()
+        busy_wait()
+        sampler.stop()
+
+        assert sum(sampler.stacks.values()) > 5
+        stack, count = sampler.folded().splitlines()[0].rsplit(" ", 1)
+        assert int(count) > 0
+        frames = stack.split(";")
+        assert frames[-1].startswith("busy_wait_(test_phase6_profiling.py:")
+        assert all(" " not in frame for frame in frames)
+
+    def test_decider(self, settings):
+        settings.REQUEST_PROFILING = {"SAMPLE_EVERY": 10}
+        config = profiling.get_config()
+        decider = ProfilingDecider(random.Random(7))
+        request = APIRequestFactory().get("/api/v1/tasks/")
+        triggers = [decider.trigger(request, config) for _ in range(2000)]
+        assert set(triggers) == {"sample", None}
+        assert 150 < triggers.count("sample") < 250
+
+        config["SAMPLE_EVERY"] = 0
+        assert decider.trigger(request, config) is None
+
+    def test_client_request_id(self):
+        factory = APIRequestFactory()
+        given = factory.get("/", HTTP_X_REQUEST_ID="abc-123")
+        assert profiling.client_request_id(given) == "abc-123"
+        unsafe = factory.get("/", HTTP_X_REQUEST_ID="../../etc/passwd")
+        assert profiling.client_request_id(unsafe) is None
+        assert profiling.client_request_id(factory.get("/")) is None
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    """Test which requests get profiled and what is stored"""
+
+    def test_disabled_by_default(self, settings, tmp_path, staff_client):
+        settings.REQUEST_PROFILING = {"DIRECTORY": str(tmp_path)}
+        response = staff_client.get("/api/v1/tasks/", HTTP_X_PROFILE="1")
+        assert "X-Profile-Id" not in response
+        assert os.listdir(tmp_path) == []
+
+    def test_staff_header(self, profile_dir, staff_client):
+        response = staff_client.get(
+            "/api/v1/tasks/", HTTP_X_PROFILE="1", HTTP_X_REQUEST_ID="req-1"
+        )
+        assert response.status_code == 200
+        profile_id = response["X-Profile-Id"]
+        assert len(profile_id) == 32
+        assert sorted(os.listdir(profile_dir)) == [
+            f"{profile_id}.folded",
+            f"{profile_id}.json",
+        ]
+
+        (metadata,) = profiling.list_profiles(str(profile_dir))
+        assert metadata["request_id"] == "req-1"
+        assert metadata["path"] == "/api/v1/tasks/"
+        assert metadata["status"] == 200
+        assert metadata["trigger"] == "header"
+        assert metadata["mode"] == "sampling"
+
+    def test_client_request_id_cannot_overwrite(self, profile_dir, staff_client):
+        ids = {
+            staff_client.get(
+                "/api/v1/tasks/", HTTP_X_PROFILE="1", HTTP_X_REQUEST_ID="same"
+            )["X-Profile-Id"]
+            for _ in range(2)
+        }
+        assert len(ids) == 2
+        assert len(profiling.list_profiles(str(profile_dir))) == 2
+
+    def test_header_ignored_for_others(self, profile_dir, authenticated_client):
+        response = authenticated_client.get("/api/v1/tasks/", HTTP_X_PROFILE="1")
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response
+        response = APIClient().get("/health", HTTP_X_PROFILE="1")
+        assert "X-Profile-Id" not in response
+        assert not profile_dir.exists()
+
+    def test_sampled_requests(self, settings, profile_dir, authenticated_client):
+        settings.REQUEST_PROFILING = {
+            **settings.REQUEST_PROFILING,
+            "SAMPLE_EVERY": 1,
+        }
+        response = authenticated_client.get("/api/v1/tasks/")
+        profile_id = response["X-Profile-Id"]
+        (metadata,) = profiling.list_profiles(str(profile_dir))
+        assert metadata["id"] == profile_id
+        assert metadata["trigger"] == "sample"
+
+    def test_cprofile_mode(self, settings, profile_dir, staff_client):
+        settings.REQUEST_PROFILING = {**settings.REQUEST_PROFILING, "MODE": "cprofile"}
+        response = staff_client.get("/api/v1/tasks/", HTTP_X_PROFILE="1")
+        path = profile_dir / (response["X-Profile-Id"] + ".prof")
+        stats = pstats.Stats(str(path))
+        assert any(name == "list" for _, _, name in stats.stats)
+
+
+class TestRetention:
+    """Test the size and count bounds"""
+
+    def test_oldest_removed_beyond_max_files(self, tmp_path):
+        for index in range(5):
+            write_profile(tmp_path, f"p{index}", 10, 1000 + index)
+        assert enforce_retention(str(tmp_path), max_files=3, max_bytes=10**6) == 2
+        assert sorted(os.listdir(tmp_path))[0] == "p2.folded"
+        assert len(os.listdir(tmp_path)) == 6
+
+    def test_oldest_removed_beyond_max_bytes(self, tmp_path):
+        for index in range(4):
+            write_profile(tmp_path, f"p{index}", 100, 1000 + index)
+        # Each profile is 102 bytes with its sidecar
+        enforce_retention(str(tmp_path), max_files=100, max_bytes=250)
+        assert sorted(os.listdir(tmp_path)) == [
+            "p2.folded",
+            "p2.json",
+            "p3.folded",
+            "p3.json",
+        ]
+
+    def test_missing_directory(self, tmp_path):
+        assert enforce_retention(str(tmp_path / "none"), 1, 1) == 0
+
+
+@pytest.mark.django_db
+class TestProfileEndpoints:
+    """Test listing and downloading profiles"""
+
+    def test_staff_only(self, profile_dir, authenticated_client):
+        assert authenticated_client.get("/api/v1/profiles/").status_code == 403
+        assert authenticated_client.get("/api/v1/profiles/x/").status_code == 403
+        assert APIClient().get("/api/v1/profiles/").status_code == 401
+
+    def test_list_and_download(self, profile_dir, staff_client):
+        first = staff_client.get("/api/v1/tasks/", HTTP_X_PROFILE="1")
+        second = staff_client.get("/api/v1/tasks/stats/", HTTP_X_PROFILE="1")
+
+        response = staff_client.get("/api/v1/profiles/")
+        assert response.status_code == 200
+        ids = [profile["id"] for profile in response.json()["profiles"]]
+        assert ids == [second["X-Profile-Id"], first["X-Profile-Id"]]
+
+        response = staff_client.get(f"/api/v1/profiles/{ids[0]}/")
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/plain"
+        assert f'filename="{ids[0]}.folded"' in response["Content-Disposition"]
+        expected = (profile_dir / f"{ids[0]}.folded").read_bytes()
+        assert b"".join(response.streaming_content) == expected
+
+    def test_unknown_profile(self, profile_dir, staff_client):
+        assert staff_client.get("/api/v1/profiles/nope/").status_code == 404
+        assert staff_client.get("/api/v1/profiles/..%2Fsettings/").status_code == 404
@@ -0,0 +1,96 @@
+"""
+Phase 6 - Shared Redis client and pool tests
+"""
+import os
+
+import pytest
+import redis
+from app.tasks import redis_client
+from app.tasks.metrics_aggregator import MetricsAggregator
+from app.tasks.redis_client import InstrumentedConnectionPool, create_pool
+
+
+class FakeConnection:
+    """Connection stub that never touches the network"""
+
+    def __init__(self, **kwargs):
+        self.pid = os.getpid()
+
+    def connect(self):
+        pass
+
+    def can_read(self):
+        return False
+
+    def disconnect(self):
+        pass
+
+
+def make_pool(max_connections=2):
+    pool = InstrumentedConnectionPool(
+        connection_class=FakeConnection, max_connections=max_connections, timeout=0.01
+    )
+    pool.name = "test"
+    return pool
+
+
+class TestInstrumentedConnectionPool:
+    """Test pool usage and wait-time metrics"""
+
+    def test_usage_tracked(self):
+        pool = make_pool()
+        first = pool.get_connection("GET")
+        pool.get_connection("GET")
+        assert pool.stats() == {"in_use": 2, "created": 2, "max": 2}
+
+        pool.release(first)
+        assert pool.stats()["in_use"] == 1
+        gauge = redis_client.pool_connections_in_use.labels(pool="test")
+        assert gauge._value.get() == 1
+
+    def test_connections_reused(self):
+        pool = make_pool()
+        for _ in range(5):
+            pool.release(pool.get_connection("GET"))
+        assert pool.stats()["created"] == 1
+
+    def test_exhausted_pool_waits_then_fails(self):
+        pool = make_pool(max_connections=1)
+        pool.get_connection("GET")
+        with pytest.raises(redis.ConnectionError):
+            pool.get_connection("GET")
+
+    def test_wait_time_observed(self):
+        histogram = redis_client.pool_wait_seconds.labels(pool="test")
+        before = histogram._sum.get()
+        pool = make_pool()
+        pool.get_connection("GET")
+        assert histogram._sum.get() > before
+
+
+class TestSharedClients:
+    """Test client selection"""
+
+    def test_no_redis_configured_in_tests(self):
+        assert redis_client.get_redis() is None
+        assert redis_client.get_blocking_redis() is None
+        assert MetricsAggregator._get_ab_metrics() == {}
+
+    def test_own_pool_sized_from_settings(self, settings, monkeypatch):
+        settings.REDIS_URL = "redis://localhost:6390/0"
+        settings.REDIS_POOL = {"MAX_CONNECTIONS": 7, "TIMEOUT": 0.5}
+        monkeypatch.setattr(redis_client, "_clients", {})
+
+        client = redis_client.get_blocking_redis()
+        pool = client.connection_pool
+        assert isinstance(pool, InstrumentedConnectionPool)
+        assert (pool.max_connections, pool.timeout, pool.name) == (7, 0.5, "blocking")
+        assert pool.connection_kwargs.get("socket_timeout") is None
+        assert redis_client.get_blocking_redis() is client
+
+    def test_create_pool(self, settings):
+        settings.REDIS_POOL = {"MAX_CONNECTIONS": 3}
+        pool = create_pool("redis://localhost:6390/1", "adhoc", socket_timeout=0.3)
+        assert pool.max_connections == 3
+        assert pool.connection_kwargs["db"] == 1
+        assert pool.connection_kwargs["socket_timeout"] == 0.3
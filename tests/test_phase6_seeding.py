@@ -0,0 +1,215 @@
+"""
+Phase 6 - Synthetic data seeding tests
+"""
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from app.tasks import seeding, sharding
+from app.tasks.models import Task
+from app.tasks.sqlite_tuning import bulk_load_pragmas
+
+
+@pytest.mark.django_db
+class TestSeeding:
+    """Test owners and tasks generated for benchmarks"""
+
+    def test_create_owners(self):
+        owner_ids = seeding.create_owners(5, prefix="bench")
+        assert len(owner_ids) == 5
+        users = User.objects.filter(pk__in=owner_ids)
+        assert users.count() == 5
+        assert not any(user.has_usable_password() for user in users)
+
+    def test_seed_tasks_in_batches(self):
+        owner_ids = seeding.create_owners(3)
+        assert seeding.seed_tasks(250, owner_ids, batch_size=100, seed=1) == 250
+        assert Task.objects.count() == 250
+
+    def test_owner_distribution_is_skewed(self):
+        owner_ids = seeding.create_owners(20)
+        seeding.seed_tasks(2000, owner_ids, seed=2)
+
+        per_owner = Counter(Task.objects.values_list("owner_id", flat=True))
+        assert per_owner[owner_ids[0]] > 5 * per_owner[owner_ids[-1]]
+        assert per_owner.most_common(1)[0][0] == owner_ids[0]
+
+    def test_realistic_fields(self):
+        owner_ids = seeding.create_owners(2)
+        seeding.seed_tasks(500, owner_ids, seed=3)
+
+        statuses = Counter(Task.objects.values_list("status", flat=True))
+        assert set(statuses) == {"TODO", "IN_PROGRESS", "DONE"}
+        assert Task.objects.filter(due_date__isnull=True).exists()
+        assert Task.objects.filter(due_date__isnull=False).exists()
+
+        # Creation times are spread over the past year, not all "now"
+        oldest = Task.objects.order_by("created_at").first().created_at
+        assert oldest < timezone.now() - timezone.timedelta(days=30)
+        assert not Task.objects.filter(updated_at__lt=F("created_at")).exists()
+
+    def test_timestamps_restored(self):
+        with seeding.historical_timestamps():
+            assert Task._meta.get_field("created_at").auto_now_add is False
+        assert Task._meta.get_field("created_at").auto_now_add is True
+        assert Task._meta.get_field("updated_at").auto_now is True
+
+    def test_same_seed_same_rows(self):
+        owner_ids = seeding.create_owners(3)
+        weights = seeding.owner_weights(3)
+        distribution = seeding.get_distribution()
+        now = timezone.now()
+        first = seeding.generate_rows(10, owner_ids, weights, distribution, 5, now)
+        second = seeding.generate_rows(10, owner_ids, weights, distribution, 5, now)
+        assert first == second
+
+    def test_rows_as_tasks_match_inserted_rows(self):
+        owner_ids = seeding.create_owners(2)
+        rows = seeding.generate_rows(
+            20, owner_ids, [1, 1], seeding.get_distribution(), 9, timezone.now()
+        )
+        seeding.insert_rows(rows, "default")
+
+        for row in rows:
+            built = seeding._task_from_row(row)
+            stored = Task.objects.get(pk=built.pk)
+            for field in ("owner_id", "title", "due_date", "created_at", "updated_at"):
+                assert getattr(built, field) == getattr(stored, field)
+
+    def test_generated_rows_read_back_through_the_orm(self):
+        owner_ids = seeding.create_owners(2)
+        seeding.seed_tasks(50, owner_ids, seed=6)
+
+        for task in Task.objects.all():
+            assert task.id.version == 4
+            assert task.owner_id in owner_ids
+            assert task.created_at.tzinfo is not None
+            assert task.created_at <= timezone.now()
+            if task.due_date is not None:
+                assert task.due_date.tzinfo is not None
+
+    def test_custom_distribution(self):
+        owner_ids = seeding.create_owners(2)
+        distribution = {
+            "status": {"TODO": 1, "DONE": 0},
+            "priority": {"HIGH": 1},
+            "due_date_null": 1.0,
+            "description_words": (2, 2),
+            "created_days": 1,
+        }
+        seeding.seed_tasks(200, owner_ids, seed=7, distribution=distribution)
+
+        assert set(Task.objects.values_list("status", flat=True)) == {"TODO"}
+        assert set(Task.objects.values_list("priority", flat=True)) == {"HIGH"}
+        assert not Task.objects.filter(due_date__isnull=False).exists()
+        assert all(
+            len(description.split()) == 2
+            for description in Task.objects.values_list("description", flat=True)
+        )
+        oldest = Task.objects.order_by("created_at").first().created_at
+        assert oldest >= timezone.now() - timezone.timedelta(days=1, minutes=1)
+
+    def test_create_tokens(self):
+        owner_ids = seeding.create_owners(3)
+        keys = seeding.create_tokens(owner_ids)
+        assert len(set(keys)) == 3
+        assert [Token.objects.get(key=key).user_id for key in keys] == owner_ids
+
+
+@pytest.mark.django_db(databases=["default", "shard1"])
+class TestShardedSeeding:
+    """Test seeding with sharding on"""
+
+    def test_tasks_inserted_on_owner_shard(self, settings):
+        settings.TASK_SHARDS = ["default", "shard1"]
+        sharding._assignments.clear()
+        owner_ids = seeding.create_owners(10)
+
+        assert seeding.seed_tasks(300, owner_ids, batch_size=100, seed=4) == 300
+        for alias in settings.TASK_SHARDS:
+            owners = set(Task.objects.using(alias).values_list("owner_id", flat=True))
+            assert owners
+            assert {sharding.shard_for_owner(owner) for owner in owners} == {alias}
+        assert sum(Task.objects.using(a).count() for a in settings.TASK_SHARDS) == 300
+        sharding._assignments.clear()
+
+
+class TestSeedingHelpers:
+    """Test distribution parsing and bulk load pragmas"""
+
+    def test_parse_weights(self):
+        assert seeding.parse_weights("TODO=3, DONE=1", ["TODO", "DONE"]) == {
+            "TODO": 3.0,
+            "DONE": 1.0,
+        }
+        for spec in ("TODO=x", "LATER=1", "TODO=-1", "TODO=0"):
+            with pytest.raises(ValueError):
+                seeding.parse_weights(spec, ["TODO", "DONE"])
+
+    def test_parse_range(self):
+        assert seeding.parse_range("-5:60") == (-5, 60)
+        for spec in ("5", "9:1", "a:b"):
+            with pytest.raises(ValueError):
+                seeding.parse_range(spec)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_bulk_load_pragmas_restored(self):
+        def synchronous():
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous")
+                return cursor.fetchone()[0]
+
+        before = synchronous()
+        with bulk_load_pragmas(connection):
+            assert synchronous() == 0
+        assert synchronous() == before
+
+
+@pytest.mark.django_db
+class TestSeedDataCommand:
+    """Test the seed_data management command"""
+
+    def test_seeds_users_tokens_and_tasks(self, tmp_path):
+        tokens_file = tmp_path / "tokens.txt"
+        call_command(
+            "seed_data",
+            users=4,
+            tasks=300,
+            batch_size=100,
+            seed=8,
+            status="TODO=1,DONE=1",
+            tokens_file=str(tokens_file),
+            stdout=StringIO(),
+            stderr=StringIO(),
+        )
+        keys = tokens_file.read_text().split()
+        assert len(keys) == 4
+        assert Token.objects.filter(key__in=keys).count() == 4
+        assert Task.objects.count() == 300
+        assert "IN_PROGRESS" not in set(Task.objects.values_list("status", flat=True))
+
+    def test_rejects_bad_distribution(self):
+        with pytest.raises(CommandError):
+            call_command("seed_data", users=1, tasks=1, priority="URGENT=1")
+
+
+@pytest.mark.django_db
+class TestBenchScaleCommand:
+    """Test the bench_scale management command"""
+
+    def test_too_few_todo_tasks_rejected(self):
+        from app.tasks.management.commands.bench_scale import Command
+
+        user = User.objects.create_user(username="scale-owner", password="pass1234")
+        for i in range(3):
+            Task.objects.create(title=f"Task {i}", owner=user, status="TODO")
+
+        with pytest.raises(CommandError, match="needs 6 TODO tasks"):
+            Command().measure(user, 3, {"page_size": 10, "repeat": 5})
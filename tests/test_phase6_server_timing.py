@@ -0,0 +1,148 @@
+"""
+Phase 6 - Server-Timing instrumentation tests
+"""
+import re
+from datetime import datetime
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from app.tasks import server_timing
+from app.tasks.metrics_aggregator import MetricsAggregator
+from app.tasks.models import Task
+from app.tasks.server_timing import RequestTimings, timed, timed_phase
+
+
+@pytest.fixture
+def enable_timing(settings):
+    settings.SERVER_TIMING = {"ENABLED": True}
+    cache.clear()
+    yield settings
+    cache.clear()
+
+
+@pytest.fixture
+def authenticated_client():
+    """Create authenticated API client with a few tasks"""
+    user = User.objects.create_user(username="timed", password="testpass123")
+    token = Token.objects.create(user=user)
+    Task.objects.bulk_create(Task(title=f"Task {i}", owner=user) for i in range(5))
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def parse_header(value):
+    """{phase: (ms, calls)}"""
+    phases = {}
+    for entry in value.split(", "):
+        match = re.match(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) calls?")?$', entry)
+        assert match, entry
+        name, ms, calls = match.groups()
+        phases[name] = (float(ms), int(calls) if calls else None)
+    return phases
+
+
+class TestTimings:
+    """Test phase bookkeeping"""
+
+    def test_no_op_outside_a_request(self):
+        with timed("db"):
+            pass
+        assert timed_phase("db")(lambda: 42)() == 42
+        assert server_timing.current() is None
+
+    def test_reentered_phase_counted_once(self):
+        with server_timing.timing_request() as timings:
+            with timed("serialize"):
+                with timed("serialize"):
+                    pass
+                with timed("cache"):
+                    pass
+        assert timings.phases["serialize"][1] == 1
+        assert timings.phases["cache"][1] == 1
+        assert not timings.active
+
+    def test_header_format(self):
+        timings = RequestTimings()
+        timings.add("db", 0.0123)
+        timings.add("db", 0.001)
+        timings.add("total", 0.05)
+        assert timings.header() == 'db;dur=13.30;desc="2 calls", total;dur=50.00'
+
+    @pytest.mark.django_db
+    def test_queries_counted(self):
+        with server_timing.timing_request() as timings:
+            User.objects.count()
+            User.objects.exists()
+        assert timings.phases["db"][1] == 2
+        assert not connection.execute_wrappers
+
+
+@pytest.mark.django_db
+class TestServerTimingHeader:
+    """Test the header on API responses"""
+
+    def test_disabled_by_default(self, authenticated_client):
+        response = authenticated_client.get("/api/v1/tasks/")
+        assert "Server-Timing" not in response
+
+    def test_phases_on_list(self, enable_timing, authenticated_client):
+        response = authenticated_client.get("/api/v1/tasks/")
+        assert response.status_code == 200
+
+        phases = parse_header(response["Server-Timing"])
+        for phase in ("auth", "db", "cache", "serialize", "render", "metrics"):
+            assert phase in phases, phase
+        # The 5-task page is serialized as one phase, not once per task
+        assert phases["serialize"][1] == 1
+        assert phases["total"][0] >= phases["render"][0]
+
+    def test_fast_read_path_serialization(self, enable_timing, authenticated_client):
+        enable_timing.TASKS_FAST_READ_PATH = True
+        response = authenticated_client.get("/api/v1/tasks/")
+        assert parse_header(response["Server-Timing"])["serialize"][1] == 1
+
+    def test_msgpack_render(self, enable_timing, authenticated_client):
+        response = authenticated_client.get(
+            "/api/v1/tasks/", HTTP_ACCEPT="application/msgpack"
+        )
+        assert "render" in parse_header(response["Server-Timing"])
+
+
+@pytest.mark.django_db
+class TestPhaseMetrics:
+    """Test per-phase aggregates in the metrics store"""
+
+    def test_recorded_and_summarized(self, enable_timing, authenticated_client):
+        enable_timing.SERVER_TIMING = {"ENABLED": True, "RECORD_METRICS": True}
+        authenticated_client.get("/api/v1/tasks/")
+        authenticated_client.get("/api/v1/tasks/stats/")
+
+        minute_key = datetime.utcnow().strftime("%Y-%m-%d-%H-%M")
+        stored = cache.get(f"metrics:phases:{minute_key}")
+        assert stored["requests"] == 2
+
+        phases = MetricsAggregator.get_metrics_summary()["phases"]
+        assert phases["total"]["requests_percent"] == 100.0
+        assert phases["db"]["avg_calls"] >= 1
+        assert phases["serialize"]["requests_percent"] == 50.0
+
+    def test_not_recorded_by_default(self, enable_timing, authenticated_client):
+        authenticated_client.get("/api/v1/tasks/")
+        assert "phases" not in MetricsAggregator.get_metrics_summary()
+
+    def test_summarize(self):
+        minutes = [
+            {"requests": 2, "phases": {"db": [10.0, 4, 2]}},
+            {"requests": 2, "phases": {"db": [2.0, 2, 1], "cache": [1.0, 1, 1]}},
+        ]
+        assert server_timing.summarize(minutes) == {
+            "cache": {"avg_ms": 0.25, "avg_calls": 0.25, "requests_percent": 25.0},
+            "db": {"avg_ms": 3.0, "avg_calls": 1.5, "requests_percent": 75.0},
+        }
+        assert server_timing.summarize([]) == {}
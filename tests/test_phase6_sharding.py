@@ -0,0 +1,181 @@
+"""
+Phase 6 - Owner-based sharding tests
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from app.tasks import sharding
+from app.tasks.archive import archive_batch
+from app.tasks.management.commands import reshard_tasks
+from app.tasks.management.commands.reshard_tasks import move_owner
+from app.tasks.models import ArchivedTask, Task
+
+SHARDS = ["default", "shard1"]
+
+
+@pytest.fixture(autouse=True)
+def sharded(settings):
+    """Enable sharding over the two test databases"""
+    settings.TASK_SHARDS = SHARDS
+    sharding._assignments.clear()
+    cache.clear()
+    yield
+    sharding._assignments.clear()
+
+
+@pytest.fixture
+def users():
+    """One user homed on each shard"""
+    homed = {}
+    index = 0
+    while len(homed) < len(SHARDS):
+        user = User.objects.create_user(username=f"user{index}", password="pass1234")
+        homed.setdefault(sharding.hash_shard(user.pk, SHARDS), user)
+        index += 1
+    return homed
+
+
+def client_for(user):
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+@pytest.mark.django_db(databases=SHARDS)
+class TestSharding:
+    """Tasks live on their owner's shard"""
+
+    @pytest.mark.parametrize("fast_path", [True, False])
+    def test_api_uses_owner_shard(self, users, settings, fast_path):
+        settings.TASKS_FAST_READ_PATH = fast_path
+        for alias, user in users.items():
+            client = client_for(user)
+            response = client.post("/api/v1/tasks/", {"title": alias}, format="json")
+            assert response.status_code == 201
+            assert Task.objects.using(alias).filter(owner=user).count() == 1
+
+            response = client.get("/api/v1/tasks/")
+            assert [t["title"] for t in response.json()["results"]] == [alias]
+            assert response.json()["results"][0]["owner"] == user.username
+
+            task_id = response.json()["results"][0]["id"]
+            response = client.post(f"/api/v1/tasks/{task_id}/mark_done/")
+            assert response.status_code == 200
+            assert Task.objects.using(alias).get(id=task_id).status == "DONE"
+
+    def test_move_owner_between_shards(self, users):
+        user = users["default"]
+        for i in range(5):
+            Task.objects.create(title=f"task {i}", owner=user)
+
+        result = move_owner(user.pk, "shard1", batch_size=2, settle_seconds=0)
+
+        assert result == {"copied": 5, "deleted": 5}
+        assert sharding.shard_for_owner(user.pk) == "shard1"
+        assert Task.objects.using("default").filter(owner=user).count() == 0
+        assert sharding.task_queryset(user.pk).count() == 5
+
+    def test_move_keeps_target_writes_after_flip(self, users, monkeypatch):
+        user = users["default"]
+        edited, deleted, stale_write = (
+            Task.objects.create(title=f"task {i}", owner=user) for i in range(3)
+        )
+
+        def writes_while_settling(seconds):
+            # Older writes that reached the source during the move...
+            Task.objects.using("default").filter(pk__in=[edited.pk, deleted.pk]).update(
+                title="stale", updated_at=timezone.now()
+            )
+            # ...then the API writes to the target
+            Task.objects.using("shard1").filter(pk=edited.pk).update(
+                title="edited", updated_at=timezone.now()
+            )
+            Task.objects.using("shard1").filter(pk=deleted.pk).delete()
+            # ...while a worker with a stale placement still writes the source
+            Task.objects.using("default").filter(pk=stale_write.pk).update(
+                title="late", updated_at=timezone.now()
+            )
+            Task.objects.using("default").create(title="new", owner=user)
+
+        monkeypatch.setattr(reshard_tasks.time, "sleep", writes_while_settling)
+        move_owner(user.pk, "shard1", batch_size=2, settle_seconds=0)
+
+        titles = set(sharding.task_queryset(user.pk).values_list("title", flat=True))
+        assert titles == {"edited", "late", "new"}
+        assert not Task.objects.using("default").filter(owner=user).exists()
+
+    def test_move_owner_with_archived_tasks(self, users):
+        user = users["default"]
+        for i in range(3):
+            Task.objects.create(title=f"task {i}", owner=user, status="DONE")
+        archive_batch("default", timezone.now() + timedelta(days=1), batch_size=2)
+        Task.objects.create(title="live", owner=user)
+
+        result = move_owner(user.pk, "shard1", batch_size=2, settle_seconds=0)
+
+        assert result == {"copied": 4, "deleted": 4}
+        assert ArchivedTask.objects.using("default").filter(owner=user).count() == 0
+        assert sharding.task_queryset(user.pk, ArchivedTask).count() == 2
+
+        response = client_for(user).get("/api/v1/tasks/?include_archived=true")
+        assert response.json()["count"] == 4
+        assert client_for(user).get("/api/v1/tasks/stats/").json()["total"] == 4
+
+    def test_user_delete_clears_other_shards(self, users):
+        user = users["shard1"]
+        Task.objects.create(title="orphan?", owner=user)
+        user.delete()
+        assert not any(Task.objects.using(alias).exists() for alias in SHARDS)
+
+
+@pytest.mark.django_db(databases=SHARDS)
+class TestCrossShardQueries:
+    """Cross-owner queries merge every shard"""
+
+    def test_fan_out_merges_in_order(self, users):
+        for index, user in enumerate(users.values()):
+            for offset in (index, index + 2):
+                Task.objects.using(SHARDS[index]).create(title=f"t{offset}", owner=user)
+
+        titles = [t.title for t in sharding.fan_out(order_by=["title"], limit=3)]
+        assert titles == ["t0", "t1", "t2"]
+        assert sharding.count_all(lambda qs: qs.exclude(title="t0")) == 3
+
+    def test_admin_lists_tasks_from_every_shard(self, users, client):
+        admin = User.objects.create_superuser("admin", "a@example.com", "pass1234")
+        client.force_login(admin)
+        for alias, user in users.items():
+            Task.objects.using(alias).create(title=f"On {alias}", owner=user)
+
+        content = client.get("/admin/tasks/task/").content.decode()
+        assert "On default" in content
+        assert "On shard1" in content
+        assert "2 tasks" in content
+
+        content = client.get("/admin/tasks/task/?shard=shard1").content.decode()
+        assert "On shard1" in content
+        assert "On default" not in content
+
+    def test_admin_pages_merge_shards(self, users, client, monkeypatch):
+        from app.tasks.admin import TaskAdmin
+
+        monkeypatch.setattr(TaskAdmin, "list_per_page", 2)
+        admin = User.objects.create_superuser("admin", "a@example.com", "pass1234")
+        client.force_login(admin)
+        for index, user in enumerate(users.values()):
+            for offset in (index, index + 2):
+                Task.objects.using(SHARDS[index]).create(
+                    title=f"Task {offset}", owner=user
+                )
+
+        first = client.get("/admin/tasks/task/?o=1").content.decode()
+        second = client.get("/admin/tasks/task/?o=1&p=2").content.decode()
+        assert "Task 0" in first and "Task 1" in first
+        assert "Task 2" in second and "Task 3" in second
+        assert "Task 0" not in second
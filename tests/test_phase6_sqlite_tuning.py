@@ -0,0 +1,33 @@
+"""
+Phase 6 - SQLite connection tuning tests
+"""
+import sqlite3
+
+import pytest
+from django.db import connection
+from app.tasks.sqlite_tuning import apply_pragmas, pragma_statements
+
+
+@pytest.mark.django_db
+class TestSqlitePragmas:
+    """Test pragmas applied on connection setup"""
+
+    def test_pragmas_applied_to_django_connection(self, settings):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            assert cursor.fetchone()[0] == settings.SQLITE_PRAGMAS["busy_timeout"]
+            cursor.execute("PRAGMA synchronous")
+            assert cursor.fetchone()[0] == 1  # NORMAL
+
+    def test_wal_on_file_database(self, tmp_path):
+        conn = sqlite3.connect(tmp_path / "wal.sqlite3")
+        apply_pragmas(conn.cursor(), {"journal_mode": "WAL"})
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    @pytest.mark.parametrize(
+        "pragmas", [{"journal_mode; DROP TABLE x": "WAL"}, {"synchronous": "1; --"}]
+    )
+    def test_invalid_pragmas_rejected(self, pragmas):
+        with pytest.raises(ValueError):
+            pragma_statements(pragmas)
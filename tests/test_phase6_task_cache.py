@@ -0,0 +1,202 @@
+"""
+Phase 6 - Task detail near cache tests
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from app.tasks.models import Task
+from app.tasks.msgpack_codec import unpackb
+from app.tasks.task_cache import TOMBSTONE, task_detail_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_task_cache():
+    """Start every test with empty cache tiers"""
+    task_detail_cache.clear()
+    cache.clear()
+    yield
+    task_detail_cache.clear()
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+    )
+    return client
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="nearcache", password="testpass123")
+
+
+@pytest.fixture
+def task(user):
+    return Task.objects.create(title="Hot task", owner=user, priority="HIGH")
+
+
+@pytest.mark.django_db
+class TestTaskDetailCache:
+    """Test detail reads through the near cache"""
+
+    def test_repeated_reads_cost_no_queries(
+        self, user, task, django_assert_num_queries
+    ):
+        client = client_for(user)
+        url = f"/api/v1/tasks/{task.pk}/"
+        first = client.get(url).json()
+
+        with django_assert_num_queries(0):
+            second = client.get(url).json()
+        assert first == second
+        assert second["owner"] == "nearcache"
+
+    def test_matches_uncached_representation(self, user, task, settings):
+        client = client_for(user)
+        url = f"/api/v1/tasks/{task.pk}/"
+        cached = client.get(url).json()
+
+        settings.TASK_DETAIL_CACHE = {"ENABLED": False}
+        assert client.get(url).json() == cached
+
+    def test_update_and_delete_invalidate(
+        self, user, task, django_capture_on_commit_callbacks
+    ):
+        client = client_for(user)
+        url = f"/api/v1/tasks/{task.pk}/"
+        client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.patch(url, {"title": "Renamed"}, format="json")
+        assert client.get(url).json()["title"] == "Renamed"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.delete(url)
+        assert client.get(url).status_code == 404
+
+    def test_invalidated_on_commit(
+        self, user, task, django_capture_on_commit_callbacks
+    ):
+        task_id = str(task.pk)
+        task_detail_cache.set(task_id, user.pk, ("row",))
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            task.delete()
+            # Not committed yet: readers still see the committed row
+            assert task_detail_cache.get(task_id, user.pk) == ("row",)
+        for callback in callbacks:
+            callback()
+        assert task_detail_cache.get(task_id, user.pk) is None
+
+    def test_late_fill_refused_after_invalidation(self, user, task):
+        task_id = str(task.pk)
+        # A reader fetched the row before the write committed...
+        stale_row = ("before",)
+        task_detail_cache.invalidate(task_id)
+        # ...and fills after the invalidation
+        task_detail_cache.set(task_id, user.pk, stale_row)
+        assert task_detail_cache.get(task_id, user.pk) is None
+
+        task_detail_cache.local.clear(reset_stats=False)
+        cache.delete(f"task:detail:{task_id}")
+        task_detail_cache.set(task_id, user.pk, ("after",))
+        assert task_detail_cache.get(task_id, user.pk) == ("after",)
+
+    def test_other_users_get_404(self, user, task):
+        client_for(user).get(f"/api/v1/tasks/{task.pk}/")
+        other = User.objects.create_user(username="other", password="testpass123")
+
+        response = client_for(other).get(f"/api/v1/tasks/{task.pk}/")
+        assert response.status_code == 404
+
+    def test_redis_tier_after_local_miss(self, user, task):
+        client = client_for(user)
+        url = f"/api/v1/tasks/{task.pk}/"
+        client.get(url)
+        task_detail_cache.local.clear(reset_stats=False)
+        client.get(url)
+        client.get(url)
+
+        stats = task_detail_cache.stats()
+        assert stats["local"]["hits"] == 1
+        assert stats["local"]["misses"] == 2
+        assert stats["redis"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+        assert APIClient().get("/status").json()["caches"]["task_detail"] == stats
+
+    def test_msgpack_from_cached_row(self, user, task):
+        client = client_for(user)
+        url = f"/api/v1/tasks/{task.pk}/"
+        client.get(url)
+
+        response = client.get(url, HTTP_ACCEPT="application/msgpack")
+        data = unpackb(response.content)
+        assert data["id"] == task.pk
+        assert data["created_at"] == task.created_at
+
+    def test_invalid_id_404(self, user):
+        assert client_for(user).get("/api/v1/tasks/not-a-uuid/").status_code == 404
+
+    def test_filtered_detail_bypasses_cache(self, user, task):
+        client = client_for(user)
+        client.get(f"/api/v1/tasks/{task.pk}/")
+        response = client.get(f"/api/v1/tasks/{task.pk}/?status=DONE")
+        assert response.status_code == 404
+
+
+class Stop(BaseException):
+    """Ends the listener loop in tests"""
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+        self.channels = []
+
+    def subscribe(self, channel):
+        self.channels.append(channel)
+
+    def listen(self):
+        yield from self.messages
+        raise Stop
+
+
+class FakeRedis:
+    def __init__(self, messages):
+        self.pubsub_instance = FakePubSub(messages)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return self.pubsub_instance
+
+
+class TestInvalidationListener:
+    """Test cross-worker invalidation messages"""
+
+    def test_messages_drop_local_entries(self):
+        task_detail_cache.local.set("keep", (1, ("row",)))
+        client = FakeRedis([{"data": b"drop"}])
+
+        def listen_after_connect():
+            # Set after the listener clears on (re)connect
+            task_detail_cache.local.set("drop", (1, ("row",)))
+            return iter([{"data": b"drop"}])
+
+        client.pubsub_instance.listen = lambda: _then_stop(listen_after_connect())
+        with pytest.raises(Stop):
+            task_detail_cache.channel.listen(client)
+
+        assert task_detail_cache.local.get("drop") == TOMBSTONE
+        assert client.pubsub_instance.channels == ["tasks:invalidate"]
+
+    def test_reconnect_clears_local_tier(self):
+        task_detail_cache.local.set("stale", (1, ("row",)))
+        with pytest.raises(Stop):
+            task_detail_cache.channel.listen(FakeRedis([]))
+        assert task_detail_cache.local.get("stale") is None
+
+
+def _then_stop(messages):
+    yield from messages
+    raise Stop
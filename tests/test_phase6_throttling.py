@@ -0,0 +1,160 @@
+"""
+Phase 6 - Sliding-window rate limiting tests
+"""
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from app.tasks.circuit_breaker import CircuitBreaker
+from app.tasks.throttling import (
+    LocalSlidingWindow,
+    SlidingWindowRateLimiter,
+    rate_limiter,
+)
+
+
+@pytest.fixture(autouse=True)
+def throttle_rates(settings):
+    """Enable small budgets and start with empty windows"""
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            "tasks_read": "3/min",
+            "tasks_write": "2/min",
+            "tasks_stats": "1/min",
+            "register": "1/hour",
+        },
+    }
+    rate_limiter.local.clear()
+    yield
+    rate_limiter.local.clear()
+
+
+def client_for(username):
+    user = User.objects.create_user(username=username, password="testpass123")
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+class TestLocalSlidingWindow:
+    """Test the in-process fallback window"""
+
+    def test_limit_and_retry_after(self):
+        window = LocalSlidingWindow()
+        assert window.hit("k", 2, 60)[:2] == (True, 1)
+        assert window.hit("k", 2, 60)[:2] == (True, 0)
+
+        allowed, remaining, retry_after = window.hit("k", 2, 60)
+        assert (allowed, remaining) == (False, 0)
+        assert 59 < retry_after <= 60
+
+    def test_window_slides(self):
+        window = LocalSlidingWindow()
+        assert window.hit("k", 1, 0.01)[0]
+        assert not window.hit("k", 1, 0.01)[0]
+        time.sleep(0.02)
+        assert window.hit("k", 1, 0.01)[0]
+
+    def test_evicts_least_recently_used_key(self):
+        window = LocalSlidingWindow(max_keys=2)
+        window.hit("a", 1, 60)
+        window.hit("b", 1, 60)
+        window.hit("a", 1, 60)
+        window.hit("c", 1, 60)
+        assert "b" not in window._windows
+        assert not window.hit("a", 1, 60)[0]
+
+
+class TestRedisFallback:
+    """Redis errors fail open to the local limiter"""
+
+    def test_redis_error_uses_local_window(self, monkeypatch):
+        breaker = CircuitBreaker("test")
+        limiter = SlidingWindowRateLimiter(breaker=breaker)
+
+        def broken(keys, args):
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(limiter, "_get_script", lambda: broken)
+        assert limiter.hit("k", 1, 60)[0]
+        assert not limiter.hit("k", 1, 60)[0]
+        assert breaker.failures == 2
+
+    def test_script_result_used(self, monkeypatch):
+        limiter = SlidingWindowRateLimiter()
+        calls = []
+
+        def script(keys, args):
+            calls.append((keys, args))
+            return [0, 0, 1500]
+
+        monkeypatch.setattr(limiter, "_get_script", lambda: script)
+        assert limiter.hit("k", 5, 60) == (False, 0, 1.5)
+        assert calls[0][0] == ["k"]
+        assert calls[0][1][:2] == [5, 60000]
+
+
+@pytest.mark.django_db
+class TestThrottledViews:
+    """Test per-scope budgets on the API"""
+
+    def test_reads_throttled_with_retry_after(self):
+        client = client_for("reader")
+        for _ in range(3):
+            assert client.get("/api/v1/tasks/").status_code == 200
+
+        response = client.get("/api/v1/tasks/")
+        assert response.status_code == 429
+        assert 1 <= int(response["Retry-After"]) <= 60
+
+    def test_scopes_have_separate_budgets(self):
+        client = client_for("mixed")
+        assert client.get("/api/v1/tasks/stats/").status_code == 200
+        assert client.get("/api/v1/tasks/stats/").status_code == 429
+
+        assert client.get("/api/v1/tasks/").status_code == 200
+        response = client.post("/api/v1/tasks/", {"title": "One"}, format="json")
+        assert response.status_code == 201
+
+    def test_users_have_separate_budgets(self):
+        first, second = client_for("first"), client_for("second")
+        for _ in range(2):
+            first.post("/api/v1/tasks/", {"title": "Task"}, format="json")
+
+        assert first.post("/api/v1/tasks/", {"title": "x"}).status_code == 429
+        assert second.post("/api/v1/tasks/", {"title": "x"}).status_code == 201
+
+    def test_register_throttled_per_ip(self):
+        client = APIClient()
+        data = {"username": "new1", "password": "Testpass123!", "email": "a@b.com"}
+        assert client.post("/api/v1/auth/register/", data).status_code == 201
+
+        data["username"] = "new2"
+        assert client.post("/api/v1/auth/register/", data).status_code == 429
+
+    def test_per_user_overrides(self, settings):
+        settings.THROTTLE_OVERRIDES = {
+            "bulk": {"tasks_read": "5/min"},
+            "exempt": {"tasks_read": None},
+        }
+        clients = {name: client_for(name) for name in ("bulk", "exempt", "regular")}
+
+        statuses = {
+            name: [client.get("/api/v1/tasks/").status_code for _ in range(6)]
+            for name, client in clients.items()
+        }
+        assert statuses["bulk"] == [200] * 5 + [429]
+        assert statuses["exempt"] == [200] * 6
+        assert statuses["regular"] == [200] * 3 + [429] * 3
+        # Other scopes keep the default rate
+        bulk = clients["bulk"]
+        assert bulk.get("/api/v1/tasks/stats/").status_code == 200
+        assert bulk.get("/api/v1/tasks/stats/").status_code == 429
+
+    def test_unscoped_views_not_throttled(self):
+        for _ in range(5):
+            assert APIClient().get("/health").status_code == 200
@@ -0,0 +1,240 @@
+"""
+Phase 6 - Traffic capture and replay tests
+"""
+import asyncio
+import hashlib
+import json
+
+import httpx
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from app.tasks import traffic_capture
+from app.tasks.traffic_capture import (
+    capture_body,
+    capture_query,
+    pseudonym,
+    read_capture,
+)
+from app.tasks.traffic_replay import (
+    TrafficReplayer,
+    assign_tokens,
+    load_records,
+    user_sequences,
+)
+
+
+@pytest.fixture
+def capture_path(settings, tmp_path):
+    """Capture every request to a temporary file"""
+    path = tmp_path / "traffic.capture"
+    settings.TRAFFIC_CAPTURE = {
+        "ENABLED": True,
+        "SAMPLE_RATE": 1.0,
+        "PATH": str(path),
+        "PSEUDONYM_KEY": "test-key",
+    }
+    yield path
+    traffic_capture.capture_writer.close()
+
+
+@pytest.fixture
+def authenticated_client():
+    """Create authenticated API client"""
+    user = User.objects.create_user(username="captured", password="testpass123")
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    client.user = user
+    return client
+
+
+def record(ts, user=None, path="/api/v1/tasks/", route="task-list", **extra):
+    return {
+        "v": traffic_capture.FORMAT_VERSION,
+        "ts": ts,
+        "m": "GET",
+        "p": path,
+        "r": route,
+        "q": "",
+        "ct": "",
+        "bh": None,
+        "b": None,
+        "s": 200,
+        "d": 5.0,
+        "u": user,
+        **extra,
+    }
+
+
+@pytest.mark.django_db
+class TestCaptureMiddleware:
+    """Test what the middleware writes"""
+
+    def test_disabled_by_default(self, settings, tmp_path):
+        path = tmp_path / "traffic.capture"
+        settings.TRAFFIC_CAPTURE = {"SAMPLE_RATE": 1.0, "PATH": str(path)}
+        APIClient().get("/api/v1/tasks/")
+        assert not path.exists()
+
+    def test_captures_request(self, capture_path, authenticated_client):
+        response = authenticated_client.get("/api/v1/tasks/?status=TODO&token=abc")
+        assert response.status_code == 200
+
+        (captured,) = read_capture(capture_path)
+        assert captured["m"] == "GET"
+        assert captured["p"] == "/api/v1/tasks/"
+        assert captured["r"] == "task-list"
+        assert captured["q"] == "status=TODO&token=%5BREDACTED%5D"
+        assert captured["s"] == 200
+        assert captured["d"] > 0
+        assert captured["u"] == pseudonym(authenticated_client.user.pk, "test-key")
+        assert captured["u"] != pseudonym(authenticated_client.user.pk, "other-key")
+
+    def test_body_redacted_and_hashed(self, capture_path):
+        body = {"username": "newcomer", "password": "s3cret-pass!", "email": ""}
+        APIClient().post("/api/v1/auth/register/", body, format="json")
+
+        (captured,) = read_capture(capture_path)
+        assert captured["b"]["username"] == "newcomer"
+        assert captured["b"]["password"] == traffic_capture.REDACTED
+        assert "s3cret" not in json.dumps(captured)
+        assert len(captured["bh"]) == 64
+        assert captured["u"] is None
+
+    def test_sampling_and_excluded_paths(self, settings, capture_path):
+        APIClient().get("/health")
+        settings.TRAFFIC_CAPTURE = {**settings.TRAFFIC_CAPTURE, "SAMPLE_RATE": 0.0}
+        APIClient().get("/api/v1/tasks/")
+        assert not capture_path.exists() or list(read_capture(capture_path)) == []
+
+    def test_appends(self, capture_path, authenticated_client):
+        for _ in range(3):
+            authenticated_client.get("/api/v1/tasks/")
+        captured = list(read_capture(capture_path))
+        assert len(captured) == 3
+        assert [r["ts"] for r in captured] == sorted(r["ts"] for r in captured)
+
+
+class TestCaptureBody:
+    """Test body hashing and redaction"""
+
+    config = {
+        **traffic_capture.DEFAULT_TRAFFIC_CAPTURE,
+        "MAX_BODY_BYTES": 100,
+    }
+
+    def test_nested_fields_redacted(self):
+        body = json.dumps({"items": [{"Token": "abc", "title": "x"}]}).encode()
+        digest, stored = capture_body(body, "application/json", self.config)
+        assert digest == hashlib.sha256(body).hexdigest()
+        assert stored == {"items": [{"Token": "[REDACTED]", "title": "x"}]}
+
+    def test_query_parameters_redacted(self):
+        query = "search=x&API_KEY=abc&token=t1&token=t2&page="
+        assert capture_query(query, self.config) == (
+            "search=x&API_KEY=%5BREDACTED%5D&token=%5BREDACTED%5D"
+            "&token=%5BREDACTED%5D&page="
+        )
+        # Left as sent when there is nothing to redact
+        assert capture_query("search=a%20b&page=2", self.config) == (
+            "search=a%20b&page=2"
+        )
+        assert capture_query("", self.config) == ""
+
+    def test_hash_only(self):
+        body = b'{"title": "x"}'
+        config = {**self.config, "BODY_MODE": "hash"}
+        assert capture_body(body, "application/json", config)[1] is None
+        assert capture_body(b"x" * 200, "application/json", self.config)[1] is None
+        assert capture_body(b"title=x", "text/plain", self.config)[1] is None
+        assert capture_body(b"", "application/json", self.config) == (None, None)
+
+
+class TestReplay:
+    """Test replay scheduling, ordering and the report"""
+
+    def replay(self, records, handler, speed=1.0, tokens=None):
+        async def run():
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                replayer = TrafficReplayer(client, records, tokens=tokens, speed=speed)
+                return await replayer.run()
+
+        return asyncio.run(run())
+
+    def test_load_records_sorted_and_filtered(self, tmp_path):
+        path = tmp_path / "capture"
+        writer = traffic_capture.CaptureWriter()
+        for ts, route in ((2.0, "task-list"), (1.0, "task-stats"), (3.0, "task-list")):
+            writer.write(record(ts, route=route), str(path))
+        writer.close()
+
+        assert [r["ts"] for r in load_records(path)] == [1.0, 2.0, 3.0]
+        assert [r["ts"] for r in load_records(path, routes=["task-list"])] == [2.0, 3.0]
+        assert len(load_records(path, limit=1)) == 1
+
+    def test_tokens_assigned_per_pseudonym(self):
+        records = [record(1, "a"), record(2, "b"), record(3, "a"), record(4, "c")]
+        assert assign_tokens(records, ["t1", "t2"]) == {"a": "t1", "b": "t2", "c": "t1"}
+        assert len(user_sequences(records + [record(5), record(6)])) == 5
+
+    def test_per_user_order_and_speed(self):
+        seen = []
+
+        async def handler(request):
+            seen.append((request.headers.get("authorization"), request.url.params["n"]))
+            # The first request of each user is slow
+            if request.url.params["n"] in ("0", "1"):
+                await asyncio.sleep(0.1)
+            return httpx.Response(200, json={})
+
+        records = [
+            record(100.0 + i * 0.02, user, q=f"n={i}")
+            for i, user in enumerate(["a", "b", "a", "b", "a"])
+        ]
+        report = self.replay(records, handler, speed=2.0, tokens=["ta", "tb"])
+
+        order_a = [n for auth, n in seen if auth == "Token ta"]
+        order_b = [n for auth, n in seen if auth == "Token tb"]
+        assert order_a == ["0", "2", "4"]
+        assert order_b == ["1", "3"]
+        # Captured over 80ms, at 2x that's 40ms; the slow first responses
+        # hold back the later requests of the same users
+        assert report["requests"] == 5
+        assert report["captured_span_s"] == pytest.approx(0.08)
+        assert report["send_lag_ms"]["max"] > 20
+
+    def test_report_per_route(self):
+        async def handler(request):
+            if request.url.path.endswith("/stats/"):
+                return httpx.Response(500)
+            return httpx.Response(200, json={})
+
+        records = [
+            record(1.0, "a", d=10.0),
+            record(1.001, "a", d=20.0),
+            record(1.002, "b", path="/api/v1/tasks/stats/", route="task-stats"),
+            record(1.003, None, path="/api/v1/tasks/", m="POST", b={"title": "x"}),
+            record(1.004, None, m="POST", bh="ab" * 32),
+        ]
+        report = self.replay(records, handler, speed=100)
+
+        routes = report["routes"]
+        assert set(routes) == {"GET task-list", "GET task-stats", "POST task-list"}
+        assert routes["GET task-list"]["requests"] == 2
+        assert routes["GET task-list"]["captured_ms"]["max"] == pytest.approx(
+            20, rel=0.01
+        )
+        assert "p95" in routes["GET task-list"]["diff"]
+        assert routes["GET task-stats"]["status_mismatches"] == 1
+        assert report["status_mismatches"] == 1
+        assert report["bodies_not_captured"] == 1
+
+    def test_rejects_bad_speed(self):
+        with pytest.raises(ValueError):
+            TrafficReplayer(None, [], speed=0)
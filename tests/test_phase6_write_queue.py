@@ -0,0 +1,224 @@
+"""
+Phase 6 - Single-writer queue tests
+"""
+import threading
+import uuid
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from app.tasks.models import Task
+from app.tasks import write_queue
+from app.tasks.write_queue import (
+    LocalTaskWriter,
+    RedisTaskWriter,
+    WriteFailed,
+    apply_batch,
+    apply_jobs,
+    submit_task_write,
+)
+
+
+@pytest.fixture
+def user():
+    """Create test user"""
+    return User.objects.create_user(username="writer", password="testpass123")
+
+
+@pytest.fixture
+def authenticated_client(user, settings):
+    """Authenticated client with the inline write path enabled"""
+    settings.TASK_WRITE_QUEUE = {"MODE": "inline"}
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+@pytest.mark.django_db
+class TestWriteQueueViews:
+    """Task mutations through the write queue"""
+
+    def test_create_update_mark_done_delete(self, authenticated_client, user):
+        response = authenticated_client.post(
+            "/api/v1/tasks/", {"title": "Queued", "priority": "HIGH"}, format="json"
+        )
+        assert response.status_code == 201
+        assert response.data["owner"] == "writer"
+        task_id = response.data["id"]
+
+        response = authenticated_client.patch(
+            f"/api/v1/tasks/{task_id}/", {"title": "Renamed"}, format="json"
+        )
+        assert response.status_code == 200
+        assert response.data["title"] == "Renamed"
+        assert response.data["priority"] == "HIGH"
+
+        response = authenticated_client.post(f"/api/v1/tasks/{task_id}/mark_done/")
+        assert response.status_code == 200
+        assert Task.objects.get(id=task_id).status == "DONE"
+
+        response = authenticated_client.delete(f"/api/v1/tasks/{task_id}/")
+        assert response.status_code == 204
+        assert not Task.objects.filter(id=task_id).exists()
+
+    def test_batch_isolates_failed_operation(self, user):
+        task = Task.objects.create(title="Exists", owner=user)
+        results = apply_batch(
+            [
+                {"action": "mark_done", "owner_id": user.pk, "task_id": task.pk},
+                {"action": "delete", "owner_id": user.pk, "task_id": uuid.uuid4()},
+                {"action": "create", "owner_id": user.pk, "fields": {"title": "New"}},
+            ]
+        )
+
+        assert [r["ok"] for r in results] == [True, False, True]
+        assert results[1]["not_found"]
+        assert Task.objects.get(pk=task.pk).status == "DONE"
+        assert Task.objects.filter(title="New", owner=user).exists()
+
+
+class TestLocalTaskWriter:
+    """Group commit batching in the per-process writer"""
+
+    def test_concurrent_submits_are_batched(self):
+        batch_sizes = []
+        release = threading.Event()
+
+        def apply_func(ops):
+            release.wait(5)
+            batch_sizes.append(len(ops))
+            return [{"ok": True, "task": op} for op in ops]
+
+        writer = LocalTaskWriter(apply_func=apply_func, max_wait=0.05)
+        results = []
+        threads = [
+            threading.Thread(target=lambda i=i: results.append(writer.submit(i, 5)))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(r["task"] for r in results) == list(range(20))
+        assert sum(batch_sizes) == 20
+        assert len(batch_sizes) < 20
+
+    def test_resubmitted_job_applied_once(self):
+        applied_ops = []
+
+        def apply_func(ops):
+            applied_ops.extend(ops)
+            return [{"ok": True, "task": op} for op in ops]
+
+        writer = LocalTaskWriter(apply_func=apply_func, max_wait=0)
+        first = writer.submit("create", 5, job_id="1:retry-me")
+        second = writer.submit("create", 5, job_id="1:retry-me")
+
+        assert first == second
+        assert applied_ops == ["create"]
+
+
+class TestIdempotency:
+    """Jobs retried after a timeout aren't applied twice"""
+
+    def test_apply_jobs_skips_known_and_repeated_jobs(self):
+        applied_ops = []
+
+        def apply_func(ops):
+            applied_ops.extend(ops)
+            return [{"ok": op != "bad", "task": op} for op in ops]
+
+        known = {"a": {"ok": True, "task": "earlier"}}
+        results, new = apply_jobs(
+            [("a", "x"), ("b", "y"), ("b", "y"), ("c", "bad")], known, apply_func
+        )
+
+        assert applied_ops == ["y", "bad"]
+        assert [r["task"] for r in results] == ["earlier", "y", "y", "bad"]
+        # Failures aren't remembered, so a retry can still succeed
+        assert new == {"b": {"ok": True, "task": "y"}}
+
+    def test_retry_with_same_key_applied_once(self):
+        applied_ops = []
+
+        def apply_func(ops):
+            applied_ops.extend(ops)
+            return [{"ok": True, "task": None} for _ in ops]
+
+        writer = LocalTaskWriter(apply_func=apply_func, max_wait=0)
+        owner = User(pk=7)
+        for _ in range(2):
+            submit_task_write(writer, "delete", owner, task_id=1, idempotency_key="k")
+        submit_task_write(writer, "delete", User(pk=8), task_id=1, idempotency_key="k")
+        submit_task_write(writer, "delete", owner, task_id=1)
+
+        # Keys are per owner; without one every submit is applied
+        assert [op["owner_id"] for op in applied_ops] == [7, 8, 7]
+
+    def test_key_reused_for_another_operation_applied(self):
+        applied_ops = []
+
+        def apply_func(ops):
+            applied_ops.extend(ops)
+            return [{"ok": True, "task": None} for _ in ops]
+
+        writer = LocalTaskWriter(apply_func=apply_func, max_wait=0)
+        owner = User(pk=7)
+        submit_task_write(writer, "delete", owner, task_id=1, idempotency_key="k")
+        submit_task_write(writer, "delete", owner, task_id=2, idempotency_key="k")
+        for title in ("a", "b", "b"):
+            submit_task_write(
+                writer,
+                "update",
+                owner,
+                task_id=1,
+                fields={"title": title},
+                idempotency_key="k",
+            )
+
+        # Same key, different task or payload: not a replay of the first job
+        assert [(op["action"], op["task_id"]) for op in applied_ops] == [
+            ("delete", 1),
+            ("delete", 2),
+            ("update", 1),
+            ("update", 1),
+        ]
+        assert [op["fields"]["title"] for op in applied_ops[2:]] == ["a", "b"]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.brpop_timeouts = []
+
+    def lpush(self, key, value):
+        pass
+
+    def brpop(self, key, timeout):
+        self.brpop_timeouts.append(timeout)
+        return None
+
+
+class TestSubmitErrors:
+    """Timeouts and failures as seen by the API"""
+
+    @pytest.mark.parametrize("timeout,expected", [(0.2, 1), (2.5, 3), (5, 5)])
+    def test_redis_wait_rounded_up(self, monkeypatch, timeout, expected):
+        client = FakeRedis()
+        monkeypatch.setattr(write_queue, "_redis_client", lambda: client)
+
+        with pytest.raises(write_queue.WriteQueueTimeout):
+            RedisTaskWriter().submit({"action": "create"}, timeout=timeout)
+        assert client.brpop_timeouts == [expected]
+
+    def test_error_details_not_exposed(self):
+        class FailingWriter:
+            def submit(self, op, timeout=None, job_id=None):
+                return {"ok": False, "error": "UNIQUE constraint failed: secret"}
+
+        with pytest.raises(WriteFailed) as excinfo:
+            submit_task_write(FailingWriter(), "create", User(pk=1))
+        assert str(excinfo.value.detail) == "Write failed."